@@ -45,78 +45,24 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src', 'modules'))
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src', 'sheets'))
 
-# Importar módulo de Google Sheets
-try:
-    from src.sheets.sheets_interface import google_sheets_page
-    google_sheets_available = True
-except ImportError:
-    google_sheets_page = None
-    google_sheets_available = False
-
-# Importar módulo de Área Física
-try:
-    from src.modules.areafisica import physical_area
-    physical_area_available = True
-except ImportError:
-    physical_area = None
-    physical_area_available = False
+# Módulos de área: se importan al abrir su página (ver src/lazy_modules.py)
+from src.lazy_modules import load_area, import_report, pending_areas
 
-# Importar módulo de Formularios Médicos
-try:
-    # LAZY LOADING - no importar directamente
-    area_medica_main = None
-    formularios_medicos_available = True
-    area_medica_enhanced_available = True
-except ImportError:
-    area_medica_main = None
-    formularios_medicos_available = False
-    area_medica_enhanced_available = False
-    
 # Importar utilidades
 try:
     from src.utils import load_json_data
     utils_available = True
 except ImportError:
     utils_available = False
-    
-    
-try:
-    from src.modules.areanutricion import mostrar_analisis_nutricion
-    areanutricion_available = True
-    print()
-except ImportError as e:
-    mostrar_analisis_nutricion = None
-    areanutricion_available = False
-    print(f"❌ Error importando areanutricion: {e}")
-    import traceback
-    traceback.print_exc()
-    
-    
-try:
-    from src.modules.dashboard_360 import dashboard_360
-    dashboard_360_available = True
-except ImportError:
-    dashboard_360 = None
-    dashboard_360_available = False
-    
-# Importar módulo de Reportes Médicos
-try:
-    from src.modules.reportemedico import main_reporte_medico
-    reportes_medicos_available = True
-except ImportError:
-    main_reporte_medico = None
-    reportes_medicos_available = False
-    
-# Importar módulo de Administración (corregir importación)
-try:
-    from src.modules.administracion import main_administracion
-    administracion_available = True
-except ImportError as e:
-    main_administracion = None
-    administracion_available = False
-    print(f"Error importando administracion: {e}")  
 
+# Almacenamiento local (SQLite)
+from src.local_store import get_local_store
+
+# Directorio de usuarios en memoria
+from src.otro.user_directory import get_user_directory
 
+# Imágenes optimizadas y CSS memoizado
+from src.assets import image_url, inject_css, optimized_image
 
 
 def get_gcp_credentials():
@@ -197,7 +143,7 @@ st.set_page_config(
 
 # CSS personalizado para el CAR
 def load_car_styles():
-    st.markdown("""
+    inject_css("""
     <style>
     @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
     
@@ -299,12 +245,13 @@ def load_car_styles():
     footer {visibility: hidden;}
     /* header {visibility: hidden;} */           /* ← COMENTADO PARA MOSTRAR HEADER */
     </style>
-    """, unsafe_allow_html=True)
+    """)
     
 class AuthManager:
     def __init__(self, credentials_file='credentials/users_credentials.json'):
         self.credentials_file = credentials_file
         self.ensure_credentials_file()
+        self.directory = get_user_directory(credentials_file)
 
     def ensure_credentials_file(self):
         if not os.path.exists(self.credentials_file):
@@ -327,27 +274,26 @@ class AuthManager:
 
     def authenticate(self, username: str, password: str) -> Dict:
         try:
-            with open(self.credentials_file, "r", encoding="utf-8") as f:
-                users = json.load(f)
-            if username in users:
-                user = users[username]
-                if user["password"] == self.hash_password(password):
-                    return user
+            user = self.directory.get(username)
+            if user is not None and user["password"] == self.hash_password(password):
+                return user
             return None
         except Exception as e:
             print(f"Error autenticando: {e}")
             return None
+
+    def has_permission(self, username: str, required_role: str = None) -> bool:
+        return self.directory.has_permission(username, required_role)
         
 class MedicalManager:
     def __init__(self):
         self.injuries_file = 'credentials/medical_records.json'
+        self.store = get_local_store()
         self.ensure_medical_file()
     
     def ensure_medical_file(self):
-        try:
-            with open(self.injuries_file, 'r', encoding='utf-8') as f:
-                json.load(f)
-        except FileNotFoundError:
+        # Los JSON heredados se importan al abrir el almacén local
+        if self.store.count('injuries') == 0:
             # Datos de ejemplo para el área médica
             sample_data = {
                 "injuries": [
@@ -413,38 +359,24 @@ class MedicalManager:
                     }
                 ]
             }
-            with open(self.injuries_file, 'w', encoding='utf-8') as f:
-                json.dump(sample_data, f, indent=2, ensure_ascii=False)
+            self.store.upsert_many('injuries', sample_data['injuries'])
     
     def get_injuries(self):
-        with open(self.injuries_file, 'r', encoding='utf-8') as f:
-            return json.load(f)['injuries']
+        return self.store.all('injuries')
     
     def add_injury(self, injury_data):
-        try:
-            with open(self.injuries_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except:
-            data = {"injuries": []}
-        
-        injuries = data['injuries']
-        new_id = max([injury['id'] for injury in injuries], default=0) + 1
-        injury_data['id'] = new_id
-        injuries.append(injury_data)
-        
-        with open(self.injuries_file, 'w', encoding='utf-8') as f:
-            json.dump({"injuries": injuries}, f, indent=2, ensure_ascii=False)
+        # Alta transaccional: el ID se obtiene del índice, sin reescribir nada
+        self.store.add('injuries', injury_data)
 
 class NutritionManager:
     def __init__(self):
         self.nutrition_file = 'credentials/nutrition_records.json'
+        self.store = get_local_store()
         self.ensure_nutrition_file()
     
     def ensure_nutrition_file(self):
-        try:
-            with open(self.nutrition_file, 'r', encoding='utf-8') as f:
-                json.load(f)
-        except FileNotFoundError:
+        # Los JSON heredados se importan al abrir el almacén local
+        if self.store.count('meal_plans') == 0:
             # Datos de ejemplo para nutrición
             sample_data = {
                 "meal_plans": [
@@ -502,50 +434,28 @@ class NutritionManager:
                     }
                 ]
             }
-            with open(self.nutrition_file, 'w', encoding='utf-8') as f:
-                json.dump(sample_data, f, indent=2, ensure_ascii=False)
+            self.store.upsert_many('meal_plans', sample_data['meal_plans'])
     
     def get_nutrition_data(self):
-        with open(self.nutrition_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return {"meal_plans": self.store.all('meal_plans')}
     
     def add_meal_plan(self, plan_data):
-        try:
-            with open(self.nutrition_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except:
-            data = {"meal_plans": []}
-        
-        meal_plans = data['meal_plans']
-        new_id = max([plan['id'] for plan in meal_plans], default=0) + 1
-        plan_data['id'] = new_id
-        meal_plans.append(plan_data)
-        
-        with open(self.nutrition_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        # Alta transaccional: el ID se obtiene del índice, sin reescribir nada
+        self.store.add('meal_plans', plan_data)
 
 # ...existing code... (línea ~710, dentro de la función login_page)
 
 def login_page():
     """Página de inicio de sesión con diseño mejorado - AUTENTICACIÓN HARDCODED"""
     
-    import base64
-    
-    # Cargar y codificar la imagen de fondo
-    def get_base64_image(image_path):
-        try:
-            with open(image_path, "rb") as img_file:
-                return base64.b64encode(img_file.read()).decode()
-        except:
-            return None
-    
-    bg_image = get_base64_image("entrada.png")
+    # Fondo optimizado (WebP) y cacheado por hash; servido como archivo estático si está habilitado
+    bg_image = image_url("entrada.png", max_width=1920)
     
     # CSS personalizado para el login con imagen de fondo - INPUTS PEQUEÑOS
     if bg_image:
         bg_style = f"""
         .stApp {{
-            background-image: url("data:image/png;base64,{bg_image}");
+            background-image: url("{bg_image}");
             background-size: cover;
             background-position: center;
             background-repeat: no-repeat;
@@ -561,7 +471,7 @@ def login_page():
         }
         """
     
-    st.markdown(f"""
+    inject_css(f"""
     <style>
     @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800&display=swap');
     
@@ -806,7 +716,7 @@ def login_page():
         }}
     }}
      </style>
-    """, unsafe_allow_html=True)
+    """)
     
     # Título principal
     st.markdown("""
@@ -828,7 +738,9 @@ def login_page():
 # Centrar botón (ELIMINAMOS LAS COLUMNAS, DEJAMOS QUE EL CSS ACTÚE)
     if st.button("INGRESAR", use_container_width=True):
         auth_manager = AuthManager()
-        user = auth_manager.authenticate(username.strip(), password)
+        # La sesión guarda el mismo usuario que se autenticó (sin espacios)
+        username = username.strip()
+        user = auth_manager.authenticate(username, password)
         if user:
             st.session_state.authenticated = True
             st.session_state.user_data = {
@@ -862,17 +774,17 @@ def login_page():
 def medical_area():
     """Área médica usando el sistema completo de areamedica.py"""
     
+    area_medica_main, import_error = load_area("medical")
+    if area_medica_main is None:
+        st.error(f"❌ Error al cargar el módulo de área médica: {import_error}")
+        st.info("🔧 Verifica que el archivo src/modules/areamedica.py esté disponible")
+        show_basic_medical_system()
+        return
+    
     try:
-        # LAZY LOADING - importar solo cuando se necesite
-        from src.modules.areamedica import main_streamlit as area_medica_main
-        
         # Usar la función main_streamlit() 
         area_medica_main()
         
-    except ImportError as e:
-        st.error(f"❌ Error al cargar el módulo de área médica: {e}")
-        st.info("🔧 Verifica que el archivo src/modules/areamedica.py esté disponible")
-        show_basic_medical_system()
         
     except Exception as e:
         st.error(f"❌ Error inesperado en el área médica: {e}")
@@ -1006,6 +918,106 @@ def show_basic_medical_system():
 
 # ...existing code...
 
+def dashboard_360_page():
+    """Panel del Jugador (Dashboard 360)"""
+    dashboard_360, _ = load_area("dashboard_360")
+    if dashboard_360 is not None:
+        try:
+            dashboard_360()
+        except Exception as e:
+            st.error(f"❌ Error en Dashboard 360: {e}")
+    else:
+        st.error("❌ Dashboard 360 no disponible")
+
+
+def nutrition_page():
+    """Área de Nutrición"""
+    mostrar_analisis_nutricion, _ = load_area("nutricion")
+    if mostrar_analisis_nutricion is not None:
+        try:
+            mostrar_analisis_nutricion()
+        except Exception as e:
+            st.error(f"❌ Error en Área Nutrición: {e}")
+            st.info("🔧 Verifica la configuración del módulo de nutrición")
+    else:
+        st.error("❌ Área Nutrición no disponible")
+        st.info("🔧 Verifica que el archivo src/modules/areanutricion.py esté presente")
+
+
+def physical_area_page():
+    """Área Física"""
+    physical_area, _ = load_area("physical")
+    if physical_area is not None:
+        try:
+            physical_area()
+        except Exception as e:
+            st.error(f"❌ Error en Área Física: {e}")
+            st.info("🔧 Verifica la configuración del módulo de área física")
+    else:
+        st.error("❌ Área Física no disponible")
+        st.info("🔧 Verifica que el archivo src/modules/areafisica.py esté presente")
+
+
+def medical_reports_page():
+    """Reportes Médicos"""
+    main_reporte_medico, _ = load_area("medical_reports")
+    if main_reporte_medico is not None:
+        try:
+            main_reporte_medico()
+        except Exception as e:
+            st.error(f"❌ Error en Reportes Médicos: {e}")
+            st.info("🔧 Verifica la configuración del módulo de reportes médicos")
+    else:
+        st.error("❌ Reportes Médicos no disponible")
+        st.info("🔧 Verifica que el archivo src/modules/reportemedico.py esté presente")
+
+
+def administration_page():
+    """Administración"""
+    main_administracion, import_error = load_area("administracion")
+    if main_administracion is not None:
+        try:
+            main_administracion()
+        except Exception as e:
+            st.error(f"❌ Error en el módulo de administración: {e}")
+            st.error(f"Detalle del error: {str(e)}")
+            st.info("🔧 Verifica la configuración del módulo de administración")
+            
+            # Mostrar traceback para debug
+            import traceback
+            st.code(traceback.format_exc())
+    else:
+        st.error("❌ Módulo de Administración no disponible")
+        st.info(f"🔧 Error de importación: {import_error}")
+
+
+def _go_to_page(page_key):
+    """Callback de navegación: cambia de página antes del rerun (una sola ejecución)"""
+    st.session_state.current_page = page_key
+
+
+def _logout():
+    """Callback de cierre de sesión"""
+    for key in list(st.session_state.keys()):
+        del st.session_state[key]
+
+
+def _streamlit_page(page_key, title, icon, render):
+    """Construir un st.Page con url estable para una entrada del menú"""
+    def run_page():
+        st.session_state.current_page = page_key
+        render()
+    
+    run_page.__name__ = f"page_{page_key}"
+    return st.Page(
+        run_page,
+        title=title,
+        icon=icon,
+        url_path=page_key,
+        default=(page_key == "dashboard")
+    )
+
+
 def main_dashboard():
     load_car_styles()
     
@@ -1020,115 +1032,30 @@ def main_dashboard():
     </div>
     """, unsafe_allow_html=True)
     
-    st.sidebar.markdown("### 🧭 Menú Principal")
-    
-    # Botones individuales en el sidebar (como estaba antes)
-    if st.sidebar.button("🏠 Portada", use_container_width=True):
-        st.session_state.current_page = "dashboard"
-        st.rerun()
-    
-    if st.sidebar.button("📊 Panel del Jugador", use_container_width=True):
-        st.session_state.current_page = "dashboard_360"
-        st.rerun()
-    
-    if st.sidebar.button("🏥 Área Médica", use_container_width=True):
-        st.session_state.current_page = "medical"
-        st.rerun()
-    
-    if st.sidebar.button("📄 Reportes Médicos", use_container_width=True):
-        st.session_state.current_page = "medical_reports"
-        st.rerun()
-    
-    if st.sidebar.button("🥗 Área Nutrición", use_container_width=True):
-        st.session_state.current_page = "nutricion"
-        st.rerun()
-    
-    if st.sidebar.button("🏋️ Área Física", use_container_width=True):
-        st.session_state.current_page = "physical"
-        st.rerun()
-    
-    if st.sidebar.button("📋 Administración", use_container_width=True):
-        st.session_state.current_page = "administracion"
-        st.rerun()
-    
-    if st.sidebar.button("⚙️ Configuración", use_container_width=True):
-        st.session_state.current_page = "settings"
-        st.rerun()
-    
-    # Navegación por páginas (mantener igual)
-    if st.session_state.current_page == "dashboard":
-        dashboard_main()
-    
-    elif st.session_state.current_page == "dashboard_360":
-        if dashboard_360_available and dashboard_360 is not None:
-            try:
-                dashboard_360()
-            except Exception as e:
-                st.error(f"❌ Error en Dashboard 360: {e}")
-        else:
-            st.error("❌ Dashboard 360 no disponible")
-    
-    elif st.session_state.current_page == "medical":
-        medical_area()
-    
-    elif st.session_state.current_page == "nutricion":
-        if areanutricion_available and mostrar_analisis_nutricion is not None:
-            try:
-                mostrar_analisis_nutricion()
-            except Exception as e:
-                st.error(f"❌ Error en Área Nutrición: {e}")
-                st.info("🔧 Verifica la configuración del módulo de nutrición")
-        else:
-            st.error("❌ Área Nutrición no disponible")
-            st.info("🔧 Verifica que el archivo src/modules/areanutricion.py esté presente")
-    
-    elif st.session_state.current_page == "physical":
-        if physical_area_available and physical_area is not None:
-            try:
-                physical_area()
-            except Exception as e:
-                st.error(f"❌ Error en Área Física: {e}")
-                st.info("🔧 Verifica la configuración del módulo de área física")
-        else:
-            st.error("❌ Área Física no disponible")
-            st.info("🔧 Verifica que el archivo src/modules/areafisica.py esté presente")
-    
-    elif st.session_state.current_page == "medical_reports":
-        if reportes_medicos_available and main_reporte_medico is not None:
-            try:
-                main_reporte_medico()
-            except Exception as e:
-                st.error(f"❌ Error en Reportes Médicos: {e}")
-                st.info("🔧 Verifica la configuración del módulo de reportes médicos")
-        else:
-            st.error("❌ Reportes Médicos no disponible")
-            st.info("🔧 Verifica que el archivo src/modules/reportemedico.py esté presente")
-    
-    elif st.session_state.current_page == "administracion":
-        if administracion_available and main_administracion is not None:
-            try:
-                main_administracion()
-            except Exception as e:
-                st.error(f"❌ Error en el módulo de administración: {e}")
-                st.error(f"Detalle del error: {str(e)}")
-                st.info("🔧 Verifica la configuración del módulo de administración")
-                
-                # Mostrar traceback para debug
-                import traceback
-                st.code(traceback.format_exc())
-        else:
-            st.error("❌ Módulo de Administración no disponible")
-            st.info(f"🔧 administracion_available: {administracion_available}")
-            st.info(f"🔧 main_administracion: {main_administracion is not None}")
-    
-    elif st.session_state.current_page == "settings":
-        settings_page()
+    if hasattr(st, "navigation"):
+        # Ruteo nativo (Streamlit >= 1.36): un solo run por cambio de página,
+        # URL propia por página y limpieza del estado de widgets de la página anterior
+        pages = [_streamlit_page(*page) for page in PAGES]
+        current = st.navigation({"🧭 Menú Principal": pages})
+        current.run()
+    else:
+        st.sidebar.markdown("### 🧭 Menú Principal")
+        for page_key, title, icon, _ in PAGES:
+            st.sidebar.button(
+                f"{icon} {title}",
+                use_container_width=True,
+                key=f"nav_{page_key}",
+                type="primary" if st.session_state.current_page == page_key else "secondary",
+                on_click=_go_to_page,
+                args=(page_key,)
+            )
+        
+        render = {key: page for key, _, _, page in PAGES}.get(st.session_state.current_page)
+        if render is not None:
+            render()
     
-    # Botón de logout (mantener igual)
-    if st.sidebar.button("🚪 Cerrar Sesión", use_container_width=True):
-        for key in list(st.session_state.keys()):
-            del st.session_state[key]
-        st.rerun()
+    # Botón de logout
+    st.sidebar.button("🚪 Cerrar Sesión", use_container_width=True, on_click=_logout)
 
 
 
@@ -1139,7 +1066,7 @@ def dashboard_main():
     """Dashboard principal del sistema CAR - Versión comercial con branding profesional"""
     
     # CSS personalizado con diseño premium
-    st.markdown("""
+    inject_css("""
     <style>
     /* Hero Container con gradiente premium */
     .hero-container {
@@ -1384,7 +1311,7 @@ def dashboard_main():
         }
     }
     </style>
-    """, unsafe_allow_html=True)
+    """)
     
     # Layout con dos columnas para hero - AJUSTADO LOGO MÁS PEQUEÑO
     col_text, col_logo = st.columns([2.5, 1])
@@ -1409,7 +1336,7 @@ def dashboard_main():
         # Logo más pequeño y centrado
         try:
             st.markdown('<div style="padding: 2rem 0; display: flex; justify-content: center;">', unsafe_allow_html=True)
-            st.image("logo.png", width=400)  # Tamaño reducido de logo
+            st.image(optimized_image("logo.png", max_width=800) or "logo.png", width=400)  # Tamaño reducido de logo
             st.markdown('</div>', unsafe_allow_html=True)
         except Exception as e:
             st.markdown("""
@@ -1605,7 +1532,7 @@ def settings_page():
     st.markdown('<div class="area-card">', unsafe_allow_html=True)
     st.subheader("🛠️ Herramientas de Administración")
     
-    if st.session_state.user_data['role'] == 'admin':
+    if AuthManager().has_permission(st.session_state.get('username', ''), 'admin'):
         col1, col2 = st.columns(2)
         
         with col1:
@@ -1627,10 +1554,31 @@ def settings_page():
         st.info("🔒 Las herramientas de administración están disponibles solo para administradores.")
     
     st.markdown('</div>', unsafe_allow_html=True)
+    
+    st.markdown('<div class="area-card">', unsafe_allow_html=True)
+    st.subheader("⏱️ Carga de Módulos")
+    
+    report = import_report()
+    if report:
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("📦 Áreas cargadas", len(report))
+        with col2:
+            st.metric("⏱️ Tiempo total de importación", f"{sum(row['segundos'] for row in report):.2f} s")
+        st.dataframe(pd.DataFrame(report), use_container_width=True, hide_index=True)
+    else:
+        st.info("Todavía no se abrió ninguna área en este proceso.")
+    
+    pending = pending_areas()
+    if pending:
+        st.caption(f"Sin cargar (se importan al abrirlas): {', '.join(pending)}")
+    
+    st.markdown('</div>', unsafe_allow_html=True)
 
 def sheets_page():
     """Página de integración con Google Sheets"""
-    if google_sheets_available and google_sheets_page is not None:
+    google_sheets_page, _ = load_area("sheets")
+    if google_sheets_page is not None:
         google_sheets_page()
     else:
         st.error("❌ Módulo de Google Sheets no disponible")
@@ -1639,12 +1587,27 @@ def sheets_page():
 
 def physical_page():
     """Página del Área Física"""
-    if physical_area_available and physical_area is not None:
+    physical_area, _ = load_area("physical")
+    if physical_area is not None:
         physical_area()
     else:
         st.error("❌ Módulo de Área Física no disponible")
         st.info("🔧 Verifica que el archivo physical_area.py esté presente")
 
+# Menú principal: (clave, título, ícono, función de la página)
+# Cada página importa su módulo de área recién al abrirse (load_area)
+PAGES = [
+    ("dashboard", "Portada", "🏠", dashboard_main),
+    ("dashboard_360", "Panel del Jugador", "📊", dashboard_360_page),
+    ("medical", "Área Médica", "🏥", medical_area),
+    ("medical_reports", "Reportes Médicos", "📄", medical_reports_page),
+    ("nutricion", "Área Nutrición", "🥗", nutrition_page),
+    ("physical", "Área Física", "🏋️", physical_area_page),
+    ("administracion", "Administración", "📋", administration_page),
+    ("settings", "Configuración", "⚙️", settings_page),
+]
+
+
 def main():
     # Inicializar session state
     if 'authenticated' not in st.session_state:
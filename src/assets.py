@@ -0,0 +1,192 @@
+"""
+Recursos estáticos del sistema CAR
+Imágenes redimensionadas/comprimidas una sola vez (WebP) y cacheadas por hash
+de archivo, y bloques CSS minificados y memoizados
+"""
+
+import base64
+import hashlib
+import io
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import streamlit as st
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+# Carpeta servida por Streamlit en /app/static (server.enableStaticServing)
+STATIC_DIR = "static"
+ASSETS_SUBDIR = "assets"
+
+# (ruta, mtime, tamaño) -> hash del contenido
+_digests = {}
+_digests_lock = threading.Lock()
+
+
+def file_digest(path: str) -> Optional[str]:
+    """
+    Hash del contenido de un archivo (se recalcula solo si cambia mtime/tamaño)
+
+    Returns:
+        Optional[str]: sha1 hexadecimal o None si el archivo no existe
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    with _digests_lock:
+        digest = _digests.get(key)
+    if digest is None:
+        with open(path, "rb") as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        with _digests_lock:
+            _digests[key] = digest
+    return digest
+
+
+@lru_cache(maxsize=32)
+def _encode_image(path: str, digest: str, max_width: int, quality: int) -> Tuple[bytes, str]:
+    """Redimensionar y comprimir una imagen (memoizado por hash de contenido)"""
+    with open(path, "rb") as f:
+        original = f.read()
+    if not PIL_AVAILABLE:
+        return original, _guess_mime(path)
+
+    image = Image.open(io.BytesIO(original))
+    resized = image.width > max_width
+    if resized:
+        height = round(image.height * max_width / image.width)
+        image = image.resize((max_width, height), Image.LANCZOS)
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="WEBP", quality=quality, method=6)
+    encoded = buffer.getvalue()
+
+    # Si la versión WebP no es más liviana, conservar el original
+    if not resized and len(encoded) >= len(original):
+        return original, _guess_mime(path)
+    return encoded, "image/webp"
+
+
+def _guess_mime(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    return {
+        ".png": "image/png",
+        ".jpg": "image/jpeg",
+        ".jpeg": "image/jpeg",
+        ".gif": "image/gif",
+        ".webp": "image/webp",
+    }.get(extension, "application/octet-stream")
+
+
+def optimized_image(path: str, max_width: int = 1920, quality: int = 80) -> Optional[bytes]:
+    """
+    Imagen redimensionada a `max_width` y comprimida en WebP
+
+    Args:
+        path (str): Ruta de la imagen original
+        max_width (int): Ancho máximo en píxeles
+        quality (int): Calidad WebP (0-100)
+
+    Returns:
+        Optional[bytes]: Bytes listos para st.image o None si no existe
+    """
+    digest = file_digest(path)
+    if digest is None:
+        return None
+    return _encode_image(path, digest, max_width, quality)[0]
+
+
+@lru_cache(maxsize=32)
+def _data_uri(path: str, digest: str, max_width: int, quality: int) -> str:
+    data, mime = _encode_image(path, digest, max_width, quality)
+    return f"data:{mime};base64,{base64.b64encode(data).decode()}"
+
+
+def image_base64(path: str, max_width: int = 1920, quality: int = 80) -> Optional[str]:
+    """Imagen optimizada codificada en base64 (sin el prefijo data:)"""
+    uri = image_data_uri(path, max_width, quality)
+    return uri.split(",", 1)[1] if uri else None
+
+
+def image_data_uri(path: str, max_width: int = 1920, quality: int = 80) -> Optional[str]:
+    """Imagen optimizada como data URI (memoizada por hash de archivo)"""
+    digest = file_digest(path)
+    if digest is None:
+        return None
+    return _data_uri(path, digest, max_width, quality)
+
+
+def _static_serving_enabled() -> bool:
+    try:
+        return bool(st.get_option("server.enableStaticServing"))
+    except Exception:
+        return False
+
+
+def image_url(path: str, max_width: int = 1920, quality: int = 80) -> Optional[str]:
+    """
+    URL de una imagen optimizada para usar en CSS/HTML
+
+    Con server.enableStaticServing la imagen se escribe una vez en
+    static/assets/ y se referencia por URL (el navegador la cachea);
+    si no, se devuelve un data URI memoizado.
+
+    Returns:
+        Optional[str]: URL o data URI, None si la imagen no existe
+    """
+    digest = file_digest(path)
+    if digest is None:
+        return None
+    if not _static_serving_enabled():
+        return _data_uri(path, digest, max_width, quality)
+
+    data, mime = _encode_image(path, digest, max_width, quality)
+    extension = "webp" if mime == "image/webp" else os.path.splitext(path)[1].lstrip(".")
+    stem = os.path.splitext(os.path.basename(path))[0]
+    filename = f"{stem}-{digest[:12]}-{max_width}.{extension}"
+
+    target_dir = os.path.join(STATIC_DIR, ASSETS_SUBDIR)
+    target = os.path.join(target_dir, filename)
+    if not os.path.exists(target):
+        os.makedirs(target_dir, exist_ok=True)
+        tmp_path = f"{target}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, target)
+    return f"app/static/{ASSETS_SUBDIR}/{filename}"
+
+
+@lru_cache(maxsize=64)
+def css_bundle(css: str) -> str:
+    """
+    Minificar un bloque CSS (memoizado por contenido)
+
+    Args:
+        css (str): Bloque <style>...</style> o CSS plano
+
+    Returns:
+        str: Un único bloque <style> sin comentarios ni espacios redundantes
+    """
+    css = re.sub(r"</?style>", "", css)
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = css.replace(";}", "}")
+    return f"<style>{css.strip()}</style>"
+
+
+def inject_css(css: str):
+    """Emitir un bloque CSS minificado y memoizado"""
+    st.markdown(css_bundle(css), unsafe_allow_html=True)
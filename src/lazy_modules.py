@@ -0,0 +1,95 @@
+"""
+Carga diferida de las áreas del sistema CAR
+Cada módulo de área (y sus dependencias pesadas: plotly, gspread, google-auth)
+se importa recién cuando se abre su página por primera vez
+"""
+
+import importlib
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Página -> (módulo, función de entrada)
+AREA_MODULES = {
+    "sheets": ("src.sheets.sheets_interface", "google_sheets_page"),
+    "dashboard_360": ("src.modules.dashboard_360", "dashboard_360"),
+    "medical": ("src.modules.areamedica", "main_streamlit"),
+    "medical_reports": ("src.modules.reportemedico", "main_reporte_medico"),
+    "nutricion": ("src.modules.areanutricion", "mostrar_analisis_nutricion"),
+    "physical": ("src.modules.areafisica", "physical_area"),
+    "administracion": ("src.modules.administracion", "main_administracion"),
+}
+
+# Página -> (función o None, error o None)
+_loaded: Dict[str, Tuple[Optional[Callable], Optional[str]]] = {}
+# Página -> medición de la importación
+_import_report: Dict[str, Dict] = {}
+_lock = threading.Lock()
+
+
+_STDLIB = getattr(sys, "stdlib_module_names", frozenset())
+
+
+def _top_level_packages() -> set:
+    """Paquetes de terceros cargados (sin biblioteca estándar ni extensiones privadas)"""
+    names = {name.split(".", 1)[0] for name in list(sys.modules)}
+    return {name for name in names if not name.startswith("_") and name not in _STDLIB}
+
+
+def load_area(page: str) -> Tuple[Optional[Callable], Optional[str]]:
+    """
+    Importar el módulo de un área la primera vez que se necesita
+
+    Args:
+        page (str): Clave de la página (ver AREA_MODULES)
+
+    Returns:
+        Tuple[Optional[Callable], Optional[str]]: (función de entrada, error)
+    """
+    with _lock:
+        if page in _loaded:
+            return _loaded[page]
+
+        module_name, attribute = AREA_MODULES[page]
+        modules_before = len(sys.modules)
+        packages_before = _top_level_packages()
+        started = time.perf_counter()
+
+        try:
+            module = importlib.import_module(module_name)
+            result = (getattr(module, attribute), None)
+        except (ImportError, AttributeError) as e:
+            print(f"❌ Error importando {module_name}: {e}")
+            result = (None, str(e))
+
+        _import_report[page] = {
+            "modulo": module_name,
+            "segundos": round(time.perf_counter() - started, 3),
+            "modulos_nuevos": len(sys.modules) - modules_before,
+            "paquetes_nuevos": ", ".join(sorted(_top_level_packages() - packages_before)),
+            "estado": "ok" if result[1] is None else f"error: {result[1]}",
+        }
+        _loaded[page] = result
+        return result
+
+
+def import_report() -> List[Dict]:
+    """
+    Costo de importación de cada área cargada en este proceso
+
+    El costo de una dependencia compartida (p. ej. plotly) se atribuye
+    al área que la importó primero.
+
+    Returns:
+        List[Dict]: Una fila por área, de la más costosa a la más barata
+    """
+    with _lock:
+        rows = [{"area": page, **values} for page, values in _import_report.items()]
+    return sorted(rows, key=lambda row: row["segundos"], reverse=True)
+
+
+def pending_areas() -> List[str]:
+    """Áreas que todavía no se importaron en este proceso"""
+    with _lock:
+        return [page for page in AREA_MODULES if page not in _loaded]
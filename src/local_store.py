@@ -0,0 +1,301 @@
+"""
+Almacenamiento local del sistema CAR
+Base SQLite (modo WAL) para lesiones, planes nutricionales y tests físicos
+Reemplaza la reescritura completa de archivos JSON en cada alta
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_DB_PATH = os.path.join('data', 'car_local.db')
+
+# Tabla -> campo de fecha indexado
+TABLES = {
+    'injuries': 'date_occurred',
+    'meal_plans': 'created_date',
+    'strength_tests': 'test_date',
+    'field_tests': 'test_date',
+}
+
+# Archivos JSON heredados: (tabla, ruta, clave de la lista, espacio de IDs)
+# El archivo principal de cada tabla conserva sus IDs; los demás se prefijan
+# con su espacio para que sus IDs numéricos no pisen a los del principal
+LEGACY_JSON_FILES = [
+    ('injuries', os.path.join('credentials', 'medical_records.json'), 'injuries', None),
+    ('injuries', os.path.join('data', 'medical_records.json'), 'injuries', 'data'),
+    ('meal_plans', os.path.join('credentials', 'nutrition_records.json'), 'meal_plans', None),
+    ('meal_plans', os.path.join('data', 'nutrition_records.json'), 'meal_plans', 'data'),
+    ('strength_tests', os.path.join('data', 'strength_tests.json'), 'tests', None),
+    ('field_tests', os.path.join('data', 'field_tests.json'), 'tests', None),
+]
+
+
+class LocalStore:
+    """
+    Almacén transaccional de registros locales
+
+    Cada tabla guarda el registro completo como JSON más columnas indexadas
+    (id, jugador, división, fecha) para consultas sin recorrer todo.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._create_schema()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Una conexión por hilo (sqlite3 no comparte conexiones entre hilos)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA busy_timeout=30000')
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self):
+        """Transacción con bloqueo de escritura inmediato"""
+        return _Transaction(self._connection())
+
+    def _create_schema(self):
+        with self._transaction() as conn:
+            for table in TABLES:
+                conn.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {table} (
+                        id TEXT PRIMARY KEY,
+                        num_id INTEGER,
+                        player_name TEXT,
+                        division TEXT,
+                        record_date TEXT,
+                        data TEXT NOT NULL
+                    )
+                """)
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_num_id ON {table}(num_id)")
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_player ON {table}(player_name)")
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_division ON {table}(division)")
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_date ON {table}(record_date)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    @staticmethod
+    def _check_table(table: str):
+        if table not in TABLES:
+            raise ValueError(f"Tabla desconocida: {table}")
+
+    @staticmethod
+    def _row_values(table: str, record: Dict) -> tuple:
+        record_id = record['id']
+        num_id = record_id if isinstance(record_id, int) else None
+        return (
+            str(record_id),
+            num_id,
+            record.get('player_name'),
+            record.get('division'),
+            str(record.get(TABLES[table]) or '') or None,
+            json.dumps(record, ensure_ascii=False, default=str),
+        )
+
+    def add(self, table: str, record: Dict) -> int:
+        """
+        Agregar un registro asignándole el siguiente ID numérico
+
+        Args:
+            table (str): Tabla destino
+            record (Dict): Datos del registro (se le asigna 'id')
+
+        Returns:
+            int: ID asignado
+        """
+        self._check_table(table)
+        with self._transaction() as conn:
+            row = conn.execute(f"SELECT MAX(num_id) FROM {table}").fetchone()
+            record['id'] = (row[0] or 0) + 1
+            conn.execute(
+                f"INSERT INTO {table} (id, num_id, player_name, division, record_date, data) VALUES (?, ?, ?, ?, ?, ?)",
+                self._row_values(table, record)
+            )
+        return record['id']
+
+    def upsert_many(self, table: str, records: Iterable[Dict]) -> int:
+        """
+        Insertar o reemplazar registros por ID en una sola transacción
+
+        Returns:
+            int: Cantidad de registros escritos
+        """
+        self._check_table(table)
+        rows = [self._row_values(table, record) for record in records if record.get('id') is not None]
+        if not rows:
+            return 0
+        with self._transaction() as conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO {table} (id, num_id, player_name, division, record_date, data) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        return len(rows)
+
+    def insert_missing(self, table: str, records: Iterable[Dict]) -> int:
+        """
+        Insertar registros cuyo ID todavía no existe (los existentes no se tocan)
+
+        Returns:
+            int: Cantidad de registros insertados
+        """
+        self._check_table(table)
+        rows = [self._row_values(table, record) for record in records if record.get('id') is not None]
+        if not rows:
+            return 0
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                f"INSERT OR IGNORE INTO {table} (id, num_id, player_name, division, record_date, data) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            return conn.total_changes - before
+
+    def delete_many(self, table: str, record_ids: Iterable) -> int:
+        """Eliminar registros por ID"""
+        self._check_table(table)
+        ids = [(str(record_id),) for record_id in record_ids]
+        if not ids:
+            return 0
+        with self._transaction() as conn:
+            conn.executemany(f"DELETE FROM {table} WHERE id = ?", ids)
+        return len(ids)
+
+    def ids_with_prefix(self, table: str, prefix: str) -> set:
+        """IDs (texto) que empiezan con `prefix` (rango sobre la clave primaria)"""
+        self._check_table(table)
+        rows = self._connection().execute(
+            f"SELECT id FROM {table} WHERE id >= ? AND id < ?", (prefix, prefix + '\U0010ffff')
+        )
+        return {row[0] for row in rows}
+
+    def query(self, table: str, player_name: Optional[str] = None,
+              division: Optional[str] = None) -> List[Dict]:
+        """
+        Obtener registros (opcionalmente filtrados por jugador y/o división)
+
+        Returns:
+            List[Dict]: Registros en orden de alta
+        """
+        self._check_table(table)
+        conditions, params = [], []
+        if player_name is not None:
+            conditions.append("player_name = ?")
+            params.append(player_name)
+        if division is not None:
+            conditions.append("division = ?")
+            params.append(division)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        rows = self._connection().execute(f"SELECT data FROM {table} {where} ORDER BY rowid", params)
+        return [json.loads(row['data']) for row in rows]
+
+    def all(self, table: str) -> List[Dict]:
+        """Todos los registros de una tabla"""
+        return self.query(table)
+
+    def count(self, table: str) -> int:
+        """Cantidad de registros de una tabla"""
+        self._check_table(table)
+        return self._connection().execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def field_values(self, table: str, field: str) -> set:
+        """Valores distintos de un campo del registro (p. ej. 'timestamp')"""
+        self._check_table(table)
+        rows = self._connection().execute(
+            f"SELECT DISTINCT json_extract(data, ?) FROM {table}", (f"$.{field}",)
+        )
+        return {row[0] for row in rows if row[0] is not None}
+
+    def import_json(self, table: str, path: str, list_key: str,
+                    namespace: Optional[str] = None) -> int:
+        """
+        Importar un archivo JSON heredado (una sola vez)
+
+        Los registros ya presentes en la base (p. ej. editados después de la
+        importación) nunca se reemplazan.
+
+        Args:
+            table (str): Tabla destino
+            path (str): Ruta del archivo JSON
+            list_key (str): Clave de la lista de registros
+            namespace (Optional[str]): Prefijo de los IDs ('data' -> 'data:5')
+
+        Returns:
+            int: Registros importados (0 si no existe o ya se importó)
+        """
+        if not os.path.exists(path):
+            return 0
+
+        meta_key = f"imported:{os.path.abspath(path)}"
+        conn = self._connection()
+        if conn.execute("SELECT 1 FROM meta WHERE key = ?", (meta_key,)).fetchone():
+            return 0
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return 0
+
+        records = data.get(list_key, []) if isinstance(data, dict) else []
+        if namespace:
+            records = [
+                dict(record, id=f"{namespace}:{record['id']}")
+                for record in records if record.get('id') is not None
+            ]
+        imported = self.insert_missing(table, records)
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES (?, ?)",
+                (meta_key, str(os.path.getmtime(path)))
+            )
+        return imported
+
+    def import_legacy_json(self) -> Dict[str, int]:
+        """Importar todos los archivos JSON heredados conocidos"""
+        imported = {}
+        for table, path, list_key, namespace in LEGACY_JSON_FILES:
+            imported[table] = imported.get(table, 0) + self.import_json(table, path, list_key, namespace)
+        return imported
+
+
+class _Transaction:
+    """Context manager BEGIN IMMEDIATE / COMMIT / ROLLBACK"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.conn.execute('COMMIT')
+        else:
+            self.conn.execute('ROLLBACK')
+        return False
+
+
+_store: Optional[LocalStore] = None
+_store_lock = threading.Lock()
+
+
+def get_local_store() -> LocalStore:
+    """Almacén local compartido por el proceso (importa los JSON heredados la primera vez)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = LocalStore()
+            _store.import_legacy_json()
+        return _store
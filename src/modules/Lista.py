@@ -2,8 +2,102 @@ import streamlit as st
 import pandas as pd
 import gspread
 import time
-from datetime import datetime, date
+import numpy as np
+from datetime import datetime, date, timedelta
 from src.modules.administracion import JugadoresMaestroManager
+from src.modules.asistencia_stats import compute_attendance_analytics
+from src.modules.html_fragments import frame_revision
+from src.modules.matriz_asistencia import obtener_matriz_asistencia
+from src.utils import fragmento
+
+# Recarga completa del historial (toma ediciones hechas directamente en la hoja)
+HISTORY_FULL_REFRESH_SECONDS = 15 * 60
+
+
+class HistorialAsistencias:
+    """
+    Historial de asistencias en memoria, ordenado por fecha
+    
+    - Columna 'Fecha' tipada (datetime64) y parseada una sola vez por fila
+    - Consultas por rango con búsqueda binaria sobre las fechas ordenadas
+    - Carga incremental: solo se agregan las filas nuevas de la hoja, verificando
+      que la última fila leída siga en su lugar (si no, hay que recargar todo)
+    """
+    
+    def __init__(self, headers):
+        self.headers = [str(h) for h in headers]
+        self.frame = pd.DataFrame(columns=self.headers)
+        self.rows_loaded = 1 if self.headers else 0  # Filas de la hoja ya leídas (incluye encabezado)
+        self.refreshed_at = 0.0
+        self.loaded_at = time.time()  # Última descarga completa
+        self.last_row = self._normalize_row(self.headers)  # Última fila leída, tal como está en la hoja
+        self._fechas = np.array([], dtype='datetime64[ns]')
+        self._revision = None
+    
+    def _normalize_row(self, row):
+        """Fila como tupla de texto del ancho del encabezado"""
+        width = len(self.headers)
+        return tuple(str(v) for v in row[:width]) + ('',) * (width - len(row))
+    
+    def matches_last_row(self, row):
+        """True si la fila coincide con la última leída (la hoja no se desplazó)"""
+        return self._normalize_row(row or []) == self.last_row
+    
+    @property
+    def revision(self):
+        """Revisión (hash de contenido) del historial; se recalcula solo tras agregar filas"""
+        if self._revision is None:
+            self._revision = frame_revision(self.frame)
+        return self._revision
+    
+    @property
+    def last_column(self):
+        """Letra de la última columna de la hoja (p. ej. 'H')"""
+        return gspread.utils.rowcol_to_a1(1, max(len(self.headers), 1)).rstrip('0123456789')
+    
+    def append_rows(self, rows):
+        """
+        Agregar filas leídas de la hoja (en el orden de la hoja)
+        
+        Args:
+            rows (list): Filas como listas de valores de texto
+        """
+        self.rows_loaded += len(rows)
+        if rows:
+            self.last_row = self._normalize_row(rows[-1])
+        width = len(self.headers)
+        rows = [list(row[:width]) + [''] * (width - len(row)) for row in rows if any(str(v).strip() for v in row)]
+        if not rows:
+            return
+        
+        nuevas = pd.DataFrame(rows, columns=self.headers)
+        if 'Fecha' in nuevas.columns:
+            nuevas['Fecha'] = pd.to_datetime(nuevas['Fecha'], format='%d/%m/%Y', errors='coerce')
+        
+        frame = pd.concat([self.frame, nuevas], ignore_index=True) if not self.frame.empty else nuevas
+        if 'Fecha' in frame.columns:
+            # Orden estable: los registros del mismo día conservan el orden de la hoja
+            frame = frame.sort_values('Fecha', kind='stable', na_position='last', ignore_index=True)
+            fechas = frame['Fecha'].to_numpy(dtype='datetime64[ns]')
+            self._fechas = fechas[:int(frame['Fecha'].notna().sum())]
+        self.frame = frame
+        self._revision = None
+    
+    def slice(self, fecha_desde, fecha_hasta):
+        """
+        Registros entre dos fechas (inclusive) por búsqueda binaria
+        
+        Returns:
+            pd.DataFrame: Copia de los registros del rango
+        """
+        if self.frame.empty or 'Fecha' not in self.frame.columns:
+            return self.frame.copy()
+        desde = np.datetime64(pd.Timestamp(fecha_desde).normalize(), 'ns')
+        hasta = np.datetime64(pd.Timestamp(fecha_hasta).normalize() + timedelta(days=1), 'ns')
+        inicio = int(np.searchsorted(self._fechas, desde, side='left'))
+        fin = int(np.searchsorted(self._fechas, hasta, side='left'))
+        return self.frame.iloc[inicio:fin].reset_index(drop=True)
+
 
 class AsistenciaManager:
     def __init__(self):
@@ -124,13 +218,17 @@ class AsistenciaManager:
                 # Rate limiting antes de operación batch
                 self.rate_limit_check()
                 
-                # Obtener siguiente fila vacía
-                all_values = sheet.get_all_values()
-                next_row = len(all_values) + 1
+                # Agregar todas las filas al final de la tabla en una sola petición
+                response = sheet.append_rows(rows_to_insert, value_input_option='RAW')
+                updated_range = (response or {}).get('updates', {}).get('updatedRange', '')
+                first_row = None
+                if updated_range:
+                    first_row, _ = gspread.utils.a1_to_rowcol(updated_range.split('!')[-1].split(':')[0])
                 
-                # Insertar todos los datos de una vez
-                range_name = f"A{next_row}:H{next_row + len(rows_to_insert) - 1}"
-                sheet.update(range_name, rows_to_insert)
+                # Agregar al historial en memoria si estaba al día con la hoja
+                history = st.session_state.sheets_cache.get('attendance_history')
+                if history is not None and first_row == history.rows_loaded + 1:
+                    history.append_rows(rows_to_insert)
                 
                 st.success(f"✅ {len(rows_to_insert)} registros guardados exitosamente")
             
@@ -144,46 +242,86 @@ class AsistenciaManager:
                 st.error(f"❌ Error guardando asistencia: {e}")
             return False
     
-    def get_attendance_report(self, fecha_desde=None, fecha_hasta=None):
-        """Obtener reporte de asistencias CON CACHE"""
-        cache_key = f"attendance_report_{fecha_desde}_{fecha_hasta}"
+    def get_attendance_history(self, force=False):
+        """
+        Historial completo de asistencias CON CACHE (carga incremental)
         
-        # Verificar cache (válido por 2 minutos para reportes)
-        if cache_key in st.session_state.sheets_cache:
-            cache_data = st.session_state.sheets_cache[cache_key]
-            if (time.time() - cache_data['timestamp']) < 120:  # 2 minutos
-                return cache_data['data']
+        La primera vez descarga la hoja completa; después, cada 2 minutos,
+        lee desde la última fila ya leída: si esa fila cambió (se borraron o
+        insertaron filas) se recarga todo, y si no solo se agregan las nuevas.
+        Cada 15 minutos se recarga la hoja completa para tomar ediciones.
+        
+        Args:
+            force (bool): Descargar nuevamente la hoja completa
+            
+        Returns:
+            HistorialAsistencias: Historial (None si nunca pudo cargarse)
+        """
+        history = st.session_state.sheets_cache.get('attendance_history')
+        if history is not None and not force and (time.time() - history.refreshed_at) < 120:  # 2 minutos
+            return history
         
         sheet = self.get_or_create_attendance_sheet()
         if not sheet:
-            return pd.DataFrame()
+            return history
         
         try:
             # Rate limiting
             self.rate_limit_check()
             
-            data = sheet.get_all_records()
-            df = pd.DataFrame(data)
-            
-            if not df.empty and fecha_desde and fecha_hasta:
-                # Filtrar por fechas si se especifican
-                df['Fecha'] = pd.to_datetime(df['Fecha'], format='%d/%m/%Y')
-                df = df[(df['Fecha'] >= fecha_desde) & (df['Fecha'] <= fecha_hasta)]
+            full_reload = (
+                history is None or force or history.rows_loaded < 1
+                or (time.time() - history.loaded_at) >= HISTORY_FULL_REFRESH_SECONDS
+            )
+            if not full_reload:
+                # Leer desde la última fila conocida: sirve de ancla para detectar desplazamientos
+                values = sheet.get(f"A{history.rows_loaded}:{history.last_column}")
+                if history.matches_last_row(values[0] if values else []):
+                    history.append_rows(values[1:])
+                else:
+                    full_reload = True
+                    self.rate_limit_check()
             
-            # Guardar en cache
-            st.session_state.sheets_cache[cache_key] = {
-                'data': df,
-                'timestamp': time.time()
-            }
+            if full_reload:
+                values = sheet.get_all_values()
+                history = HistorialAsistencias(values[0] if values else [])
+                history.append_rows(values[1:])
             
-            return df
+            history.refreshed_at = time.time()
+            st.session_state.sheets_cache['attendance_history'] = history
+            return history
             
         except Exception as e:
             if "RATE_LIMIT_EXCEEDED" in str(e) or "429" in str(e):
                 st.error("⏳ Límite de consultas excedido. Intente nuevamente en un minuto.")
             else:
                 st.error(f"❌ Error obteniendo reporte: {e}")
+            return history
+    
+    def get_attendance_report(self, fecha_desde=None, fecha_hasta=None):
+        """Obtener reporte de asistencias (rango de fechas sobre el historial cacheado)"""
+        history = self.get_attendance_history()
+        if history is None:
             return pd.DataFrame()
+        
+        if fecha_desde and fecha_hasta:
+            return history.slice(fecha_desde, fecha_hasta)
+        
+        return history.frame.copy()
+    
+    def get_attendance_analytics(self):
+        """Analítica de asistencia de todo el historial (memoizada por revisión)"""
+        history = self.get_attendance_history()
+        if history is None:
+            return None
+        return compute_attendance_analytics(history.frame, history.revision)
+    
+    def get_attendance_matrix(self):
+        """Matriz jugadores × sesiones (bitsets) del historial (memoizada por revisión)"""
+        history = self.get_attendance_history()
+        if history is None:
+            return None
+        return obtener_matriz_asistencia(history.frame, history.revision)
 
 def main_lista():
     """Función principal del módulo Lista - INTERFAZ LIMPIA"""
@@ -331,6 +469,7 @@ def main_lista():
     with tab2:
         mostrar_reportes()
 
+@fragmento
 def mostrar_pasar_lista():
     """Mostrar interfaz para pasar lista CON CACHE DE JUGADORES"""
     st.subheader("📱 Lista por Categoría")
@@ -367,7 +506,7 @@ def mostrar_pasar_lista():
     # Toggle para cambiar layout
     layout_mode = st.radio(
         "Modo de vista:",
-        ["📱 Móvil (Vertical)", "💻 Tablet (Horizontal)"],
+        ["📋 Grilla (Rápida)", "📱 Móvil (Vertical)", "💻 Tablet (Horizontal)"],
         horizontal=True,
         key="layout_toggle"
     )
@@ -419,6 +558,11 @@ def mostrar_pasar_lista():
     st.markdown(f"### 👥 {categoria} - {fecha.strftime('%d/%m/%Y')}")
     st.markdown(f"**Actividad:** {actividad} | **Total:** {len(jugadores_categoria)} jugadores")
     
+    # **MODO GRILLA: un único editor para toda la lista**
+    if "Grilla" in layout_mode:
+        mostrar_lista_grilla(manager, jugadores_categoria, fecha, categoria, actividad)
+        return
+    
     # Usar session state para mantener estado
     if 'attendance_data' not in st.session_state:
         st.session_state.attendance_data = {}
@@ -693,6 +837,178 @@ def mostrar_pasar_lista():
                     st.session_state.attendance_data[dni]['observaciones'] = "Marcado como lesionado"
                     st.rerun()
 
+ESTADOS_LISTA = {
+    "✅ Presente": "Presente",
+    "❌ Ausente": "Ausente",
+    "🩹 Lesionado": "Lesionado"
+}
+
+
+def _roll_call_key(fecha, categoria, actividad):
+    """Clave de la lista en session_state (una por fecha/categoría/actividad)"""
+    return f"roll_call_{fecha.isoformat()}_{categoria}_{actividad}"
+
+
+def _estado_lista(jugadores_categoria, key):
+    """
+    Estado vectorizado de la lista, indexado por DNI
+    
+    Se crea una sola vez por lista; si cambia el plantel se reindexa
+    conservando las marcas de los jugadores que siguen.
+    """
+    dnis = jugadores_categoria['DNI'].astype(str).str.strip()
+    base = pd.DataFrame({
+        'Sel.': False,
+        'Nombre': jugadores_categoria['Nombre'].to_numpy(),
+        'Apellido': jugadores_categoria['Apellido'].to_numpy(),
+        'Posición': jugadores_categoria.get('Posicion', pd.Series('N/A', index=jugadores_categoria.index)).fillna('N/A').to_numpy(),
+        'Estado': "✅ Presente",
+        'Observaciones': "",
+    }, index=pd.Index(dnis.to_numpy(), name='DNI'))
+    base = base[~base.index.duplicated()]
+    
+    lista = st.session_state.get(key)
+    if lista is None:
+        lista = {'data': base, 'version': 0}
+    elif not lista['data'].index.equals(base.index):
+        previo = lista['data'].reindex(base.index)
+        marcados = previo['Estado'].notna()
+        base.loc[marcados, ['Estado', 'Observaciones']] = previo.loc[marcados, ['Estado', 'Observaciones']]
+        lista = {'data': base, 'version': lista['version'] + 1}
+    st.session_state[key] = lista
+    return lista
+
+
+def _aplicar_ediciones(lista, editor_key):
+    """Incorporar las ediciones pendientes del editor al estado de la lista"""
+    cambios = st.session_state.get(editor_key, {}).get('edited_rows', {})
+    data = lista['data'].copy()
+    for posicion, valores in cambios.items():
+        for columna, valor in valores.items():
+            data.iloc[int(posicion), data.columns.get_loc(columna)] = valor
+    return data
+
+
+def _guardar_ediciones(key, editor_key):
+    """
+    Incorporar cada edición de la grilla al estado de la lista (on_change)
+    
+    El estado del widget se descarta al cambiar de vista o de página; así la
+    lista tomada hasta el momento queda en st.session_state[key].
+    """
+    lista = st.session_state.get(key)
+    if lista is not None:
+        lista['data'] = _aplicar_ediciones(lista, editor_key)
+
+
+def _accion_masiva(key, editor_key, estado):
+    """Marcar con `estado` los jugadores seleccionados (o todos si no hay selección)"""
+    lista = st.session_state[key]
+    data = _aplicar_ediciones(lista, editor_key)
+    seleccion = data['Sel.'].to_numpy(dtype=bool, copy=True)
+    if not seleccion.any():
+        seleccion[:] = True
+    data.loc[seleccion, 'Estado'] = estado
+    data['Sel.'] = False
+    # Nueva versión del editor: descarta las ediciones ya incorporadas
+    st.session_state[key] = {'data': data, 'version': lista['version'] + 1}
+
+
+def mostrar_lista_grilla(manager, jugadores_categoria, fecha, categoria, actividad):
+    """
+    Pasar lista con un único editor de grilla
+    
+    El estado de toda la lista es un DataFrame indexado por DNI; las acciones
+    masivas se aplican como operaciones sobre columnas (sin recorrer jugadores)
+    y cada cambio solo actualiza la grilla y el resumen.
+    
+    Args:
+        manager (AsistenciaManager): Gestor de asistencias
+        jugadores_categoria (pd.DataFrame): Jugadores activos de la categoría
+        fecha (date): Fecha de la sesión
+        categoria (str): Categoría
+        actividad (str): Tipo de actividad
+    """
+    key = _roll_call_key(fecha, categoria, actividad)
+    lista = _estado_lista(jugadores_categoria, key)
+    editor_key = f"{key}_editor_{lista['version']}"
+    
+    st.markdown("#### ⚡ Acciones Rápidas")
+    st.caption("Se aplican a los jugadores tildados en 'Sel.' o, si no hay ninguno, a toda la lista")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.button("👥 PRESENTES", use_container_width=True, key=f"{key}_presentes",
+                  on_click=_accion_masiva, args=(key, editor_key, "✅ Presente"))
+    with col2:
+        st.button("❌ AUSENTES", use_container_width=True, key=f"{key}_ausentes",
+                  on_click=_accion_masiva, args=(key, editor_key, "❌ Ausente"))
+    with col3:
+        st.button("🩹 LESIONADOS", use_container_width=True, key=f"{key}_lesionados",
+                  on_click=_accion_masiva, args=(key, editor_key, "🩹 Lesionado"))
+    
+    st.markdown("#### 📋 Lista de Jugadores")
+    editado = st.data_editor(
+        lista['data'],
+        key=editor_key,
+        use_container_width=True,
+        height=min(38 * (len(lista['data']) + 1), 800),
+        num_rows="fixed",
+        disabled=['Nombre', 'Apellido', 'Posición'],
+        on_change=_guardar_ediciones,
+        args=(key, editor_key),
+        column_config={
+            "Sel.": st.column_config.CheckboxColumn("Sel.", width="small"),
+            "Estado": st.column_config.SelectboxColumn(
+                "Estado", options=list(ESTADOS_LISTA), required=True, width="medium"
+            ),
+            "Observaciones": st.column_config.TextColumn(
+                "Observaciones", help="Ej: Llegó tarde, dolor rodilla..."
+            ),
+        }
+    )
+    
+    # **Resumen (conteo vectorizado)**
+    estados = editado['Estado'].map(ESTADOS_LISTA)
+    conteo = estados.value_counts()
+    total = len(editado)
+    presentes = int(conteo.get('Presente', 0))
+    ausentes = int(conteo.get('Ausente', 0))
+    lesionados = int(conteo.get('Lesionado', 0))
+    
+    st.markdown("### 📊 Resumen de Asistencia")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("👥 Total", total)
+    with col2:
+        st.metric("✅ Presentes", presentes)
+    with col3:
+        st.metric("❌ Ausentes", ausentes)
+    with col4:
+        st.metric("🩹 Lesionados", lesionados)
+    
+    activos = presentes + lesionados
+    porcentaje = (activos / total * 100) if total > 0 else 0
+    st.progress(porcentaje / 100, text=f"📈 Participación Activa: {activos}/{total} ({porcentaje:.1f}%) - incluye presentes + lesionados")
+    
+    if st.button("💾 GUARDAR LISTA DE ASISTENCIA", use_container_width=True, type="primary", key=f"{key}_guardar"):
+        attendance_list = pd.DataFrame({
+            'dni': editado.index,
+            'nombre': editado['Nombre'].to_numpy(),
+            'apellido': editado['Apellido'].to_numpy(),
+            'estado_asistencia': estados.to_numpy(),
+            'observaciones': editado['Observaciones'].fillna('').to_numpy(),
+            'posicion': editado['Posición'].to_numpy(),
+        }).to_dict('records')
+        
+        with st.spinner("💾 Guardando en Google Sheets..."):
+            if manager.save_attendance(attendance_list, fecha, categoria, actividad):
+                del st.session_state[key]
+                st.balloons()
+                time.sleep(1)
+                st.rerun()
+
+
+@fragmento
 def mostrar_reportes():
     """Mostrar reportes de asistencia RESPONSIVE"""
     st.subheader("📊 Reportes de Asistencia")
@@ -737,9 +1053,10 @@ def mostrar_reportes():
             
             # Calcular métricas
             total_registros = len(df_asistencias)
-            total_presentes = len(df_asistencias[df_asistencias[estado_column] == 'Presente'])
-            total_ausentes = len(df_asistencias[df_asistencias[estado_column] == 'Ausente'])
-            total_lesionados = len(df_asistencias[df_asistencias[estado_column] == 'Lesionado'])
+            conteo_estados = df_asistencias[estado_column].value_counts()
+            total_presentes = int(conteo_estados.get('Presente', 0))
+            total_ausentes = int(conteo_estados.get('Ausente', 0))
+            total_lesionados = int(conteo_estados.get('Lesionado', 0))
             
             # Participación = Presente + Lesionado (están físicamente)
             participacion_total = total_presentes + total_lesionados
@@ -753,8 +1070,9 @@ def mostrar_reportes():
             
             # Calcular métricas formato antiguo
             total_registros = len(df_asistencias)
-            total_presentes = len(df_asistencias[df_asistencias[estado_column] == 'Presente'])
-            total_ausentes = len(df_asistencias[df_asistencias[estado_column] == 'Ausente'])
+            conteo_estados = df_asistencias[estado_column].value_counts()
+            total_presentes = int(conteo_estados.get('Presente', 0))
+            total_ausentes = int(conteo_estados.get('Ausente', 0))
             total_lesionados = 0  # No existe en formato antiguo
             
             participacion_total = total_presentes
@@ -868,6 +1186,12 @@ def mostrar_reportes():
         else:
             st.info("ℹ️ No hay datos para mostrar con los filtros aplicados")
         
+        # **ANALÍTICA DE TODO EL HISTORIAL**
+        mostrar_analitica_asistencia(
+            manager,
+            categoria_filter if 'categoria_filter' in locals() else "Todas"
+        )
+        
         # **DESCARGAR CSV - SOLO SI HAY DATOS**
         if not df_asistencias.empty:
             try:
@@ -886,5 +1210,82 @@ def mostrar_reportes():
         st.error(f"❌ Error procesando datos de asistencia: {e}")
         st.info("💡 Verifica que los datos en Google Sheets tengan el formato correcto")
 
+def mostrar_analitica_asistencia(manager, categoria="Todas"):
+    """
+    Mostrar la analítica de asistencia de la temporada completa
+    
+    Args:
+        manager (AsistenciaManager): Gestor con el historial cacheado
+        categoria (str): Categoría a mostrar ("Todas" para no filtrar)
+    """
+    analytics = manager.get_attendance_analytics()
+    if not analytics or analytics['resumen'].empty:
+        return
+    
+    st.markdown("### 📈 Analítica de la Temporada")
+    
+    resumen = analytics['resumen']
+    tasas = analytics['tasas_actividad']
+    evolucion = analytics['evolucion_categorias']
+    if categoria != "Todas":
+        resumen = resumen[resumen['Categoria'] == categoria]
+        tasas = tasas[tasas['Categoria'] == categoria]
+        evolucion = evolucion[[categoria]] if categoria in evolucion.columns else evolucion.iloc[:, :0]
+    
+    matriz = manager.get_attendance_matrix()
+    categoria_matriz = None if categoria == "Todas" else categoria
+    
+    tab_ranking, tab_actividad, tab_evolucion, tab_sesiones = st.tabs([
+        "🏅 Ranking y Rachas", "🏃 Por Actividad", "📅 Participación 4 semanas", "👥 Concurrencia"
+    ])
+    
+    with tab_ranking:
+        en_racha = int((resumen['Racha Ausencias'] >= 3).sum())
+        if en_racha:
+            st.warning(f"⚠️ {en_racha} jugador(es) con 3 o más ausencias consecutivas")
+        
+        if matriz is not None:
+            faltas = matriz.faltas_recientes(ultimas=5, minimo=3, categoria=categoria_matriz)
+            if not faltas.empty:
+                with st.expander(f"🚨 Faltaron 3 o más de sus últimas 5 sesiones ({len(faltas)})"):
+                    st.dataframe(faltas.drop(columns=['DNI']), use_container_width=True, hide_index=True)
+        st.dataframe(
+            resumen.drop(columns=['DNI']),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Última Sesión": st.column_config.DateColumn("Última Sesión", format="DD/MM/YYYY"),
+            }
+        )
+    
+    with tab_actividad:
+        st.dataframe(tasas.drop(columns=['DNI']), use_container_width=True, hide_index=True)
+    
+    with tab_evolucion:
+        if evolucion.empty:
+            st.info("ℹ️ Sin sesiones para graficar")
+        else:
+            st.line_chart(evolucion)
+            st.caption("Participación (Presente + Lesionado) en ventanas móviles de 4 semanas, por categoría")
+    
+    with tab_sesiones:
+        if matriz is None:
+            st.info("ℹ️ Sin sesiones registradas")
+        else:
+            concurrencia = matriz.concurrencia()
+            if categoria_matriz:
+                concurrencia = concurrencia[concurrencia['Categoria'] == categoria_matriz]
+            concurrencia = concurrencia.tail(30)
+            if concurrencia.empty:
+                st.info("ℹ️ Sin sesiones registradas")
+            else:
+                st.bar_chart(concurrencia.set_index('Fecha')[['Presente', 'Lesionado', 'Ausente']])
+                st.dataframe(
+                    concurrencia,
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={"Fecha": st.column_config.DateColumn("Fecha", format="DD/MM/YYYY")}
+                )
+
 if __name__ == "__main__":
     main_lista()
\ No newline at end of file
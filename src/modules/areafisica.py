@@ -8,6 +8,17 @@ from typing import Dict, List
 import gspread
 from google.oauth2.service_account import Credentials
 import os
+import textwrap
+
+try:
+    from .html_fragments import fragment_cache, frame_revision
+except ImportError:
+    from html_fragments import fragment_cache, frame_revision
+
+try:
+    from src.utils import fragmento
+except ImportError:
+    from utils import fragmento
 
 def get_google_credentials():
     """
@@ -87,6 +98,99 @@ def cargar_hoja(sheet_id: str, nombre_hoja: str, rutas_credenciales=None) -> pd.
         st.error(f"❌ Error al cargar la hoja: {e}")
         return pd.DataFrame()
 
+# Niveles del cubo de tests -> columna de la Base Test
+COLUMNAS_CUBO = {
+    "categoria": "Categoría",
+    "test": "Test",
+    "subtest": "Subtest",
+    "posicion": "Posición del jugador",
+    "jugador": "Nombre y Apellido",
+}
+NIVELES_CUBO = list(COLUMNAS_CUBO)
+
+
+class CuboTests:
+    """
+    Base Test pre-agregada por (categoria, test, subtest, posicion, jugador)
+    
+    - filas: registros originales con `valor` numérico, indexados por los niveles
+    - agregados: media, máximo, último, cantidad y suma de `valor` por combinación
+    Ambos con MultiIndex ordenado: cada filtro es una búsqueda, no un recorrido.
+    """
+    
+    def __init__(self, df: pd.DataFrame, fecha_col: str = "Marca temporal"):
+        filas = df.copy()
+        filas["_orden"] = range(len(filas))
+        for nivel, columna in COLUMNAS_CUBO.items():
+            filas[nivel] = filas[columna].fillna("").astype(str) if columna in filas.columns else ""
+        filas["valor"] = pd.to_numeric(filas["valor"].astype(str).str.replace(',', '.'), errors='coerce')
+        
+        # Orden cronológico para que 'ultimo' sea el registro más reciente
+        if fecha_col in filas.columns:
+            fechas = pd.to_datetime(filas[fecha_col], errors='coerce', dayfirst=True)
+            filas = filas.assign(_fecha=fechas).sort_values("_fecha", kind="stable", na_position="first")
+            filas = filas.drop(columns="_fecha")
+        
+        filas = filas.set_index(NIVELES_CUBO)
+        self.agregados = (
+            filas.groupby(level=NIVELES_CUBO, sort=True)["valor"]
+            .agg(media="mean", maximo="max", ultimo="last", cantidad="count", suma="sum")
+        )
+        self.filas = filas.sort_index()
+    
+    @staticmethod
+    def seleccionar(tabla: pd.DataFrame, **filtros) -> pd.DataFrame:
+        """
+        Sub-tabla por niveles: valor exacto, lista de valores o None (todos)
+        
+        Returns:
+            pd.DataFrame: Filas (o agregados) que cumplen todos los filtros
+        """
+        for nivel, valor in filtros.items():
+            if valor is None or tabla.empty:
+                continue
+            if isinstance(valor, (list, tuple, set)):
+                tabla = tabla[tabla.index.get_level_values(nivel).isin(list(valor))]
+            else:
+                try:
+                    tabla = tabla.xs(valor, level=nivel, drop_level=False)
+                except KeyError:
+                    tabla = tabla.iloc[0:0]
+        return tabla
+    
+    @staticmethod
+    def valores(tabla: pd.DataFrame, nivel: str) -> List[str]:
+        """Valores distintos de un nivel, ordenados"""
+        return sorted(tabla.index.get_level_values(nivel).unique())
+    
+    def registros(self, **filtros) -> pd.DataFrame:
+        """Registros originales que cumplen los filtros, en el orden de la hoja"""
+        filas = self.seleccionar(self.filas, **filtros)
+        return filas.sort_values("_orden").reset_index(drop=True).drop(columns="_orden")
+    
+    @staticmethod
+    def promedios_por_jugador(agregados: pd.DataFrame) -> pd.Series:
+        """Promedio de `valor` por jugador a partir de los agregados"""
+        por_jugador = agregados.groupby(level="jugador")[["suma", "cantidad"]].sum()
+        return por_jugador["suma"] / por_jugador["cantidad"].where(por_jugador["cantidad"] > 0)
+
+
+@st.cache_resource(ttl=300, show_spinner=False)
+def obtener_cubo_tests(sheet_id: str, nombre_hoja: str) -> CuboTests:
+    """
+    Cubo de la Base Test (se reconstruye solo si cambió la revisión de los datos)
+    
+    Raises:
+        ValueError: Si la hoja no pudo cargarse (no se cachea el fallo)
+    """
+    df = cargar_hoja(sheet_id, nombre_hoja)
+    if df.empty:
+        raise ValueError(f"No se pudo cargar la hoja '{nombre_hoja}'")
+    
+    revision = frame_revision(df)
+    return fragment_cache.render("cubo_tests", (sheet_id, nombre_hoja), revision, lambda: CuboTests(df))
+
+
 def resaltar_valores(s):
     # Reemplaza coma por punto y convierte a float
     s_float = pd.to_numeric(s.astype(str).str.replace(',', '.'), errors='coerce')
@@ -223,120 +327,118 @@ def mostrar_tabla_estilizada(df, valor_col, test_col, subtest_col):
     
     st.dataframe(styled_df, use_container_width=True, hide_index=True, height=600)
 
-def mostrar_grafico_top_bottom(df_filtrado, jugador_col, valor_col):
-    """
-    Crea visualización de alto impacto mostrando TOP 3 y BOTTOM 3 jugadores en contenedores separados
-    """
-    if df_filtrado.empty or len(df_filtrado) < 3:
-        st.warning("⚠️ Se necesitan al menos 3 registros para mostrar el gráfico comparativo")
-        return
-    
-    # Calcular promedio por jugador
-    df_promedio = df_filtrado.groupby(jugador_col)[valor_col].mean().reset_index()
-    df_promedio = df_promedio.sort_values(valor_col, ascending=False)
-    
-    # Obtener TOP 3 y BOTTOM 3
-    top_3 = df_promedio.head(3).copy()
-    bottom_3 = df_promedio.tail(3).copy()
-    
-    # Obtener nombre del test y unidad
-    nombre_test = df_filtrado['Test'].iloc[0] if 'Test' in df_filtrado.columns else "Test"
-    unidad = df_filtrado['unidad'].iloc[0] if 'unidad' in df_filtrado.columns else ""
-    
-    st.markdown(f"## Resultado de {nombre_test}")
-    
-    # Crear dos columnas principales
-    col_top, col_bottom = st.columns(2)
-    
-    # ============= CONTENEDOR TOP 3 =============
-    with col_top:
-        st.markdown(f"""
-            <div style='background: linear-gradient(135deg, #006B8F 0%, #004A6B 100%); 
+ENCABEZADO_TOP_BOTTOM = textwrap.dedent("""
+            <div style='background: linear-gradient(135deg, {fondo_1} 0%, {fondo_2} 100%); 
                         padding: 20px; 
                         border-radius: 15px; 
-                        box-shadow: 0 8px 16px rgba(0, 74, 107, 0.5);
+                        box-shadow: 0 8px 16px {sombra};
                         margin-bottom: 20px;'>
                 <h2 style='color: white; text-align: center; margin: 0;'>
-                    🏆 LÍDERES DE RENDIMIENTO - {nombre_test.upper()}
+                    {titulo}
                 </h2>
             </div>
-        """, unsafe_allow_html=True)
-        
-        for idx, (_, row) in enumerate(top_3.iterrows(), 1):
-            medalla = "🥇" if idx == 1 else "🥈" if idx == 2 else "🥉"
-            
-            st.markdown(f"""
-                <div style='background: linear-gradient(135deg, #B8E6D5 0%, #A2D5C6 100%);
+""").strip()
+
+TARJETA_TOP_BOTTOM = textwrap.dedent("""
+                <div style='background: linear-gradient(135deg, {fondo_1} 0%, {fondo_2} 100%);
                             padding: 20px;
                             border-radius: 12px;
                             margin: 10px 0;
-                            border-left: 5px solid #006B8F;
+                            border-left: 5px solid {acento};
                             box-shadow: 0 4px 8px rgba(0, 0, 0, 0.15);'>
                     <div style='display: flex; justify-content: space-between; align-items: center;'>
                         <div style='flex: 1;'>
-                            <h3 style='color: #004A6B; margin: 0 0 5px 0; font-size: 1.4em;'>
-                                {medalla} {row[jugador_col]}
+                            <h3 style='color: {color_nombre}; margin: 0 0 5px 0; font-size: 1.4em;'>
+                                {icono} {jugador}
                             </h3>
                             <p style='color: #2C3E50; margin: 0; font-size: 1.1em;'>
                                 📊 <strong>{nombre_test}</strong>
                             </p>
                         </div>
                         <div style='text-align: right;'>
-                            <h2 style='color: #006B8F; margin: 0; font-size: 2.5em; font-weight: bold;'>
-                                {row[valor_col]:.10g} <span style='font-size: 0.6em;'>{unidad}</span>
+                            <h2 style='color: {acento}; margin: 0; font-size: 2.5em; font-weight: bold;'>
+                                {valor:.10g} <span style='font-size: 0.6em;'>{unidad}</span>
                             </h2>
-                            <p style='color: #005A75; margin: 0; font-size: 0.9em;'>
-                                ⚡ Excelente
+                            <p style='color: {color_leyenda}; margin: 0; font-size: 0.9em;'>
+                                {leyenda}
                             </p>
                         </div>
                     </div>    
                 </div>       
-            """, unsafe_allow_html=True)
+""").strip()
+
+
+def _html_top_bottom(df_filtrado, jugador_col, valor_col, promedios=None):
+    """Fragmentos HTML de los contenedores TOP 3 / BOTTOM 3"""
+    # Promedio por jugador (precalculado por el cubo o agrupando los registros)
+    if promedios is None:
+        promedios = df_filtrado.groupby(jugador_col)[valor_col].mean()
+    df_promedio = promedios.sort_values(ascending=False)
+    
+    # Obtener TOP 3 y BOTTOM 3 (el peor primero)
+    top_3 = df_promedio.head(3)
+    bottom_3 = df_promedio.tail(3).iloc[::-1]
+    
+    # Obtener nombre del test y unidad
+    nombre_test = df_filtrado['Test'].iloc[0] if 'Test' in df_filtrado.columns else "Test"
+    unidad = df_filtrado['unidad'].iloc[0] if 'unidad' in df_filtrado.columns else ""
+    
+    top_html = [ENCABEZADO_TOP_BOTTOM.format(
+        fondo_1="#006B8F", fondo_2="#004A6B", sombra="rgba(0, 74, 107, 0.5)",
+        titulo=f"🏆 LÍDERES DE RENDIMIENTO - {nombre_test.upper()}"
+    )]
+    top_html += [
+        TARJETA_TOP_BOTTOM.format(
+            fondo_1="#B8E6D5", fondo_2="#A2D5C6", acento="#006B8F", color_nombre="#004A6B",
+            color_leyenda="#005A75", leyenda="⚡ Excelente", icono=icono, jugador=jugador,
+            nombre_test=nombre_test, valor=valor, unidad=unidad
+        )
+        for icono, (jugador, valor) in zip(["🥇", "🥈", "🥉"], top_3.items())
+    ]
+    
+    bottom_html = [ENCABEZADO_TOP_BOTTOM.format(
+        fondo_1="#C0392B", fondo_2="#922B21", sombra="rgba(146, 43, 33, 0.5)",
+        titulo=f"⚠️ ZONA DE ALERTA - {nombre_test.upper()}"
+    )]
+    bottom_html += [
+        TARJETA_TOP_BOTTOM.format(
+            fondo_1="#F5B7B1", fondo_2="#E8AAAA", acento="#C0392B", color_nombre="#922B21",
+            color_leyenda="#A93226", leyenda="💪 Mejorable", icono=icono, jugador=jugador,
+            nombre_test=nombre_test, valor=valor, unidad=unidad
+        )
+        for icono, (jugador, valor) in zip(["🔴", "🟠", "🟡"], bottom_3.items())
+    ]
+    
+    return {"nombre_test": nombre_test, "top": "\n".join(top_html), "bottom": "\n".join(bottom_html)}
+
+
+def mostrar_grafico_top_bottom(df_filtrado, jugador_col, valor_col, promedios=None):
+    """
+    Crea visualización de alto impacto mostrando TOP 3 y BOTTOM 3 jugadores en contenedores separados
+    """
+    if df_filtrado.empty or len(df_filtrado) < 3:
+        st.warning("⚠️ Se necesitan al menos 3 registros para mostrar el gráfico comparativo")
+        return
+    
+    # Fragmentos cacheados por la revisión de los datos filtrados
+    columnas = [c for c in (jugador_col, valor_col, 'Test', 'unidad') if c in df_filtrado.columns]
+    fragmentos = fragment_cache.render(
+        'top_bottom', (jugador_col, valor_col), frame_revision(df_filtrado[columnas]),
+        lambda: _html_top_bottom(df_filtrado, jugador_col, valor_col, promedios)
+    )
+    
+    st.markdown(f"## Resultado de {fragmentos['nombre_test']}")
+    
+    # Crear dos columnas principales
+    col_top, col_bottom = st.columns(2)
+    
+    # ============= CONTENEDOR TOP 3 =============
+    with col_top:
+        st.markdown(fragmentos["top"], unsafe_allow_html=True)
     
     # ============= CONTENEDOR BOTTOM 3 =============
     with col_bottom:
-        st.markdown(f"""
-            <div style='background: linear-gradient(135deg, #C0392B 0%, #922B21 100%); 
-                        padding: 20px; 
-                        border-radius: 15px; 
-                        box-shadow: 0 8px 16px rgba(146, 43, 33, 0.5);
-                        margin-bottom: 20px;'>
-                <h2 style='color: white; text-align: center; margin: 0;'>
-                    ⚠️ ZONA DE ALERTA - {nombre_test.upper()}
-                </h2>
-            </div>
-        """, unsafe_allow_html=True)
-        
-        for idx, (_, row) in enumerate(bottom_3.iloc[::-1].iterrows(), 1):
-            emoji_alerta = "🔴" if idx == 1 else "🟠" if idx == 2 else "🟡"
-            
-            st.markdown(f"""
-                <div style='background: linear-gradient(135deg, #F5B7B1 0%, #E8AAAA 100%);
-                            padding: 20px;
-                            border-radius: 12px;
-                            margin: 10px 0;
-                            border-left: 5px solid #C0392B;
-                            box-shadow: 0 4px 8px rgba(0, 0, 0, 0.15);'>
-                    <div style='display: flex; justify-content: space-between; align-items: center;'>
-                        <div style='flex: 1;'>
-                            <h3 style='color: #922B21; margin: 0 0 5px 0; font-size: 1.4em;'>
-                                {emoji_alerta} {row[jugador_col]}
-                            </h3>
-                            <p style='color: #2C3E50; margin: 0; font-size: 1.1em;'>
-                                📊 <strong>{nombre_test}</strong>
-                            </p>
-                        </div>
-                        <div style='text-align: right;'>
-                            <h2 style='color: #C0392B; margin: 0; font-size: 2.5em; font-weight: bold;'>
-                                {row[valor_col]:.10g} <span style='font-size: 0.6em;'>{unidad}</span>
-                            </h2>
-                            <p style='color: #A93226; margin: 0; font-size: 0.9em;'>
-                                💪 Mejorable
-                            </p>
-                        </div>
-                    </div>    
-                </div>        
-            """, unsafe_allow_html=True)
+        st.markdown(fragmentos["bottom"], unsafe_allow_html=True)
 
 
 def physical_area():
@@ -376,22 +478,28 @@ def physical_area():
     sheet_id = "180ikmYPmc1nxw5UZYFq9lDa0lGfLn_L-7Yb8CmwJAPM"
     nombre_hoja = "Base Test"
     
-    # Cargar datos con indicador de progreso
+    # Cargar datos (cubo pre-agregado, cacheado por revisión) con indicador de progreso
     with st.spinner("📊 Cargando datos desde Google Sheets..."):
-        df = cargar_hoja(sheet_id, nombre_hoja)
+        try:
+            cubo = obtener_cubo_tests(sheet_id, nombre_hoja)
+        except ValueError:
+            cubo = None
     
-    if df.empty:
+    if cubo is None:
         st.error("❌ No se pudo cargar la hoja 'Base Test'.")
         st.info("🔧 Verifica que las credenciales estén configuradas correctamente")
         return
 
-    categoria_col = "Categoría"
+    panel_filtros_fisicos(cubo)
+
+
+@fragmento
+def panel_filtros_fisicos(cubo: CuboTests):
+    """Filtros y resultados del área física (se re-ejecutan sin recargar la página)"""
     jugador_col = "Nombre y Apellido"
     test_col = "Test"
     subtest_col = "Subtest"
     valor_col = "valor"
-    fecha_col = "Marca temporal"
-    posicion_col = "Posición del jugador"
 
     st.markdown("### 🔎 Filtros Interactivos")
     
@@ -400,16 +508,20 @@ def physical_area():
     BACKS = ["Medio Scrum", "Apertura", "Centro", "Wing","Fullback"]
     
     filtros = {}
+    # Filtros aplicados al cubo: nivel -> valor exacto o lista de valores
+    seleccion = {}
 
     # 1️⃣ FILTRO: Categoría
-    categorias = sorted(df[categoria_col].dropna().unique())
+    categorias = CuboTests.valores(cubo.agregados, "categoria")
     filtros["categoria"] = st.selectbox("📁 Selecciona la categoría", options=categorias)
-    df_cat = df[df[categoria_col] == filtros["categoria"]]
+    seleccion["categoria"] = filtros["categoria"]
+    cubo_cat = CuboTests.seleccionar(cubo.agregados, categoria=filtros["categoria"])
 
     # 2️⃣ FILTRO: Test físico
-    tests = sorted(df_cat[test_col].dropna().unique())
+    tests = CuboTests.valores(cubo_cat, "test")
     filtros["test"] = st.selectbox("🏃 Selecciona el test físico", options=tests)
-    df_test = df_cat[df_cat[test_col] == filtros["test"]]
+    seleccion["test"] = filtros["test"]
+    cubo_test = CuboTests.seleccionar(cubo_cat, test=filtros["test"])
 
 
 
@@ -425,16 +537,15 @@ def physical_area():
     
     # Filtrar según grupo seleccionado
     if grupo_posicion == "Forwards":
-        df_grupo = df_test[df_test[posicion_col].isin(FORWARDS)]
+        seleccion["posicion"] = FORWARDS
     elif grupo_posicion == "Backs":
-        df_grupo = df_test[df_test[posicion_col].isin(BACKS)]
-    else:
-        df_grupo = df_test
+        seleccion["posicion"] = BACKS
+    cubo_grupo = CuboTests.seleccionar(cubo_test, posicion=seleccion.get("posicion"))
 
     # 4️⃣ FILTRO: Posición específica
     with col2:
-        # Obtener posiciones que realmente existen en el dataframe filtrado
-        posiciones_en_df = df_grupo[posicion_col].dropna().unique()
+        # Obtener posiciones que realmente existen en la selección
+        posiciones_en_df = CuboTests.valores(cubo_grupo, "posicion")
         
         # Filtrar solo las posiciones del grupo seleccionado que existen en los datos
         if grupo_posicion == "Forwards":
@@ -442,7 +553,7 @@ def physical_area():
         elif grupo_posicion == "Backs":
             posiciones = sorted([p for p in BACKS if p in posiciones_en_df])
         else:
-            posiciones = sorted(posiciones_en_df)
+            posiciones = posiciones_en_df
         
         filtros["posicion"] = st.selectbox(
             "🎯 Selecciona la posición específica",
@@ -451,12 +562,11 @@ def physical_area():
     
     # Aplicar filtro de posición
     if filtros["posicion"] != "Todas":
-        df_pos = df_grupo[df_grupo[posicion_col] == filtros["posicion"]]
-    else:
-        df_pos = df_grupo
+        seleccion["posicion"] = filtros["posicion"]
+    cubo_pos = CuboTests.seleccionar(cubo_grupo, posicion=seleccion.get("posicion"))
 
     # 5️⃣ FILTRO: Jugador
-    jugadores = sorted(df_pos[jugador_col].dropna().unique())
+    jugadores = CuboTests.valores(cubo_pos, "jugador")
     
     # Mostrar cantidad de jugadores disponibles
     st.caption(f"🔍 {len(jugadores)} jugadores disponibles en esta selección")
@@ -470,28 +580,27 @@ def physical_area():
 
     # Aplicar filtro de jugador solo si se seleccionó alguno
     if filtros["jugador"]:
-        df_jug = df_pos[df_pos[jugador_col].isin(filtros["jugador"])]
-    else:
-        df_jug = df_pos
+        seleccion["jugador"] = filtros["jugador"]
+    cubo_jug = CuboTests.seleccionar(cubo_pos, jugador=seleccion.get("jugador"))
 
     # 6️⃣ FILTRO: Subtest
-    subtests = sorted(df_jug[subtest_col].dropna().unique())
+    subtests = CuboTests.valores(cubo_jug, "subtest")
+    cubo_filtrado = cubo_jug
     if len(subtests) > 1:
         filtros["subtest"] = st.selectbox("⚙️ Selecciona el subtest", options=["Todos"] + subtests)
         if filtros["subtest"] != "Todos":
-            df_filtrado = df_jug[df_jug[subtest_col] == filtros["subtest"]]
-        else:
-            df_filtrado = df_jug
-    else:
-        df_filtrado = df_jug
+            seleccion["subtest"] = filtros["subtest"]
+            cubo_filtrado = CuboTests.seleccionar(cubo_jug, subtest=filtros["subtest"])
 
-      # Convertir valores
-    df_filtrado[valor_col] = df_filtrado[valor_col].astype(str).str.replace(',', '.')
-    df_filtrado[valor_col] = pd.to_numeric(df_filtrado[valor_col], errors='coerce')
+    # Registros de la selección (con `valor` ya numérico)
+    df_filtrado = cubo.registros(**seleccion)
 
     # Espacio visual entre filtros y resultados
     st.markdown("<br><br>", unsafe_allow_html=True)
-    mostrar_grafico_top_bottom(df_filtrado, jugador_col, valor_col)
+    mostrar_grafico_top_bottom(
+        df_filtrado, jugador_col, valor_col,
+        promedios=CuboTests.promedios_por_jugador(cubo_filtrado)
+    )
 
     st.markdown("---")
     
@@ -5,6 +5,7 @@ Sistema completo de captura y visualización de datos médicos
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, date, timedelta
@@ -60,6 +61,20 @@ except ImportError:
     except ImportError:
         AuthManager = None
 
+try:
+    from src.utils import fragmento
+except ImportError:
+    from utils import fragmento
+
+try:
+    from .html_fragments import MemoCache, frame_revision
+    from .figure_cache import cached_figure
+    from .series_temporales import agrupar_conteos, clase_traza, etiqueta_granularidad
+except ImportError:
+    from html_fragments import MemoCache, frame_revision
+    from figure_cache import cached_figure
+    from series_temporales import agrupar_conteos, clase_traza, etiqueta_granularidad
+
 import gspread
 from google.oauth2.service_account import Credentials
 
@@ -368,6 +383,129 @@ def test_google_connection():
             else:
                 st.sidebar.error(f"❌ Error: {result['message']}")
 
+# Clases de severidad de las métricas (coincidencia parcial, sin distinguir mayúsculas)
+CLASES_SEVERIDAD = ("Leve", "Moderada", "Grave")
+SIN_DATO = "__sin_dato__"
+
+# Índices memoizados: (revisión, columnas, limpieza) -> IndiceLesiones
+# (cache propio: los índices retienen el DataFrame y no deben competir con los fragmentos HTML)
+_INDEX_CACHE = MemoCache(max_size=4)
+
+# Cubos de tendencias memoizados: revisión -> CuboLesiones
+_CUBE_CACHE = MemoCache(max_size=4)
+
+
+class IndiceLesiones:
+    """
+    Índices de filtrado del Dashboard General
+
+    Se construyen una vez por revisión de datos:
+    - división -> posiciones de fila
+    - severidad -> posiciones de fila
+    - división × severidad -> cantidad de registros
+    Los filtros, las métricas y los gráficos se sirven desde estos índices
+    sin volver a recorrer el DataFrame.
+    """
+
+    def __init__(self, df: pd.DataFrame, col_division: str, col_severidad: str, limpiar: bool = False):
+        self.df = df
+        self.tiene_division = col_division in df.columns
+        self.tiene_severidad = col_severidad in df.columns
+
+        # Solo la severidad se limpia (la división se usa tal cual en los filtros)
+        division = self._columna(df, col_division)
+        severidad = self._columna(df, col_severidad, limpiar)
+
+        self.divisiones = sorted(division.dropna().unique().tolist(), key=str)
+        self.severidades = sorted(severidad.dropna().unique().tolist(), key=str)
+        self.filas_division = {k: np.asarray(v) for k, v in division.groupby(division).indices.items()}
+        self.filas_severidad = {k: np.asarray(v) for k, v in severidad.groupby(severidad).indices.items()}
+
+        self.conteos = pd.crosstab(division.fillna(SIN_DATO), severidad.fillna(SIN_DATO))
+
+        # Severidad -> clases de métrica a las que pertenece
+        etiquetas = self.conteos.columns.to_series()
+        self.clases = pd.DataFrame({
+            clase: etiquetas.astype(str).str.contains(clase, case=False, regex=False) & (etiquetas != SIN_DATO)
+            for clase in CLASES_SEVERIDAD
+        }).astype(int)
+
+    @staticmethod
+    def _columna(df, columna, limpiar=False):
+        if columna not in df.columns:
+            return pd.Series(np.nan, index=df.index, dtype=object)
+        valores = df[columna]
+        if not limpiar or pd.api.types.is_numeric_dtype(valores):
+            return valores
+        # Solo se recortan los textos: números y vacíos se conservan
+        return valores.map(lambda valor: valor.strip() if isinstance(valor, str) else valor)
+
+    def filas(self, division: str = 'Todas', severidad: str = 'Todas') -> np.ndarray:
+        """Posiciones de las filas que cumplen los filtros (intersección de índices)"""
+        filas = None
+        if division != 'Todas' and self.tiene_division:
+            filas = self.filas_division.get(division, np.array([], dtype=int))
+        if severidad != 'Todas' and self.tiene_severidad:
+            por_severidad = self.filas_severidad.get(severidad, np.array([], dtype=int))
+            filas = por_severidad if filas is None else np.intersect1d(filas, por_severidad, assume_unique=True)
+        return np.arange(len(self.df)) if filas is None else filas
+
+    def frame(self, division: str = 'Todas', severidad: str = 'Todas') -> pd.DataFrame:
+        """Registros filtrados (en el orden original de la hoja)"""
+        return self.df.iloc[self.filas(division, severidad)]
+
+    def conteo(self, division: str = 'Todas', severidad: str = 'Todas') -> pd.DataFrame:
+        """Sub-tabla división × severidad de la selección"""
+        tabla = self.conteos
+        if division != 'Todas' and self.tiene_division:
+            tabla = tabla.loc[tabla.index == division]
+        if severidad != 'Todas' and self.tiene_severidad:
+            tabla = tabla.loc[:, tabla.columns == severidad]
+        return tabla
+
+    def por_division(self, division: str = 'Todas', severidad: str = 'Todas') -> pd.Series:
+        """Cantidad de registros por división (equivale a value_counts)"""
+        conteo = self.conteo(division, severidad).sum(axis=1)
+        conteo = conteo[(conteo.index != SIN_DATO) & (conteo > 0)]
+        return conteo.sort_values(ascending=False, kind="stable")
+
+    def por_severidad(self, division: str = 'Todas', severidad: str = 'Todas') -> pd.Series:
+        """Cantidad de registros por severidad informada (sin vacíos)"""
+        conteo = self.conteo(division, severidad).sum(axis=0)
+        conteo = conteo[(conteo.index != SIN_DATO) & (conteo.index != '') & (conteo > 0)]
+        return conteo.sort_values(ascending=False, kind="stable")
+
+    def por_clase(self, division: str = 'Todas', severidad: str = 'Todas') -> Dict[str, int]:
+        """Registros Leves / Moderados / Graves de la selección"""
+        por_severidad = self.conteo(division, severidad).sum(axis=0)
+        totales = por_severidad.to_numpy() @ self.clases.loc[por_severidad.index].to_numpy()
+        return {clase: int(total) for clase, total in zip(CLASES_SEVERIDAD, totales)}
+
+
+def obtener_indice_lesiones(df: pd.DataFrame, col_division: str, col_severidad: str,
+                            limpiar: bool = False, revision: str = None) -> IndiceLesiones:
+    """Índice de lesiones memoizado por revisión de datos"""
+    key = (revision or frame_revision(df), col_division, col_severidad, limpiar)
+    return _INDEX_CACHE.get_or_build(key, lambda: IndiceLesiones(df, col_division, col_severidad, limpiar))
+
+
+def _figura_barras_division(conteo: pd.Series, colores: List[str]):
+    """Barras de lesiones por división"""
+    fig = px.bar(
+        x=conteo.index,
+        y=conteo.values,
+        color_discrete_sequence=colores
+    )
+    
+    fig.update_layout(
+        showlegend=False,
+        xaxis_title="División",
+        yaxis_title="Cantidad",
+        height=400
+    )
+    return fig
+
+
 def mostrar_graficos_interactivos(df):
     """
     Muestra gráficos interactivos con filtros
@@ -378,9 +516,9 @@ def mostrar_graficos_interactivos(df):
     col_categoria = 'Categoría'
     col_severidad = 'Severidad de la lesión'
     
-    # Limpiar datos
-    if col_severidad in df.columns:
-        df[col_severidad] = df[col_severidad].str.strip()
+    # Índices por revisión (la severidad se limpia en el índice, sin modificar df)
+    revision = frame_revision(df)
+    indice = obtener_indice_lesiones(df, col_categoria, col_severidad, limpiar=True, revision=revision)
     
     # Gráficos
     if col_categoria in df.columns and not df.empty:
@@ -388,19 +526,10 @@ def mostrar_graficos_interactivos(df):
         
         with col1:
             st.markdown("#### 📊 Lesiones por División")
-            categorias_counts = df[col_categoria].value_counts()
-            
-            fig = px.bar(
-                x=categorias_counts.index,
-                y=categorias_counts.values,
-                color_discrete_sequence=['#1e40af', '#2563eb', '#3b82f6']
-            )
-            
-            fig.update_layout(
-                showlegend=False,
-                xaxis_title="División",
-                yaxis_title="Cantidad",
-                height=400
+            fig = cached_figure(
+                "graficos_lesiones_por_division", df, (),
+                lambda: _figura_barras_division(indice.por_division(), ['#1e40af', '#2563eb', '#3b82f6']),
+                revision=revision
             )
             
             st.plotly_chart(fig, use_container_width=True)
@@ -408,15 +537,21 @@ def mostrar_graficos_interactivos(df):
         with col2:
             if col_severidad in df.columns:
                 st.markdown("#### 🎯 Distribución por Severidad")
-                severidad_counts = df[col_severidad].value_counts()
                 
-                fig_pie = px.pie(
-                    values=severidad_counts.values,
-                    names=severidad_counts.index,
-                    color_discrete_sequence=['#22c55e', '#eab308', '#ef4444', '#dc2626']
-                )
+                def construir_torta():
+                    severidad_counts = indice.conteo().sum(axis=0).drop(SIN_DATO, errors='ignore')
+                    severidad_counts = severidad_counts[severidad_counts > 0].sort_values(ascending=False, kind="stable")
+                    
+                    fig = px.pie(
+                        values=severidad_counts.values,
+                        names=severidad_counts.index,
+                        color_discrete_sequence=['#22c55e', '#eab308', '#ef4444', '#dc2626']
+                    )
+                    
+                    fig.update_layout(height=400)
+                    return fig
                 
-                fig_pie.update_layout(height=400)
+                fig_pie = cached_figure("graficos_severidad", df, (), construir_torta, revision=revision)
                 st.plotly_chart(fig_pie, use_container_width=True)
 
 
@@ -443,25 +578,31 @@ def mostrar_timeline_lesiones(df):
     if 'Fecha' in df.columns and not df.empty:
         st.markdown("#### 📅 Timeline de Lesiones")
         
-        # Convertir fechas
-        df_timeline = df.copy()
-        df_timeline['Fecha'] = pd.to_datetime(df_timeline['Fecha'], errors='coerce')
-        df_timeline = df_timeline.dropna(subset=['Fecha'])
-        
-        if not df_timeline.empty:
-            # Agrupar por fecha
-            lesiones_por_fecha = df_timeline.groupby(df_timeline['Fecha'].dt.date).size().reset_index()
-            lesiones_por_fecha.columns = ['Fecha', 'Cantidad']
+        def construir_timeline():
+            # Agrupar por día, semana o mes según el rango de fechas
+            conteo, granularidad = agrupar_conteos(df['Fecha'])
+            if conteo.empty:
+                return None
             
-            fig = px.line(
-                lesiones_por_fecha, 
-                x='Fecha', 
-                y='Cantidad',
-                title="Evolución Temporal de Lesiones",
-                markers=True
-            )
+            traza = clase_traza(len(conteo))
+            fig = go.Figure(traza(
+                x=conteo.index,
+                y=conteo.values,
+                mode='lines+markers',
+                name='Cantidad',
+                hovertemplate="<b>%{x|%d/%m/%Y}</b><br>Lesiones: %{y}<extra></extra>"
+            ))
             
-            fig.update_layout(height=400)
+            fig.update_layout(
+                title=f"Evolución Temporal de Lesiones (por {etiqueta_granularidad(granularidad)})",
+                xaxis_title='Fecha',
+                yaxis_title='Cantidad',
+                height=400
+            )
+            return fig
+        
+        fig = cached_figure("timeline_lesiones", df[['Fecha']], (), construir_timeline)
+        if fig is not None:
             st.plotly_chart(fig, use_container_width=True)
 
 def mostrar_estadisticas_avanzadas(df):
@@ -497,6 +638,152 @@ def mostrar_estadisticas_avanzadas(df):
                     st.write(f"🏈 {division}: {cantidad} ({porcentaje:.1f}%)")
 
 
+class CuboLesiones:
+    """
+    Cubo pre-agregado de lesiones para el Análisis de Tendencias
+
+    Cantidad de lesiones por mes × división × parte del cuerpo × tipo de
+    lesión × severidad, construido una vez por revisión de datos. Los
+    filtros del tablero son cortes del cubo: los meses completos del rango
+    salen del cubo y solo los meses incompletos de los bordes se cuentan
+    desde la tabla de filas (ordenada por fecha, búsqueda binaria), que
+    también sirve la tabla de detalle.
+    """
+
+    DIMENSIONES = ["division", "parte", "tipo", "severidad"]
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.col_division = 'Categoría' if 'Categoría' in df.columns else None
+        self.col_severidad = 'Severidad de la Lesión' if 'Severidad de la Lesión' in df.columns else None
+        self.col_parte = next(
+            (col for col in df.columns if 'parte' in col.lower() or 'cuerpo' in col.lower() or 'zona' in col.lower()),
+            None
+        )
+        self.col_tipo = next(
+            (col for col in df.columns if 'tipo' in col.lower() or 'diagnóstico' in col.lower()),
+            None
+        )
+        self.tiene_fechas = 'Fecha' in df.columns
+
+        def dimension(columna):
+            return df[columna].to_numpy(dtype=object) if columna else np.full(len(df), np.nan, dtype=object)
+
+        fecha = pd.to_datetime(df['Fecha'], errors='coerce') if self.tiene_fechas else pd.Series(pd.NaT, index=df.index)
+        fecha = fecha.dt.normalize()
+        filas = pd.DataFrame({
+            "fecha": fecha.to_numpy(),
+            "mes": fecha.dt.to_period('M').dt.start_time.to_numpy(),
+            "division": dimension(self.col_division),
+            "parte": dimension(self.col_parte),
+            "tipo": dimension(self.col_tipo),
+            "severidad": dimension(self.col_severidad),
+            "posicion": np.arange(len(df)),
+        })
+        # Filas ordenadas por fecha (sin fecha al final): bordes del rango y detalle
+        self.filas = filas.sort_values("fecha", kind="stable", na_position="last", ignore_index=True)
+        self._fechas = self.filas["fecha"].to_numpy()[:int(self.filas["fecha"].notna().sum())]
+
+        # Cubo mensual, ordenado por mes (sin fecha al final)
+        self.cubo = self._agregar(self.filas).sort_values("mes", kind="stable", na_position="last", ignore_index=True)
+        self._meses = self.cubo["mes"].to_numpy()[:int(self.cubo["mes"].notna().sum())]
+
+    @classmethod
+    def _agregar(cls, filas: pd.DataFrame) -> pd.DataFrame:
+        return (
+            filas.groupby(["mes"] + cls.DIMENSIONES, dropna=False, sort=False)
+            .size()
+            .rename("cantidad")
+            .reset_index()
+        )
+
+    def valores(self, dimension: str) -> List:
+        """Valores disponibles de una dimensión (para los filtros)"""
+        return sorted(self.cubo[dimension].dropna().unique().tolist(), key=str)
+
+    def rango_fechas(self):
+        """(fecha mínima, fecha máxima) o None si no hay fechas válidas"""
+        if len(self._fechas) == 0:
+            return None
+        return pd.Timestamp(self._fechas[0]).date(), pd.Timestamp(self._fechas[-1]).date()
+
+    @staticmethod
+    def _entre(tabla, claves, desde, hasta):
+        """Filas de una tabla ordenada con desde <= clave < hasta (búsqueda binaria)"""
+        inicio = int(np.searchsorted(claves, np.datetime64(desde, 'ns'), side='left'))
+        fin = int(np.searchsorted(claves, np.datetime64(hasta, 'ns'), side='left'))
+        return tabla.iloc[inicio:fin]
+
+    @staticmethod
+    def _filtrar(tabla, division, parte):
+        if division != 'Todas':
+            tabla = tabla[tabla["division"] == division]
+        if parte != 'Todas':
+            tabla = tabla[tabla["parte"] == parte]
+        return tabla
+
+    def seleccionar(self, rango=None, division='Todas', parte='Todas') -> pd.DataFrame:
+        """Corte del cubo (celdas mensuales con su cantidad)"""
+        if not rango:
+            return self._filtrar(self.cubo, division, parte)
+
+        desde = pd.Timestamp(rango[0]).normalize()
+        hasta = pd.Timestamp(rango[1]).normalize() + pd.Timedelta(days=1)
+        # Meses completos dentro de [desde, hasta)
+        primer_mes = desde.to_period('M').start_time
+        completos_desde = desde if desde == primer_mes else primer_mes + pd.offsets.MonthBegin(1)
+        completos_hasta = hasta.to_period('M').start_time
+
+        if completos_desde >= completos_hasta:
+            # Rango dentro de un mes (o de dos meses incompletos): solo filas
+            return self._filtrar(self._agregar(self._entre(self.filas, self._fechas, desde, hasta)), division, parte)
+
+        bordes = pd.concat([
+            self._entre(self.filas, self._fechas, desde, completos_desde),
+            self._entre(self.filas, self._fechas, completos_hasta, hasta),
+        ])
+        corte = pd.concat(
+            [self._entre(self.cubo, self._meses, completos_desde, completos_hasta), self._agregar(bordes)],
+            ignore_index=True
+        )
+        return self._filtrar(corte, division, parte)
+
+    def registros(self, rango=None, division='Todas', parte='Todas') -> pd.DataFrame:
+        """Registros originales del corte, en el orden de la hoja"""
+        filas = self.filas
+        if rango:
+            desde = pd.Timestamp(rango[0]).normalize()
+            filas = self._entre(filas, self._fechas, desde, pd.Timestamp(rango[1]).normalize() + pd.Timedelta(days=1))
+        filas = self._filtrar(filas, division, parte)
+        return self.df.iloc[np.sort(filas["posicion"].to_numpy())]
+
+    @staticmethod
+    def conteo(corte: pd.DataFrame, dimension: str) -> pd.Series:
+        """Lesiones por valor de una dimensión (equivale a value_counts)"""
+        conteo = corte.groupby(dimension, sort=True)["cantidad"].sum()
+        return conteo[conteo > 0].sort_values(ascending=False, kind="stable")
+
+    @staticmethod
+    def moda(conteo: pd.Series):
+        """Valor más frecuente (el menor en caso de empate, como Series.mode)"""
+        if conteo.empty:
+            return None
+        return sorted(conteo[conteo == conteo.max()].index, key=str)[0]
+
+    @staticmethod
+    def por_mes(corte: pd.DataFrame) -> pd.Series:
+        """Lesiones por mes (sin las que no tienen fecha)"""
+        conteo = corte.groupby("mes", sort=True)["cantidad"].sum()
+        conteo.index = conteo.index.to_period('M')
+        return conteo
+
+
+def obtener_cubo_lesiones(df: pd.DataFrame, revision: str = None) -> CuboLesiones:
+    """Cubo de tendencias memoizado por revisión de datos"""
+    return _CUBE_CACHE.get_or_build(revision or frame_revision(df), lambda: CuboLesiones(df))
+
+
+@fragmento
 def mostrar_dashboard_tendencias_lesiones(df):
     """
     Dashboard completo para análisis de tendencias de lesiones
@@ -515,17 +802,19 @@ def mostrar_dashboard_tendencias_lesiones(df):
     # ============================================
     st.markdown("### 🎯 Filtros de Análisis")
     
+    # Cubo pre-agregado (fechas interpretadas una sola vez por revisión de datos)
+    cubo = obtener_cubo_lesiones(df)
+    col_parte = cubo.col_parte
+    
     col_filtro1, col_filtro2, col_filtro3 = st.columns(3)
     
     with col_filtro1:
         # Filtro de Fechas
-        if 'Fecha' in df.columns:
-            df['Fecha_parsed'] = pd.to_datetime(df['Fecha'], errors='coerce')
-            fechas_validas = df['Fecha_parsed'].dropna()
+        if cubo.tiene_fechas:
+            limites = cubo.rango_fechas()
             
-            if not fechas_validas.empty:
-                fecha_min = fechas_validas.min().date()
-                fecha_max = fechas_validas.max().date()
+            if limites:
+                fecha_min, fecha_max = limites
                 
                 rango_fechas = st.date_input(
                     "📅 Rango de Fechas",
@@ -542,8 +831,8 @@ def mostrar_dashboard_tendencias_lesiones(df):
     
     with col_filtro2:
         # Filtro de Categoría
-        if 'Categoría' in df.columns:
-            categorias = ['Todas'] + sorted(df['Categoría'].dropna().unique().tolist())
+        if cubo.col_division:
+            categorias = ['Todas'] + cubo.valores("division")
             cat_seleccionada = st.selectbox(
                 "🏈 División",
                 categorias,
@@ -554,12 +843,9 @@ def mostrar_dashboard_tendencias_lesiones(df):
     
     with col_filtro3:
         # Filtro de Parte del Cuerpo (NUEVA FUNCIONALIDAD)
-        # Buscar posibles columnas que contengan partes del cuerpo
-        posibles_columnas_parte = [col for col in df.columns if 'parte' in col.lower() or 'cuerpo' in col.lower() or 'zona' in col.lower()]
-        
-        if posibles_columnas_parte:
-            col_parte = posibles_columnas_parte[0]
-            partes = ['Todas'] + sorted(df[col_parte].dropna().unique().tolist())
+        # Columna de partes del cuerpo (detectada al construir el cubo)
+        if col_parte:
+            partes = ['Todas'] + cubo.valores("parte")
             parte_seleccionada = st.selectbox(
                 "🎯 Parte del Cuerpo",
                 partes,
@@ -572,27 +858,21 @@ def mostrar_dashboard_tendencias_lesiones(df):
     # ============================================
     # APLICAR FILTROS
     # ============================================
-    df_analisis = df.copy()
-    
-    # Filtro de fechas
-    if rango_fechas and len(rango_fechas) == 2:
-        fecha_inicio, fecha_fin = rango_fechas
-        df_analisis = df_analisis[
-            (df_analisis['Fecha_parsed'].dt.date >= fecha_inicio) & 
-            (df_analisis['Fecha_parsed'].dt.date <= fecha_fin)
-        ]
-    
-    # Filtro de categoría
-    if cat_seleccionada != 'Todas' and 'Categoría' in df.columns:
-        df_analisis = df_analisis[df_analisis['Categoría'] == cat_seleccionada]
-    
-    # Filtro de parte del cuerpo
-    if parte_seleccionada != 'Todas' and posibles_columnas_parte:
-        df_analisis = df_analisis[df_analisis[col_parte] == parte_seleccionada]
+    # Corte del cubo: rango de fechas (búsqueda binaria) + división + parte
+    rango = tuple(rango_fechas) if rango_fechas and len(rango_fechas) == 2 else None
+    filtros = dict(
+        rango=rango,
+        division=cat_seleccionada if cubo.col_division else 'Todas',
+        parte=parte_seleccionada if col_parte else 'Todas'
+    )
+    corte = cubo.seleccionar(**filtros)
+    total_lesiones = int(corte["cantidad"].sum())
+    por_mes = CuboLesiones.por_mes(corte)
+    conteo_partes = CuboLesiones.conteo(corte, "parte")
     
     # Mostrar info de filtros
-    if not df_analisis.empty:
-        st.success(f"✅ **{len(df_analisis)} lesiones** en el período seleccionado")
+    if total_lesiones > 0:
+        st.success(f"✅ **{total_lesiones} lesiones** en el período seleccionado")
     else:
         st.warning("⚠️ No hay datos con los filtros seleccionados")
         return
@@ -607,7 +887,6 @@ def mostrar_dashboard_tendencias_lesiones(df):
     col_met1, col_met2, col_met3, col_met4 = st.columns(4)
     
     with col_met1:
-        total_lesiones = len(df_analisis)
         st.metric(
             "📋 Total Lesiones",
             total_lesiones,
@@ -616,11 +895,10 @@ def mostrar_dashboard_tendencias_lesiones(df):
     
     with col_met2:
         # Parte del cuerpo más afectada
-        if posibles_columnas_parte and col_parte in df_analisis.columns:
-            parte_mas_comun = df_analisis[col_parte].mode()
-            if not parte_mas_comun.empty:
-                parte_top = parte_mas_comun.iloc[0]
-                cantidad_parte = len(df_analisis[df_analisis[col_parte] == parte_top])
+        if col_parte:
+            parte_top = CuboLesiones.moda(conteo_partes)
+            if parte_top is not None:
+                cantidad_parte = int(conteo_partes[parte_top])
                 st.metric(
                     "🎯 Zona Crítica",
                     parte_top,
@@ -633,12 +911,12 @@ def mostrar_dashboard_tendencias_lesiones(df):
     
     with col_met3:
         # Gravedad predominante
-        if 'Severidad de la Lesión' in df_analisis.columns:
-            severidad_top = df_analisis['Severidad de la Lesión'].mode()
-            if not severidad_top.empty:
+        if cubo.col_severidad:
+            severidad_top = CuboLesiones.moda(CuboLesiones.conteo(corte, "severidad"))
+            if severidad_top is not None:
                 st.metric(
                     "⚠️ Severidad Predominante",
-                    severidad_top.iloc[0]
+                    severidad_top
                 )
             else:
                 st.metric("⚠️ Severidad Predominante", "N/A")
@@ -647,8 +925,8 @@ def mostrar_dashboard_tendencias_lesiones(df):
     
     with col_met4:
         # Promedio lesiones por mes
-        if 'Fecha_parsed' in df_analisis.columns:
-            meses_unicos = df_analisis['Fecha_parsed'].dt.to_period('M').nunique()
+        if cubo.tiene_fechas:
+            meses_unicos = int((por_mes > 0).sum())
             if meses_unicos > 0:
                 promedio_mes = total_lesiones / meses_unicos
                 st.metric(
@@ -674,8 +952,8 @@ def mostrar_dashboard_tendencias_lesiones(df):
     with col_graf1:
         st.markdown("#### 🏆 Top 5 Partes del Cuerpo Más Afectadas")
         
-        if posibles_columnas_parte and col_parte in df_analisis.columns:
-            top_partes = df_analisis[col_parte].value_counts().head(5)
+        if col_parte:
+            top_partes = conteo_partes.head(5)
             
             if not top_partes.empty:
                 fig_top = px.bar(
@@ -717,11 +995,9 @@ def mostrar_dashboard_tendencias_lesiones(df):
     with col_graf2:
         st.markdown("#### 📈 Evolución Temporal de Lesiones")
         
-        if 'Fecha_parsed' in df_analisis.columns:
-            df_timeline = df_analisis.copy()
-            df_timeline['Mes'] = df_timeline['Fecha_parsed'].dt.to_period('M').astype(str)
-            
-            lesiones_por_mes = df_timeline.groupby('Mes').size().reset_index(name='Cantidad')
+        if cubo.tiene_fechas:
+            lesiones_por_mes = por_mes[por_mes > 0].rename('Cantidad').rename_axis('Mes').reset_index()
+            lesiones_por_mes['Mes'] = lesiones_por_mes['Mes'].astype(str)
             
             if not lesiones_por_mes.empty:
                 fig_timeline = px.line(
@@ -763,12 +1039,9 @@ def mostrar_dashboard_tendencias_lesiones(df):
     with col_graf3:
         st.markdown("#### 🏥 Tipos de Lesión Más Frecuentes")
         
-        # Buscar columna de tipo de lesión
-        posibles_columnas_tipo = [col for col in df.columns if 'tipo' in col.lower() or 'diagnóstico' in col.lower()]
-        
-        if posibles_columnas_tipo:
-            col_tipo = posibles_columnas_tipo[0]
-            tipos_lesion = df_analisis[col_tipo].value_counts().head(5)
+        # Columna de tipo de lesión (detectada al construir el cubo)
+        if cubo.col_tipo:
+            tipos_lesion = CuboLesiones.conteo(corte, "tipo").head(5)
             
             if not tipos_lesion.empty:
                 fig_tipos = px.bar(
@@ -801,8 +1074,8 @@ def mostrar_dashboard_tendencias_lesiones(df):
     with col_graf4:
         st.markdown("#### 🏈 Distribución por Categoría")
         
-        if 'Categoría' in df_analisis.columns:
-            categorias_dist = df_analisis['Categoría'].value_counts()
+        if cubo.col_division:
+            categorias_dist = CuboLesiones.conteo(corte, "division")
             
             if not categorias_dist.empty:
                 fig_cat = px.pie(
@@ -837,8 +1110,8 @@ def mostrar_dashboard_tendencias_lesiones(df):
     with col_alert1:
         st.markdown("#### ⚠️ Zonas de Alto Riesgo")
         
-        if posibles_columnas_parte and col_parte in df_analisis.columns:
-            partes_criticas = df_analisis[col_parte].value_counts().head(3)
+        if col_parte:
+            partes_criticas = conteo_partes.head(3)
             
             for i, (parte, cantidad) in enumerate(partes_criticas.items(), 1):
                 porcentaje = (cantidad / total_lesiones) * 100
@@ -867,10 +1140,9 @@ def mostrar_dashboard_tendencias_lesiones(df):
     with col_alert2:
         st.markdown("#### 📊 Tendencias Temporales")
         
-        if 'Fecha_parsed' in df_analisis.columns and len(df_analisis) > 5:
+        if cubo.tiene_fechas and total_lesiones > 5:
             # Comparar último mes vs promedio
-            df_analisis['Mes_Num'] = df_analisis['Fecha_parsed'].dt.to_period('M')
-            lesiones_por_mes_num = df_analisis.groupby('Mes_Num').size()
+            lesiones_por_mes_num = por_mes[por_mes > 0]
             
             if len(lesiones_por_mes_num) >= 2:
                 ultimo_mes = lesiones_por_mes_num.iloc[-1]
@@ -906,6 +1178,7 @@ def mostrar_dashboard_tendencias_lesiones(df):
     st.markdown("### 📋 Detalle de Lesiones")
     
     with st.expander("📊 Ver tabla completa de datos", expanded=False):
+        df_analisis = cubo.registros(**filtros)
         st.dataframe(df_analisis, use_container_width=True, height=400)
         
         # Botón de descarga
@@ -922,6 +1195,161 @@ def mostrar_dashboard_tendencias_lesiones(df):
 # MODIFICAR LA FUNCIÓN MAIN PARA INCLUIR EL NUEVO DASHBOARD
 # ============================================
 
+@fragmento
+def panel_dashboard_general(df):
+    """Dashboard general: filtros, gráficos y listado de lesionados (rerun parcial)"""
+    col_categoria = 'Categoría'
+    col_severidad = 'Severidad de la Lesión'
+    
+    # Índices por división / severidad (una vez por revisión de datos)
+    revision = frame_revision(df)
+    indice = obtener_indice_lesiones(df, col_categoria, col_severidad, revision=revision)
+    
+    st.markdown("### 🔍 Filtros")
+    col_filtro1, col_filtro2 = st.columns(2)
+    
+    with col_filtro1:
+        if col_categoria in df.columns:
+            categorias_disponibles = ['Todas'] + indice.divisiones
+            categoria_seleccionada = st.selectbox(
+                "🏈 Seleccionar División",
+                categorias_disponibles,
+                key="area_medica_filtro_categoria"
+            )
+        else:
+            categoria_seleccionada = 'Todas'
+    
+    with col_filtro2:
+        if col_severidad in df.columns:
+            gravedades_disponibles = ['Todas'] + indice.severidades
+            gravedad_seleccionada = st.selectbox(
+                "⚠️ Seleccionar Gravedad",
+                gravedades_disponibles,
+                key="area_medica_filtro_gravedad"
+            )
+        else:
+            gravedad_seleccionada = 'Todas'
+    
+    df_filtrado = indice.frame(categoria_seleccionada, gravedad_seleccionada)
+    
+    info_filtros = []
+    if categoria_seleccionada != 'Todas':
+        info_filtros.append(f"**División:** {categoria_seleccionada}")
+    if gravedad_seleccionada != 'Todas':
+        info_filtros.append(f"**Gravedad:** {gravedad_seleccionada}")
+    
+    if info_filtros:
+        st.info(f"🔍 **Filtros activos:** {' | '.join(info_filtros)}")
+    
+    st.markdown("---")
+    
+    st.markdown("### 📊 Análisis de Lesiones")
+    col_grafico1, col_grafico2 = st.columns(2)
+    
+    with col_grafico1:
+        st.markdown("#### 📊 Lesiones por División")
+        if col_categoria in df_filtrado.columns and not df_filtrado.empty:
+            fig_bar = cached_figure(
+                "lesiones_por_division", df, (categoria_seleccionada, gravedad_seleccionada),
+                lambda: _figura_barras_division(
+                    indice.por_division(categoria_seleccionada, gravedad_seleccionada),
+                    ['#1e40af', '#2563eb', '#3b82f6', '#60a5fa']
+                ),
+                revision=revision
+            )
+    
+            st.plotly_chart(fig_bar, use_container_width=True)
+        else:
+            st.info("No hay datos para mostrar")
+    
+    with col_grafico2:
+        st.markdown("#### 🎯 Jugadores por Gravedad")
+        if col_severidad in df_filtrado.columns and not df_filtrado.empty:
+            def construir_torta():
+                severidad_counts = indice.por_severidad(categoria_seleccionada, gravedad_seleccionada)
+                if severidad_counts.empty:
+                    return None
+    
+                fig = px.pie(
+                    values=severidad_counts.values,
+                    names=severidad_counts.index,
+                    color_discrete_sequence=['#22c55e', '#eab308', '#ef4444', '#dc2626'],
+                    hole=0.3
+                )
+    
+                fig.update_traces(
+                    textposition='inside',
+                    textinfo='percent+label'
+                )
+    
+                fig.update_layout(
+                    height=400,
+                    showlegend=True,
+                    legend=dict(
+                        orientation="v",
+                        yanchor="middle",
+                        y=0.5,
+                        xanchor="left",
+                        x=1.02
+                    )
+                )
+                return fig
+    
+            fig_pie = cached_figure(
+                "severidad_por_gravedad", df, (categoria_seleccionada, gravedad_seleccionada),
+                construir_torta, revision=revision
+            )
+    
+            if fig_pie is not None:
+                st.plotly_chart(fig_pie, use_container_width=True)
+            else:
+                if categoria_seleccionada != 'Todas':
+                    st.warning(f"⚠️ No hay datos de gravedad para **{categoria_seleccionada}**")
+                else:
+                    st.warning("⚠️ No hay datos de gravedad disponibles")
+        else:
+            st.info("No hay datos para mostrar")
+    
+    st.markdown("---")
+    
+    st.markdown("### 👥 Lesionados")
+    
+    if not df_filtrado.empty:
+        st.success(f"✅ **{len(df_filtrado)} lesionado(s) encontrado(s)**")
+    
+        por_clase = indice.por_clase(categoria_seleccionada, gravedad_seleccionada)
+        col_met1, col_met2, col_met3, col_met4 = st.columns(4)
+        with col_met1:
+            st.metric("📋 Total Lesiones", len(df_filtrado))
+        with col_met2:
+            if col_severidad in df_filtrado.columns:
+                st.metric("🟢 Leves", por_clase['Leve'])
+            else:
+                st.metric("🟢 Leves", "N/A")
+        with col_met3:
+            if col_severidad in df_filtrado.columns:
+                st.metric("🟡 Moderadas", por_clase['Moderada'])
+            else:
+                st.metric("🟡 Moderadas", "N/A")
+        with col_met4:
+            if col_severidad in df_filtrado.columns:
+                st.metric("🔴 Graves", por_clase['Grave'])
+            else:
+                st.metric("🔴 Graves", "N/A")
+    
+        st.dataframe(df_filtrado, use_container_width=True, height=400)
+    
+        csv = df_filtrado.to_csv(index=False)
+        st.download_button(
+            label="📥 Descargar datos filtrados",
+            data=csv,
+            file_name=f"lesiones_filtradas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            mime="text/csv"
+        )
+    else:
+        st.warning("⚠️ No se encontraron registros con los filtros seleccionados")
+
+
 def main_streamlit():
     """
     INTERFAZ PRINCIPAL CON DASHBOARD DE TENDENCIAS
@@ -946,162 +1374,7 @@ def main_streamlit():
                 tab1, tab2 = st.tabs(["📊 Dashboard General", "🔬 Análisis de Tendencias"])
                 
                 with tab1:
-                    # CÓDIGO EXISTENTE DEL DASHBOARD GENERAL
-                    # (Todo el código que ya tenías)
-                    
-                    col_categoria = 'Categoría'
-                    col_severidad = 'Severidad de la Lesión'
-                    
-                    st.markdown("### 🔍 Filtros")
-                    col_filtro1, col_filtro2 = st.columns(2)
-                    
-                    with col_filtro1:
-                        if col_categoria in df.columns:
-                            categorias_disponibles = ['Todas'] + sorted(df[col_categoria].dropna().unique().tolist())
-                            categoria_seleccionada = st.selectbox(
-                                "🏈 Seleccionar División",
-                                categorias_disponibles,
-                                key="area_medica_filtro_categoria"
-                            )
-                        else:
-                            categoria_seleccionada = 'Todas'
-                    
-                    with col_filtro2:
-                        if col_severidad in df.columns:
-                            gravedades_disponibles = ['Todas'] + sorted(df[col_severidad].dropna().unique().tolist())
-                            gravedad_seleccionada = st.selectbox(
-                                "⚠️ Seleccionar Gravedad",
-                                gravedades_disponibles,
-                                key="area_medica_filtro_gravedad"
-                            )
-                        else:
-                            gravedad_seleccionada = 'Todas'
-                    
-                    df_filtrado = df.copy()
-                    
-                    if categoria_seleccionada != 'Todas' and col_categoria in df.columns:
-                        df_filtrado = df_filtrado[df_filtrado[col_categoria] == categoria_seleccionada]
-                    
-                    if gravedad_seleccionada != 'Todas' and col_severidad in df.columns:
-                        df_filtrado = df_filtrado[df_filtrado[col_severidad] == gravedad_seleccionada]
-                    
-                    info_filtros = []
-                    if categoria_seleccionada != 'Todas':
-                        info_filtros.append(f"**División:** {categoria_seleccionada}")
-                    if gravedad_seleccionada != 'Todas':
-                        info_filtros.append(f"**Gravedad:** {gravedad_seleccionada}")
-                    
-                    if info_filtros:
-                        st.info(f"🔍 **Filtros activos:** {' | '.join(info_filtros)}")
-                    
-                    st.markdown("---")
-                    
-                    st.markdown("### 📊 Análisis de Lesiones")
-                    col_grafico1, col_grafico2 = st.columns(2)
-                    
-                    with col_grafico1:
-                        st.markdown("#### 📊 Lesiones por División")
-                        if col_categoria in df_filtrado.columns and not df_filtrado.empty:
-                            categorias_counts = df_filtrado[col_categoria].value_counts()
-                            
-                            fig_bar = px.bar(
-                                x=categorias_counts.index,
-                                y=categorias_counts.values,
-                                color_discrete_sequence=['#1e40af', '#2563eb', '#3b82f6', '#60a5fa']
-                            )
-                            
-                            fig_bar.update_layout(
-                                showlegend=False,
-                                xaxis_title="División",
-                                yaxis_title="Cantidad",
-                                height=400
-                            )
-                            
-                            st.plotly_chart(fig_bar, use_container_width=True)
-                        else:
-                            st.info("No hay datos para mostrar")
-                    
-                    with col_grafico2:
-                        st.markdown("#### 🎯 Jugadores por Gravedad")
-                        if col_severidad in df_filtrado.columns and not df_filtrado.empty:
-                            df_severidad = df_filtrado[df_filtrado[col_severidad].notna() & (df_filtrado[col_severidad] != '')]
-                            
-                            if not df_severidad.empty:
-                                severidad_counts = df_severidad[col_severidad].value_counts()
-                                
-                                fig_pie = px.pie(
-                                    values=severidad_counts.values,
-                                    names=severidad_counts.index,
-                                    color_discrete_sequence=['#22c55e', '#eab308', '#ef4444', '#dc2626'],
-                                    hole=0.3
-                                )
-                                
-                                fig_pie.update_traces(
-                                    textposition='inside',
-                                    textinfo='percent+label'
-                                )
-                                
-                                fig_pie.update_layout(
-                                    height=400,
-                                    showlegend=True,
-                                    legend=dict(
-                                        orientation="v",
-                                        yanchor="middle",
-                                        y=0.5,
-                                        xanchor="left",
-                                        x=1.02
-                                    )
-                                )
-                                
-                                st.plotly_chart(fig_pie, use_container_width=True)
-                            else:
-                                if categoria_seleccionada != 'Todas':
-                                    st.warning(f"⚠️ No hay datos de gravedad para **{categoria_seleccionada}**")
-                                else:
-                                    st.warning("⚠️ No hay datos de gravedad disponibles")
-                        else:
-                            st.info("No hay datos para mostrar")
-                    
-                    st.markdown("---")
-                    
-                    st.markdown("### 👥 Lesionados")
-                    
-                    if not df_filtrado.empty:
-                        st.success(f"✅ **{len(df_filtrado)} lesionado(s) encontrado(s)**")
-                        
-                        col_met1, col_met2, col_met3, col_met4 = st.columns(4)
-                        with col_met1:
-                            st.metric("📋 Total Lesiones", len(df_filtrado))
-                        with col_met2:
-                            if col_severidad in df_filtrado.columns:
-                                leves = len(df_filtrado[df_filtrado[col_severidad].str.contains('Leve', case=False, na=False)])
-                                st.metric("🟢 Leves", leves)
-                            else:
-                                st.metric("🟢 Leves", "N/A")
-                        with col_met3:
-                            if col_severidad in df_filtrado.columns:
-                                moderadas = len(df_filtrado[df_filtrado[col_severidad].str.contains('Moderada', case=False, na=False)])
-                                st.metric("🟡 Moderadas", moderadas)
-                            else:
-                                st.metric("🟡 Moderadas", "N/A")
-                        with col_met4:
-                            if col_severidad in df_filtrado.columns:
-                                graves = len(df_filtrado[df_filtrado[col_severidad].str.contains('Grave', case=False, na=False)])
-                                st.metric("🔴 Graves", graves)
-                            else:
-                                st.metric("🔴 Graves", "N/A")
-                        
-                        st.dataframe(df_filtrado, use_container_width=True, height=400)
-                        
-                        csv = df_filtrado.to_csv(index=False)
-                        st.download_button(
-                            label="📥 Descargar datos filtrados",
-                            data=csv,
-                            file_name=f"lesiones_filtradas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                            mime="text/csv"
-                        )
-                    else:
-                        st.warning("⚠️ No se encontraron registros con los filtros seleccionados")
+                    panel_dashboard_general(df)
                 
                 # ============================================
                 # TAB 2: NUEVO DASHBOARD DE TENDENCIAS
@@ -10,6 +10,18 @@ import gspread
 import re
 import json
 
+try:
+    from src.utils import fragmento
+except ImportError:
+    from utils import fragmento
+
+try:
+    from .figure_cache import cached_figure
+    from .series_temporales import MAX_ETIQUETAS, clase_traza, reducir_min_max
+except ImportError:
+    from figure_cache import cached_figure
+    from series_temporales import MAX_ETIQUETAS, clase_traza, reducir_min_max
+
 
 # ✅ FUNCIÓN PARA IMPORTAR CUANDO SE NECESITE
 def get_areamedica_functions():
@@ -944,7 +956,7 @@ def crear_grafico_categorias(conteo_categorias):
     
     return fig
 
-def crear_grafico_categorias_con_objetivos(df_filtrado, conteo_categorias, columna_objetivo):
+def _construir_grafico_categorias_con_objetivos(df_filtrado, conteo_categorias, columna_objetivo):
     """
     Crea un gráfico de barras apiladas con objetivos nutricionales por categoría,
     mostrando los nombres de los jugadores en el tooltip.
@@ -1009,6 +1021,17 @@ def crear_grafico_categorias_con_objetivos(df_filtrado, conteo_categorias, colum
     return fig
 
 
+def crear_grafico_categorias_con_objetivos(df_filtrado, conteo_categorias, columna_objetivo):
+    """
+    Gráfico de categorías con objetivos, cacheado por revisión de datos y filtros
+    """
+    filtros = (columna_objetivo, tuple(conteo_categorias.items()) if conteo_categorias is not None else None)
+    return cached_figure(
+        "categorias_con_objetivos", df_filtrado, filtros,
+        lambda: _construir_grafico_categorias_con_objetivos(df_filtrado, conteo_categorias, columna_objetivo)
+    )
+
+
 def obtener_columna_fecha(df):
     posibles_fechas = ['Marca temporal']
     for col in df.columns:
@@ -1016,7 +1039,7 @@ def obtener_columna_fecha(df):
             return col
     return None
 
-def grafico_evolucion_peso(df_hist):
+def _construir_grafico_evolucion_peso(df_hist):
     """
     Genera gráfico de evolución del peso con conversión explícita a float.
     """
@@ -1057,26 +1080,32 @@ def grafico_evolucion_peso(df_hist):
             return None
         
         # Ordenar de más vieja a más nueva
-        df_hist_ordenado = df_hist.sort_values(columna_fecha, ascending=True)
+        df_hist_ordenado = df_hist.sort_values(columna_fecha, ascending=True, kind='stable')
+        
+        # Historiales largos: conservar mínimo y máximo por tramo
+        df_hist_ordenado = df_hist_ordenado.iloc[reducir_min_max(df_hist_ordenado[columna_peso])]
         fechas_formateadas = df_hist_ordenado[columna_fecha].dt.strftime('%b %Y')
+        con_etiquetas = len(df_hist_ordenado) <= MAX_ETIQUETAS
+        traza = clase_traza(len(df_hist_ordenado))
         
         fig = go.Figure()
-        fig.add_trace(go.Scatter(
+        fig.add_trace(traza(
             x=df_hist_ordenado[columna_fecha],
             y=df_hist_ordenado[columna_peso],
-            mode='lines+markers+text',
+            mode='lines+markers+text' if con_etiquetas else 'lines+markers',
             line=dict(
-                shape='spline',
+                # WebGL no soporta curvas spline
+                shape='spline' if traza is go.Scatter else 'linear',
                 color='#f2c94c',
                 width=3
             ),
             marker=dict(
                 color='#f2c94c',
-                size=10,
-                line=dict(color='white', width=2)
+                size=10 if con_etiquetas else 5,
+                line=dict(color='white', width=2 if con_etiquetas else 0)
             ),
             # ✅ CONVERSIÓN EXPLÍCITA A FLOAT
-            text=[f"{float(peso):.1f} kg" for peso in df_hist_ordenado[columna_peso]],
+            text=[f"{float(peso):.1f} kg" for peso in df_hist_ordenado[columna_peso]] if con_etiquetas else None,
             textposition="top center",
             hovertemplate=(
                 "<b>Peso:</b> %{y:.1f} kg<br>" +
@@ -1123,7 +1152,23 @@ def grafico_evolucion_peso(df_hist):
     else:
         return None
     
+def grafico_evolucion_peso(df_hist):
+    """
+    Gráfico de evolución del peso, cacheado por revisión de datos
+    """
+    return cached_figure("evolucion_peso", df_hist, (), lambda: _construir_grafico_evolucion_peso(df_hist.copy()))
+
+
 def grafico_torta_antropometria(df_hist):
+    """
+    Gráfico de composición corporal, cacheado por revisión de datos
+    """
+    if df_hist is None or df_hist.empty:
+        return None
+    return cached_figure("torta_antropometria", df_hist, (), lambda: _construir_grafico_torta_antropometria(df_hist))
+
+
+def _construir_grafico_torta_antropometria(df_hist):
     """
     Devuelve un gráfico de torta con la composición corporal de la última antropometría.
     Muestra solo el peso en kg en el centro del gráfico.
@@ -1773,6 +1818,294 @@ def mostrar_tabla_seguimiento_profesional(df_seguimiento):
         
 
 
+@fragmento
+def panel_analisis_individual(jugadores_base_central, df_nutricion):
+    """Análisis individual por jugador (rerun parcial al cambiar filtros)"""
+    st.markdown("## 👤 Análisis Individual por Jugador")
+    
+    # Filtros - LEEN DE BASE CENTRAL
+    col_izq, col_der = st.columns(2)
+    
+    with col_izq:
+        # Obtener categorías DIRECTAMENTE de Base Central
+        categorias_bc = sorted(set([j['categoria'] for j in jugadores_base_central if j['categoria']]))
+        categorias_individual = st.multiselect(
+            "🏷️ Seleccionar Categorías",
+            options=categorias_bc,
+            default=[],
+            key="cat_individual"
+        )
+    
+    with col_der:
+        # Filtrar jugadores por categorías seleccionadas (BASE CENTRAL)
+        if categorias_individual:
+            jugadores_filtrados = sorted([
+                j['nombre'] for j in jugadores_base_central 
+                if j['categoria'] in categorias_individual
+            ])
+        else:
+            jugadores_filtrados = sorted([j['nombre'] for j in jugadores_base_central])
+    
+        jugadores_individual = st.multiselect(
+            f"👥 Seleccionar Jugadores ({len(jugadores_filtrados)} disponibles)",
+            options=jugadores_filtrados,
+            default=[],
+            key="jug_individual"
+        )
+    
+    st.markdown("---")
+    
+    # Botón nuevo reporte
+    col_btn1, col_btn2, col_btn3 = st.columns([1, 1, 3])
+    with col_btn1:
+        # El botón solo se habilita si hay jugadores seleccionados
+        boton_habilitado = len(jugadores_individual) > 0
+        if st.button(
+            "➕ Nuevo Reporte", 
+            key="btn_nuevo_nutricion", 
+            use_container_width=True,
+            disabled=not boton_habilitado
+        ):
+            # Guardar el jugador seleccionado en session_state
+            st.session_state['jugador_para_reporte'] = jugadores_individual[0]
+            st.session_state['mostrar_formulario_nuevo'] = True
+    
+    if st.session_state.get('mostrar_formulario_nuevo', False):
+        crear_formulario_nutricion_nuevo_jugador(
+            jugadores_base_central,
+            jugador_preseleccionado=st.session_state.get('jugador_para_reporte')
+        )
+        st.stop()
+
+    
+    st.markdown("---")
+    
+    # Mostrar análisis
+    if jugadores_individual:
+        for jugador in jugadores_individual:
+            st.markdown(f"### 📊 {jugador}")
+    
+            col1, col2 = st.columns(2)
+            df_hist = df_nutricion[df_nutricion['Nombre y Apellido'] == jugador]
+
+            with col1:
+                st.markdown("**Evolución del peso**")
+                fig_peso = grafico_evolucion_peso(df_hist)
+                if fig_peso:
+                    st.plotly_chart(fig_peso, use_container_width=True)
+                else:
+                    st.info("No hay datos históricos de peso para este jugador.")
+
+            with col2:
+                st.markdown("**Composición corporal**")
+                fig_torta = grafico_torta_antropometria(df_hist)
+                if fig_torta:
+                    st.plotly_chart(fig_torta, use_container_width=True)
+                else:
+                    st.info("No hay datos de composición corporal para este jugador.")
+    
+            st.markdown("---")
+    
+        # Tabla histórico
+        st.markdown("### 🗂️ Historial de Mediciones")
+        df_vista = df_nutricion[df_nutricion['Nombre y Apellido'].isin(jugadores_individual)].copy()
+
+        col_fecha = obtener_columna_fecha(df_vista)
+        if col_fecha and not df_vista.empty:
+            df_vista[col_fecha] = pd.to_datetime(df_vista[col_fecha], errors='coerce')
+            df_vista = df_vista.sort_values(by=col_fecha, ascending=False)
+
+        columnas_ordenadas = [
+            "Marca temporal",
+            "Nombre y Apellido",
+            "Objetivo",
+            "Categoría",
+            "Posición del jugador",
+            "Peso (kg): [Número con decimales 88,5]",
+            "Talla (cm): [Número]",
+            "IMC",
+            "% MA: [Número con decimales]",
+            "Cuantos kilos de  Masa Muscular"
+        ]
+
+        columnas_mostrar = [c for c in columnas_ordenadas if c in df_vista.columns]
+        if columnas_mostrar and not df_vista.empty:
+            df_vista = df_vista[columnas_mostrar]
+            styled_df = df_vista.style\
+                .set_properties(**{'background-color': '#F7F7F7', 'color': '#222'})\
+                .set_table_styles([
+                    {'selector': 'th', 'props': [('background-color', '#4CAF50'), ('color', 'white')]},
+                    {'selector': 'td', 'props': [('font-size', '14px')]}
+                ])
+            st.dataframe(styled_df, use_container_width=True)
+        else:
+            st.info("ℹ️ No hay datos para mostrar")
+    else:
+        st.info("ℹ️ Selecciona jugadores para ver el análisis individual")
+
+
+@fragmento
+def panel_analisis_equipo(df_nutricion):
+    """Análisis de equipo por categoría (rerun parcial al cambiar filtros)"""
+    st.markdown("## 👥 Análisis de Equipo por Categoría")
+    st.markdown("**Información accesible para Entrenadores y Nutricionistas**")
+    
+    st.markdown("---")
+    
+    # 1️⃣ SELECTOR DE CATEGORÍAS - BIEN DESTACADO
+    st.markdown("### Paso 1: ")
+    categorias_equipo = crear_selector_categorias(df_nutricion)
+    
+    if not categorias_equipo:
+        st.info("ℹ️ Selecciona una o más categorías para ver el análisis")
+        st.stop()
+    
+    # 2️⃣ FILTRAR DATOS POR CATEGORÍAS
+    df_categoria = df_nutricion[df_nutricion['Categoría'].isin(categorias_equipo)].copy()
+    
+    if df_categoria.empty:
+        st.warning("⚠️ No hay jugadores en las categorías seleccionadas")
+        st.stop()
+    
+    # Filtrar último registro por jugador (sin duplicados)
+    df_categoria = filtrar_ultimo_registro_por_jugador(df_categoria)
+    
+    
+    
+    st.markdown("---")
+    
+    # 2️⃣ LEYENDA DE ESTADOS - EXPLICACIÓN DE COLORES
+    st.markdown("### 📋 Paso 2: Leyenda de Estados")
+    st.markdown("**Entiende qué significa cada color del semáforo:**")
+    
+    col_leg1, col_leg2, col_leg3 = st.columns(3)
+    
+    with col_leg1:
+        st.error("🔴 **RIESGO**")
+        st.markdown("""
+        Requiere **acción inmediata** del nutricionista.
+    
+        Intervención urgente necesaria.
+        """)
+    
+    with col_leg2:
+        st.warning("🟡 **MONITOREO**")
+        st.markdown("""
+        Seguimiento **cercano** recomendado.
+    
+        En progreso hacia el objetivo.
+        """)
+    
+    with col_leg3:
+        st.success("🟢 **EN META**")
+        st.markdown("""
+        Protocolo actual **mantiene resultados**.
+    
+        Continuar con el plan vigente.
+        """)
+    
+    st.markdown("---")
+    
+    # 3️⃣ RESUMEN DE ESTADOS - MÉTRICAS PRINCIPALES
+    st.markdown("### 📊 Paso 3: Resumen por Estado")
+    
+    # Crear tabla de seguimiento para obtener datos
+    df_seguimiento = crear_tabla_seguimiento_semanal(df_categoria)
+    
+    if df_seguimiento is not None and not df_seguimiento.empty:
+        # Calcular totales - Convertir explícitamente a int
+        rojos = int(len(df_seguimiento[df_seguimiento['Estado'].str.contains('🔴', na=False)]))
+        amarillos = int(len(df_seguimiento[df_seguimiento['Estado'].str.contains('🟡', na=False)]))
+        verdes = int(len(df_seguimiento[df_seguimiento['Estado'].str.contains('🟢', na=False)]))
+        total = int(len(df_seguimiento))
+    
+        # Validar que total > 0 para evitar división por cero
+        if total == 0:
+            st.warning("⚠️ No hay datos para calcular porcentajes")
+        else:
+            # Mostrar métricas con estilos
+            col_met1, col_met2, col_met3, col_met4 = st.columns(4)
+    
+            with col_met1:
+                porcentaje_rojo = float((rojos / total * 100)) if total > 0 else 0.0
+                st.metric(
+                    "🔴 Riesgo",
+                    rojos,
+                    f"{porcentaje_rojo:.1f}%",
+                    help="Acción inmediata requerida"
+                )
+    
+            with col_met2:
+                # ✅ AGREGAR float() AQUÍ
+                porcentaje_amarillo = float((amarillos / total * 100)) if total > 0 else 0.0
+                st.metric(
+                    "🟡 Monitoreo",
+                    amarillos,
+                    f"{porcentaje_amarillo:.1f}%",
+                    help="Seguimiento cercano"
+                )
+    
+            with col_met3:
+                # ✅ AGREGAR float() AQUÍ
+                porcentaje_verde = float((verdes / total * 100)) if total > 0 else 0.0
+                st.metric(
+                    "🟢 En Meta",
+                    verdes,
+                    f"{porcentaje_verde:.1f}%",
+                    help="Mantener protocolo"
+                )
+    
+            with col_met4:
+                st.metric(
+                    "📋 Total",
+                    total,
+                    "Jugadores",
+                    help="Total de registros"
+                )
+    
+        # Gráfico de progreso visual
+        st.markdown("**Distribución visual:**")
+    
+        datos_estados = {
+            '🔴 Riesgo': rojos,
+            '🟡 Monitoreo': amarillos,
+            '🟢 En Meta': verdes
+        }
+    
+        fig_resumen = go.Figure(data=[
+            go.Bar(
+                x=list(datos_estados.keys()),
+                y=list(datos_estados.values()),
+                marker_color=['#FF6B6B', '#FFC107', '#4CAF50'],
+                text=list(datos_estados.values()),
+                textposition='auto'
+            )
+        ])
+    
+        fig_resumen.update_layout(
+            height=300,
+            showlegend=False,
+            yaxis_title="Cantidad de Jugadores",
+            xaxis_title="Estado",
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)'
+        )
+    
+        st.plotly_chart(fig_resumen, use_container_width=True)
+    
+        st.markdown("---")
+    
+        # 4️⃣ TABLA DE SEGUIMIENTO SEMANAL
+        st.markdown("### 📋 Paso 4: Tabla de Seguimiento Semanal")
+        st.markdown("**Datos detallados ordenados por prioridad (Rojo → Amarillo → Verde)**")
+    
+        # Mostrar tabla profesional
+        mostrar_tabla_seguimiento_profesional(df_seguimiento)
+    
+    else:
+        st.info("ℹ️ No hay datos suficientes para la tabla")
+
+
 def mostrar_analisis_nutricion():
     """
     Función principal - Lee categorías y jugadores de BASE CENTRAL
@@ -1826,286 +2159,10 @@ def mostrar_analisis_nutricion():
     # TAB 1: ANÁLISIS INDIVIDUAL
     # ============================================================
     with tab_individual:
-        st.markdown("## 👤 Análisis Individual por Jugador")
-        
-        # Filtros - LEEN DE BASE CENTRAL
-        col_izq, col_der = st.columns(2)
-        
-        with col_izq:
-            # Obtener categorías DIRECTAMENTE de Base Central
-            categorias_bc = sorted(set([j['categoria'] for j in jugadores_base_central if j['categoria']]))
-            categorias_individual = st.multiselect(
-                "🏷️ Seleccionar Categorías",
-                options=categorias_bc,
-                default=[],
-                key="cat_individual"
-            )
-        
-        with col_der:
-            # Filtrar jugadores por categorías seleccionadas (BASE CENTRAL)
-            if categorias_individual:
-                jugadores_filtrados = sorted([
-                    j['nombre'] for j in jugadores_base_central 
-                    if j['categoria'] in categorias_individual
-                ])
-            else:
-                jugadores_filtrados = sorted([j['nombre'] for j in jugadores_base_central])
-            
-            jugadores_individual = st.multiselect(
-                f"👥 Seleccionar Jugadores ({len(jugadores_filtrados)} disponibles)",
-                options=jugadores_filtrados,
-                default=[],
-                key="jug_individual"
-            )
-        
-        st.markdown("---")
-        
-        # Botón nuevo reporte
-        col_btn1, col_btn2, col_btn3 = st.columns([1, 1, 3])
-        with col_btn1:
-            # El botón solo se habilita si hay jugadores seleccionados
-            boton_habilitado = len(jugadores_individual) > 0
-            if st.button(
-                "➕ Nuevo Reporte", 
-                key="btn_nuevo_nutricion", 
-                use_container_width=True,
-                disabled=not boton_habilitado
-            ):
-                # Guardar el jugador seleccionado en session_state
-                st.session_state['jugador_para_reporte'] = jugadores_individual[0]
-                st.session_state['mostrar_formulario_nuevo'] = True
-        
-        if st.session_state.get('mostrar_formulario_nuevo', False):
-            crear_formulario_nutricion_nuevo_jugador(
-                jugadores_base_central,
-                jugador_preseleccionado=st.session_state.get('jugador_para_reporte')
-            )
-            st.stop()
-
-        
-        st.markdown("---")
-        
-        # Mostrar análisis
-        if jugadores_individual:
-            for jugador in jugadores_individual:
-                st.markdown(f"### 📊 {jugador}")
-                
-                col1, col2 = st.columns(2)
-                df_hist = df_nutricion[df_nutricion['Nombre y Apellido'] == jugador]
-
-                with col1:
-                    st.markdown("**Evolución del peso**")
-                    fig_peso = grafico_evolucion_peso(df_hist)
-                    if fig_peso:
-                        st.plotly_chart(fig_peso, use_container_width=True)
-                    else:
-                        st.info("No hay datos históricos de peso para este jugador.")
-
-                with col2:
-                    st.markdown("**Composición corporal**")
-                    fig_torta = grafico_torta_antropometria(df_hist)
-                    if fig_torta:
-                        st.plotly_chart(fig_torta, use_container_width=True)
-                    else:
-                        st.info("No hay datos de composición corporal para este jugador.")
-                
-                st.markdown("---")
-            
-            # Tabla histórico
-            st.markdown("### 🗂️ Historial de Mediciones")
-            df_vista = df_nutricion[df_nutricion['Nombre y Apellido'].isin(jugadores_individual)].copy()
-
-            col_fecha = obtener_columna_fecha(df_vista)
-            if col_fecha and not df_vista.empty:
-                df_vista[col_fecha] = pd.to_datetime(df_vista[col_fecha], errors='coerce')
-                df_vista = df_vista.sort_values(by=col_fecha, ascending=False)
-
-            columnas_ordenadas = [
-                "Marca temporal",
-                "Nombre y Apellido",
-                "Objetivo",
-                "Categoría",
-                "Posición del jugador",
-                "Peso (kg): [Número con decimales 88,5]",
-                "Talla (cm): [Número]",
-                "IMC",
-                "% MA: [Número con decimales]",
-                "Cuantos kilos de  Masa Muscular"
-            ]
-
-            columnas_mostrar = [c for c in columnas_ordenadas if c in df_vista.columns]
-            if columnas_mostrar and not df_vista.empty:
-                df_vista = df_vista[columnas_mostrar]
-                styled_df = df_vista.style\
-                    .set_properties(**{'background-color': '#F7F7F7', 'color': '#222'})\
-                    .set_table_styles([
-                        {'selector': 'th', 'props': [('background-color', '#4CAF50'), ('color', 'white')]},
-                        {'selector': 'td', 'props': [('font-size', '14px')]}
-                    ])
-                st.dataframe(styled_df, use_container_width=True)
-            else:
-                st.info("ℹ️ No hay datos para mostrar")
-        else:
-            st.info("ℹ️ Selecciona jugadores para ver el análisis individual")
+        panel_analisis_individual(jugadores_base_central, df_nutricion)
 
         # ============================================================
     # TAB 2: ANÁLISIS DE EQUIPO
     # ============================================================
     with tab_equipo:
-            st.markdown("## 👥 Análisis de Equipo por Categoría")
-            st.markdown("**Información accesible para Entrenadores y Nutricionistas**")
-            
-            st.markdown("---")
-            
-            # 1️⃣ SELECTOR DE CATEGORÍAS - BIEN DESTACADO
-            st.markdown("### Paso 1: ")
-            categorias_equipo = crear_selector_categorias(df_nutricion)
-            
-            if not categorias_equipo:
-                st.info("ℹ️ Selecciona una o más categorías para ver el análisis")
-                st.stop()
-            
-            # 2️⃣ FILTRAR DATOS POR CATEGORÍAS
-            df_categoria = df_nutricion[df_nutricion['Categoría'].isin(categorias_equipo)].copy()
-            
-            if df_categoria.empty:
-                st.warning("⚠️ No hay jugadores en las categorías seleccionadas")
-                st.stop()
-            
-            # Filtrar último registro por jugador (sin duplicados)
-            df_categoria = filtrar_ultimo_registro_por_jugador(df_categoria)
-            
-            
-            
-            st.markdown("---")
-            
-            # 2️⃣ LEYENDA DE ESTADOS - EXPLICACIÓN DE COLORES
-            st.markdown("### 📋 Paso 2: Leyenda de Estados")
-            st.markdown("**Entiende qué significa cada color del semáforo:**")
-            
-            col_leg1, col_leg2, col_leg3 = st.columns(3)
-            
-            with col_leg1:
-                st.error("🔴 **RIESGO**")
-                st.markdown("""
-                Requiere **acción inmediata** del nutricionista.
-                
-                Intervención urgente necesaria.
-                """)
-            
-            with col_leg2:
-                st.warning("🟡 **MONITOREO**")
-                st.markdown("""
-                Seguimiento **cercano** recomendado.
-                
-                En progreso hacia el objetivo.
-                """)
-            
-            with col_leg3:
-                st.success("🟢 **EN META**")
-                st.markdown("""
-                Protocolo actual **mantiene resultados**.
-                
-                Continuar con el plan vigente.
-                """)
-            
-            st.markdown("---")
-            
-            # 3️⃣ RESUMEN DE ESTADOS - MÉTRICAS PRINCIPALES
-            st.markdown("### 📊 Paso 3: Resumen por Estado")
-            
-            # Crear tabla de seguimiento para obtener datos
-            df_seguimiento = crear_tabla_seguimiento_semanal(df_categoria)
-            
-            if df_seguimiento is not None and not df_seguimiento.empty:
-                # Calcular totales - Convertir explícitamente a int
-                rojos = int(len(df_seguimiento[df_seguimiento['Estado'].str.contains('🔴', na=False)]))
-                amarillos = int(len(df_seguimiento[df_seguimiento['Estado'].str.contains('🟡', na=False)]))
-                verdes = int(len(df_seguimiento[df_seguimiento['Estado'].str.contains('🟢', na=False)]))
-                total = int(len(df_seguimiento))
-                
-                # Validar que total > 0 para evitar división por cero
-                if total == 0:
-                    st.warning("⚠️ No hay datos para calcular porcentajes")
-                else:
-                    # Mostrar métricas con estilos
-                    col_met1, col_met2, col_met3, col_met4 = st.columns(4)
-                    
-                    with col_met1:
-                        porcentaje_rojo = float((rojos / total * 100)) if total > 0 else 0.0
-                        st.metric(
-                            "🔴 Riesgo",
-                            rojos,
-                            f"{porcentaje_rojo:.1f}%",
-                            help="Acción inmediata requerida"
-                        )
-                    
-                    with col_met2:
-                        # ✅ AGREGAR float() AQUÍ
-                        porcentaje_amarillo = float((amarillos / total * 100)) if total > 0 else 0.0
-                        st.metric(
-                            "🟡 Monitoreo",
-                            amarillos,
-                            f"{porcentaje_amarillo:.1f}%",
-                            help="Seguimiento cercano"
-                        )
-                    
-                    with col_met3:
-                        # ✅ AGREGAR float() AQUÍ
-                        porcentaje_verde = float((verdes / total * 100)) if total > 0 else 0.0
-                        st.metric(
-                            "🟢 En Meta",
-                            verdes,
-                            f"{porcentaje_verde:.1f}%",
-                            help="Mantener protocolo"
-                        )
-                    
-                    with col_met4:
-                        st.metric(
-                            "📋 Total",
-                            total,
-                            "Jugadores",
-                            help="Total de registros"
-                        )
-                
-                # Gráfico de progreso visual
-                st.markdown("**Distribución visual:**")
-                
-                datos_estados = {
-                    '🔴 Riesgo': rojos,
-                    '🟡 Monitoreo': amarillos,
-                    '🟢 En Meta': verdes
-                }
-                
-                fig_resumen = go.Figure(data=[
-                    go.Bar(
-                        x=list(datos_estados.keys()),
-                        y=list(datos_estados.values()),
-                        marker_color=['#FF6B6B', '#FFC107', '#4CAF50'],
-                        text=list(datos_estados.values()),
-                        textposition='auto'
-                    )
-                ])
-                
-                fig_resumen.update_layout(
-                    height=300,
-                    showlegend=False,
-                    yaxis_title="Cantidad de Jugadores",
-                    xaxis_title="Estado",
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)'
-                )
-                
-                st.plotly_chart(fig_resumen, use_container_width=True)
-                
-                st.markdown("---")
-                
-                # 4️⃣ TABLA DE SEGUIMIENTO SEMANAL
-                st.markdown("### 📋 Paso 4: Tabla de Seguimiento Semanal")
-                st.markdown("**Datos detallados ordenados por prioridad (Rojo → Amarillo → Verde)**")
-                
-                # Mostrar tabla profesional
-                mostrar_tabla_seguimiento_profesional(df_seguimiento)
-                
-            else:
-                st.info("ℹ️ No hay datos suficientes para la tabla")
\ No newline at end of file
+        panel_analisis_equipo(df_nutricion)
@@ -0,0 +1,172 @@
+"""
+Estadísticas de Asistencia
+Motor vectorizado sobre el historial completo de asistencias:
+tasas por tipo de actividad, rachas de ausencias, participación móvil
+de 4 semanas y ranking por categoría, memoizado por revisión de datos
+"""
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .html_fragments import MemoCache, frame_revision
+except ImportError:
+    from html_fragments import MemoCache, frame_revision
+
+# Presente + Lesionado = participa (está físicamente en la sesión)
+ESTADOS_PARTICIPACION = ("Presente", "Lesionado")
+VENTANA_SEMANAS = 4
+
+# Resultados memoizados: revisión -> analítica
+_ANALYTICS_CACHE = MemoCache(max_size=8)
+
+
+def normalizar_historial(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normalizar el historial (formato nuevo y antiguo) a columnas fijas
+
+    Args:
+        df (pd.DataFrame): Historial tal como lo entrega AsistenciaManager
+
+    Returns:
+        pd.DataFrame: Fecha, DNI, Jugador, Categoria, Tipo_Actividad, Estado
+    """
+    columnas = ["Fecha", "DNI", "Jugador", "Categoria", "Tipo_Actividad", "Estado"]
+    estado_col = "Estado_Asistencia" if "Estado_Asistencia" in df.columns else "Presente"
+    if df.empty or "Fecha" not in df.columns or estado_col not in df.columns:
+        return pd.DataFrame(columns=columnas)
+
+    def texto(columna):
+        if columna not in df.columns:
+            return pd.Series("", index=df.index)
+        return df[columna].fillna("").astype(str).str.strip()
+
+    nombre = (texto("Nombre") + " " + texto("Apellido")).str.strip()
+    dni = texto("DNI").str.replace(r"\.0$", "", regex=True)
+
+    normalizado = pd.DataFrame({
+        "Fecha": pd.to_datetime(df["Fecha"], errors="coerce"),
+        "DNI": dni.where(dni != "", nombre),
+        "Jugador": nombre,
+        "Categoria": texto("Categoria"),
+        "Tipo_Actividad": texto("Tipo_Actividad").replace("", "Sin tipo"),
+        "Estado": texto(estado_col),
+    })
+    normalizado = normalizado[normalizado["Fecha"].notna() & (normalizado["DNI"] != "")]
+    return normalizado.sort_values(["DNI", "Fecha"], kind="stable", ignore_index=True)
+
+
+def _rachas_ausencia(datos: pd.DataFrame) -> pd.DataFrame:
+    """Racha actual y máxima de ausencias consecutivas por jugador"""
+    ausente = datos["Estado"].eq("Ausente")
+    # Cada sesión sin ausencia abre un bloque nuevo; la racha es el acumulado dentro del bloque
+    bloque = (~ausente).groupby(datos["DNI"]).cumsum()
+    racha = ausente.astype(int).groupby([datos["DNI"], bloque]).cumsum()
+    return pd.DataFrame({
+        "Racha Ausencias": racha.groupby(datos["DNI"]).last(),
+        "Racha Máxima": racha.groupby(datos["DNI"]).max(),
+    })
+
+
+def _participacion_semanal(datos: pd.DataFrame):
+    """
+    Participación semanal y móvil de 4 semanas
+
+    Returns:
+        tuple: (participación móvil por jugador en la última semana,
+                evolución semanal móvil por categoría)
+    """
+    semana = datos["Fecha"].dt.to_period("W").dt.start_time
+    semanas = pd.date_range(semana.min(), semana.max(), freq="W-MON")
+
+    def movil(claves):
+        sesiones = datos.groupby([claves, semana]).size().unstack(fill_value=0)
+        participa = datos["Participa"].groupby([claves, semana]).sum().unstack(fill_value=0)
+        sesiones = sesiones.reindex(columns=semanas, fill_value=0)
+        participa = participa.reindex(columns=semanas, fill_value=0)
+        # Suma móvil sobre el eje de semanas (matriz entidad × semana)
+        sesiones_movil = sesiones.T.rolling(VENTANA_SEMANAS, min_periods=1).sum().T
+        participa_movil = participa.T.rolling(VENTANA_SEMANAS, min_periods=1).sum().T
+        return participa_movil / sesiones_movil.replace(0, np.nan) * 100
+
+    por_jugador = movil(datos["DNI"])
+    por_categoria = movil(datos["Categoria"])
+    return por_jugador.iloc[:, -1], por_categoria.T
+
+
+def _calcular(datos: pd.DataFrame) -> Dict:
+    """Agregar el historial normalizado (todos los jugadores a la vez)"""
+    if datos.empty:
+        return {
+            "resumen": pd.DataFrame(),
+            "tasas_actividad": pd.DataFrame(),
+            "evolucion_categorias": pd.DataFrame(),
+        }
+
+    datos = datos.assign(
+        Presente=datos["Estado"].eq("Presente"),
+        Participa=datos["Estado"].isin(ESTADOS_PARTICIPACION),
+    )
+    por_dni = datos.groupby("DNI")
+
+    resumen = pd.DataFrame({
+        "Jugador": por_dni["Jugador"].last(),
+        "Categoria": por_dni["Categoria"].last(),
+        "Sesiones": por_dni.size(),
+        "Presentes": por_dni["Presente"].sum(),
+        "Ausentes": datos["Estado"].eq("Ausente").groupby(datos["DNI"]).sum(),
+        "Lesionados": datos["Estado"].eq("Lesionado").groupby(datos["DNI"]).sum(),
+        "Última Sesión": por_dni["Fecha"].max(),
+    })
+    resumen["% Asistencia"] = (resumen["Presentes"] / resumen["Sesiones"] * 100).round(1)
+    resumen["% Participación"] = (por_dni["Participa"].mean() * 100).round(1)
+
+    participacion_movil, evolucion = _participacion_semanal(datos)
+    resumen[f"% Part. {VENTANA_SEMANAS} sem"] = participacion_movil.round(1)
+    resumen = resumen.join(_rachas_ausencia(datos))
+
+    resumen["Ranking Categoría"] = (
+        resumen.groupby("Categoria")["% Participación"]
+        .rank(method="min", ascending=False)
+        .astype(int)
+    )
+    resumen = resumen.reset_index().sort_values(
+        ["Categoria", "Ranking Categoría", "Jugador"], kind="stable", ignore_index=True
+    )
+
+    tasas = (
+        datos.pivot_table(index="DNI", columns="Tipo_Actividad", values="Presente", aggfunc="mean")
+        .mul(100).round(1)
+    )
+    tasas.columns = [f"% {actividad}" for actividad in tasas.columns]
+    tasas = resumen[["DNI", "Jugador", "Categoria"]].join(tasas, on="DNI")
+
+    return {
+        "resumen": resumen,
+        "tasas_actividad": tasas,
+        "evolucion_categorias": evolucion.round(1),
+    }
+
+
+def compute_attendance_analytics(df: pd.DataFrame, revision: str = None) -> Dict:
+    """
+    Obtener la analítica de asistencia, memoizada por revisión de datos
+
+    Args:
+        df (pd.DataFrame): Historial completo de asistencias
+        revision (str): Revisión ya conocida del historial (se calcula si falta)
+
+    Returns:
+        Dict: resumen por jugador, tasas por actividad, evolución por categoría
+              y la clave "revision"
+    """
+    key = revision or frame_revision(df)
+
+    def calcular():
+        analytics = _calcular(normalizar_historial(df))
+        analytics["revision"] = key
+        return analytics
+
+    return dict(_ANALYTICS_CACHE.get_or_build(key, calcular))
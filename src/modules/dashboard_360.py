@@ -3,6 +3,7 @@ import pandas as pd
 import os
 import sys
 import re
+import numpy as np
 from datetime import datetime, timedelta
 import plotly.express as px
 import plotly.graph_objects as go
@@ -29,6 +30,30 @@ try:
 except ImportError:
     cargar_hoja = None
 
+try:
+    from .html_fragments import (
+        fragment_cache, frame_revision, render_items, PANEL_AREA, TARJETA_DATO
+    )
+except ImportError:
+    from html_fragments import (
+        fragment_cache, frame_revision, render_items, PANEL_AREA, TARJETA_DATO
+    )
+
+try:
+    from src.assets import inject_css
+except ImportError:
+    from assets import inject_css
+
+try:
+    from src.utils import fragmento
+except ImportError:
+    from utils import fragmento
+
+try:
+    from .figure_cache import cached_figure
+except ImportError:
+    from figure_cache import cached_figure
+
 # 👇 AGREGAR ESTA FUNCIÓN DE VALIDACIÓN
 def validar_credenciales():
     """Valida que existan las credenciales antes de cargar datos"""
@@ -203,7 +228,7 @@ def mostrar_foto_jugador():
 
 def cargar_estilos_profesionales():
     """Cargar estilos CSS profesionales para el club de rugby"""
-    st.markdown("""
+    inject_css("""
     <style>
     @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
     
@@ -346,7 +371,7 @@ def cargar_estilos_profesionales():
         color: white;
     }
     </style>
-    """, unsafe_allow_html=True)
+    """)
 
 def buscar_columna_jugador(df):
     """Busca la columna que contiene los nombres de jugadores - ESPECÍFICA para CAR"""
@@ -485,63 +510,82 @@ def obtener_datos_jugador(df_combinado, jugador_seleccionado):
 
 
 
+def _ultimo_valor(datos, *columnas):
+    """Último valor no nulo de la primera columna disponible (por fila, en orden de preferencia)"""
+    serie = None
+    for columna in columnas:
+        if columna in datos.columns:
+            serie = datos[columna] if serie is None else serie.where(serie.notna(), datos[columna])
+    if serie is None:
+        return None
+    serie = serie.dropna()
+    return serie.iloc[-1] if not serie.empty else None
+
+
+def _dni_jugador(datos_jugador):
+    """DNI del jugador (clave de los fragmentos cacheados)"""
+    dni = _ultimo_valor(datos_jugador, 'Dni', 'Por Favor completa el Dni')
+    return str(dni) if dni is not None else 'sin_dni'
+
+
+def _datos_ficha(datos_jugador):
+    """Datos básicos de la ficha: último valor informado de cada campo"""
+    jugador_nombre = _ultimo_valor(datos_jugador, 'Nombre completo del jugador', 'Nombre y Apellido')
+    dni = _ultimo_valor(datos_jugador, 'Dni', 'Por Favor completa el Dni')
+    categoria = _ultimo_valor(datos_jugador, 'Categoría')
+    posicion = _ultimo_valor(datos_jugador, 'Posición del jugador')
+    
+    # PESO Y ALTURA SOLO DE LOS DATOS DE NUTRICIÓN (el registro más reciente)
+    datos_nutricion = datos_jugador[datos_jugador['origen_modulo'] == 'nutricion'].sort_index(kind='stable')
+    peso = _ultimo_valor(datos_nutricion, 'Peso (kg): [Número con decimales 88,5]')
+    altura = _ultimo_valor(datos_nutricion, 'Talla (cm): [Número]')
+    
+    return jugador_nombre or "Jugador sin nombre", dni, categoria, posicion, peso, altura
+
+
+def _html_ficha(datos_jugador):
+    """Fragmentos HTML de la ficha personal"""
+    jugador_nombre, dni, categoria, posicion, peso, altura = _datos_ficha(datos_jugador)
+    
+    def tarjeta(etiqueta, valor, color="#1a365d"):
+        return TARJETA_DATO.format(etiqueta=etiqueta, valor=valor, color=color)
+    
+    return {
+        'nombre': jugador_nombre,
+        'titulo': f"""
+            <div style="
+                font-size: 3rem;
+                font-weight: 900;
+                color: #1a365d;
+                margin-bottom: 1rem;
+                text-transform: uppercase;
+                letter-spacing: 2px;
+                text-shadow: 2px 2px 4px rgba(0,0,0,0.1);
+                line-height: 1.1;
+                text-align: center;
+            ">{jugador_nombre}</div>
+            """,
+        'dni': tarjeta("DNI", dni if dni else "N/A"),
+        'categoria': tarjeta("CATEGORÍA", categoria if categoria else "N/A"),
+        'posicion': tarjeta("POSICIÓN", posicion if posicion else "N/A"),
+        'peso': tarjeta("PESO", f"{peso} kg" if peso else "N/A"),
+        'altura': tarjeta("ALTURA", f"{altura} cm" if altura else "N/A"),
+        'estado': tarjeta("ESTADO", "Activo", color="#38a169"),
+    }
+
+
 def mostrar_ficha_personal_simple(datos_jugador):
     """Muestra la ficha personal del jugador usando solo componentes nativos de Streamlit"""
     if datos_jugador.empty:
         st.warning("No se encontraron datos del jugador")
         return
     
-    # Obtener datos básicos usando las columnas exactas del CAR
-    jugador_nombre = None
-    dni = None
-    categoria = None
-    posicion = None
-    peso = None
-    altura = None
-    
-    # Buscar en todas las filas del jugador para obtener la información más completa
-    for _, fila in datos_jugador.iterrows():
-        # Nombre del jugador
-        if pd.notna(fila.get('Nombre completo del jugador')):
-            jugador_nombre = fila['Nombre completo del jugador']
-        elif pd.notna(fila.get('Nombre y Apellido')):
-            jugador_nombre = fila['Nombre y Apellido']
-        
-        # DNI
-        if pd.notna(fila.get('Dni')):
-            dni = fila['Dni']
-        elif pd.notna(fila.get('Por Favor completa el Dni')):
-            dni = fila['Por Favor completa el Dni']
-        
-        # Categoría
-        if pd.notna(fila.get('Categoría')):
-            categoria = fila['Categoría']
-        
-        # Posición
-        if pd.notna(fila.get('Posición del jugador')):
-            posicion = fila['Posición del jugador']
-    
-    # BUSCAR PESO Y ALTURA SOLO EN DATOS DE NUTRICIÓN (origen_modulo == 'nutricion')
-    datos_nutricion = datos_jugador[datos_jugador['origen_modulo'] == 'nutricion']
-    
-    if not datos_nutricion.empty:
-        # Ordenar por índice descendente para obtener el más reciente primero
-        datos_nutricion_ordenados = datos_nutricion.sort_index(ascending=False)
-        
-        for _, fila in datos_nutricion_ordenados.iterrows():
-            if peso is None and 'Peso (kg): [Número con decimales 88,5]' in datos_nutricion.columns:
-                if pd.notna(fila['Peso (kg): [Número con decimales 88,5]']):
-                    peso = fila['Peso (kg): [Número con decimales 88,5]']
-            
-            if altura is None and 'Talla (cm): [Número]' in datos_nutricion.columns:
-                if pd.notna(fila['Talla (cm): [Número]']):
-                    altura = fila['Talla (cm): [Número]']
-            
-            if peso is not None and altura is not None:
-                break
-    
-    if not jugador_nombre:
-        jugador_nombre = "Jugador sin nombre"
+    # Fragmentos cacheados por (DNI, revisión de los datos del jugador)
+    ficha = fragment_cache.render(
+        'ficha', _dni_jugador(datos_jugador), frame_revision(datos_jugador),
+        lambda: _html_ficha(datos_jugador)
+    )
+    jugador_nombre = ficha['nombre']
     
     # HEADER DEL PERFIL
     st.subheader("👤 PERFIL DEL JUGADOR")
@@ -592,46 +636,19 @@ def mostrar_ficha_personal_simple(datos_jugador):
             st.markdown("<div style='text-align: center; font-size: 0.9rem;'><strong>DE RUGBY</strong></div>", unsafe_allow_html=True)
         
         with col_info:
-            st.markdown(f"""
-            <div style="
-                font-size: 3rem;
-                font-weight: 900;
-                color: #1a365d;
-                margin-bottom: 1rem;
-                text-transform: uppercase;
-                letter-spacing: 2px;
-                text-shadow: 2px 2px 4px rgba(0,0,0,0.1);
-                line-height: 1.1;
-                text-align: center;
-            ">{jugador_nombre}</div>
-            """, unsafe_allow_html=True)
+            st.markdown(ficha['titulo'], unsafe_allow_html=True)
             
             # MÉTRICAS CON ESTILO PERSONALIZADO (SIN EMOJIS)
             info_col1, info_col2, info_col3 = st.columns(3)
             
             with info_col1:
-                st.markdown(f"""
-                <div style="text-align: center; padding: 1rem; background: #f7fafc; border-radius: 10px;">
-                    <div style="font-size: 0.85rem; color: #718096; font-weight: 600; margin-bottom: 0.5rem;">DNI</div>
-                    <div style="font-size: 1.8rem; color: #1a365d; font-weight: 800;">{dni if dni else "N/A"}</div>
-                </div>
-                """, unsafe_allow_html=True)
+                st.markdown(ficha['dni'], unsafe_allow_html=True)
             
             with info_col2:
-                st.markdown(f"""
-                <div style="text-align: center; padding: 1rem; background: #f7fafc; border-radius: 10px;">
-                    <div style="font-size: 0.85rem; color: #718096; font-weight: 600; margin-bottom: 0.5rem;">CATEGORÍA</div>
-                    <div style="font-size: 1.8rem; color: #1a365d; font-weight: 800;">{categoria if categoria else "N/A"}</div>
-                </div>
-                """, unsafe_allow_html=True)
+                st.markdown(ficha['categoria'], unsafe_allow_html=True)
             
             with info_col3:
-                st.markdown(f"""
-                <div style="text-align: center; padding: 1rem; background: #f7fafc; border-radius: 10px;">
-                    <div style="font-size: 0.85rem; color: #718096; font-weight: 600; margin-bottom: 0.5rem;">POSICIÓN</div>
-                    <div style="font-size: 1.8rem; color: #1a365d; font-weight: 800;">{posicion if posicion else "N/A"}</div>
-                </div>
-                """, unsafe_allow_html=True)
+                st.markdown(ficha['posicion'], unsafe_allow_html=True)
     
     st.markdown("---")
     
@@ -639,28 +656,13 @@ def mostrar_ficha_personal_simple(datos_jugador):
     col_peso, col_altura, col_estado = st.columns(3)
     
     with col_peso:
-        st.markdown(f"""
-        <div style="text-align: center; padding: 1rem; background: #f7fafc; border-radius: 10px;">
-            <div style="font-size: 0.85rem; color: #718096; font-weight: 600; margin-bottom: 0.5rem;">PESO</div>
-            <div style="font-size: 1.8rem; color: #1a365d; font-weight: 800;">{f"{peso} kg" if peso else "N/A"}</div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(ficha['peso'], unsafe_allow_html=True)
     
     with col_altura:
-        st.markdown(f"""
-        <div style="text-align: center; padding: 1rem; background: #f7fafc; border-radius: 10px;">
-            <div style="font-size: 0.85rem; color: #718096; font-weight: 600; margin-bottom: 0.5rem;">ALTURA</div>
-            <div style="font-size: 1.8rem; color: #1a365d; font-weight: 800;">{f"{altura} cm" if altura else "N/A"}</div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(ficha['altura'], unsafe_allow_html=True)
     
     with col_estado:
-        st.markdown(f"""
-        <div style="text-align: center; padding: 1rem; background: #f7fafc; border-radius: 10px;">
-            <div style="font-size: 0.85rem; color: #718096; font-weight: 600; margin-bottom: 0.5rem;">ESTADO</div>
-            <div style="font-size: 1.8rem; color: #38a169; font-weight: 800;">Activo</div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(ficha['estado'], unsafe_allow_html=True)
 
 
         
@@ -709,9 +711,12 @@ def mostrar_modulo_nutricion(datos_nutricionales):
         st.subheader("📈 Evolución del Peso")
         pesos = datos_nutricionales['Peso (kg): [Número con decimales 88,5]'].dropna()
         if len(pesos) > 1:
-            fig = px.line(x=range(len(pesos)), y=pesos.values, 
-                         title="Evolución del Peso Corporal",
-                         labels={'x': 'Evaluación', 'y': 'Peso (kg)'})
+            fig = cached_figure(
+                "360_evolucion_peso", pesos.to_frame(), (),
+                lambda: px.line(x=range(len(pesos)), y=pesos.values, 
+                                title="Evolución del Peso Corporal",
+                                labels={'x': 'Evaluación', 'y': 'Peso (kg)'})
+            )
             st.plotly_chart(fig, use_container_width=True)
     
     # Tabla detallada
@@ -750,9 +755,12 @@ def mostrar_modulo_medico(datos_medicos):
         st.subheader("🩹 Historial de Lesiones")
         lesiones = datos_medicos['Tipo de lesión'].value_counts()
         if not lesiones.empty:
-            fig = px.pie(values=lesiones.values, names=lesiones.index, 
-                        title="Distribución por Tipo de Lesión",
-                        color_discrete_sequence=px.colors.qualitative.Set3)
+            fig = cached_figure(
+                "360_tipos_lesion", lesiones.to_frame(), (),
+                lambda: px.pie(values=lesiones.values, names=lesiones.index, 
+                               title="Distribución por Tipo de Lesión",
+                               color_discrete_sequence=px.colors.qualitative.Set3)
+            )
             st.plotly_chart(fig, use_container_width=True)
     
     # Severidad de lesiones
@@ -760,9 +768,12 @@ def mostrar_modulo_medico(datos_medicos):
         st.subheader("⚡ Severidad de Lesiones")
         severidad = datos_medicos['Severidad de la lesión'].value_counts()
         if not severidad.empty:
-            fig = px.bar(x=severidad.index, y=severidad.values,
-                        title="Distribución por Severidad",
-                        color_discrete_sequence=['#e53e3e', '#ed8936', '#38a169'])
+            fig = cached_figure(
+                "360_severidad", severidad.to_frame(), (),
+                lambda: px.bar(x=severidad.index, y=severidad.values,
+                               title="Distribución por Severidad",
+                               color_discrete_sequence=['#e53e3e', '#ed8936', '#38a169'])
+            )
             st.plotly_chart(fig, use_container_width=True)
     
     # Tabla detallada
@@ -1022,169 +1033,185 @@ def crear_panel_areas_unificado(datos_jugador):
             else:
                 st.write("• **Última evaluación:** —")
 
-def crear_panel_areas_unificado(datos_jugador):
-    """Crea el panel unificado de las 3 áreas con información específica"""
+# Tests que muestra el panel de preparación física (configurable desde el panel)
+TESTS_PANEL_FISICO = ['Press Banca', 'Remo Acostado', 'Vel Max']
+
+# Unidad -> sufijo con el que se muestra el resultado (otras unidades: "valor unidad")
+FORMATO_UNIDADES = {
+    '"': '"',
+    'kg': ' kg',
+    'km/h': ' km/h',
+    'Km/h': ' km/h',
+    's': ' s',
+}
+
+
+def _columna_texto(df, columna):
+    """Columna como texto limpio ('' si falta o es nula)"""
+    if columna not in df.columns:
+        return pd.Series('', index=df.index)
+    return df[columna].where(df[columna].notna(), '').astype(str).str.strip()
+
+
+def construir_pivot_tests(df_fisica, col_clave):
+    """
+    Último resultado de cada test por jugador
+    
+    Cada fila de la Base Test aporta su resultado formateado bajo su Test y
+    bajo su Subtest; se conserva el más reciente (por 'fecha' si existe, si no
+    por orden en la hoja).
+    
+    Args:
+        df_fisica (pd.DataFrame): Filas del área física
+        col_clave (str): Columna que identifica al jugador (DNI o nombre)
+    
+    Returns:
+        pd.DataFrame: Índice = jugador, columnas = test/subtest, valores = resultado
+    """
+    if df_fisica.empty or not col_clave or col_clave not in df_fisica.columns \
+            or 'Test' not in df_fisica.columns or 'valor' not in df_fisica.columns:
+        return pd.DataFrame()
+    
+    df = df_fisica[df_fisica[col_clave].notna()]
+    if 'fecha' in df.columns:
+        fechas = pd.to_datetime(df['fecha'], errors='coerce', dayfirst=True)
+        df = df.assign(_fecha=fechas).sort_values('_fecha', kind='stable', na_position='first')
+    
+    unidad = _columna_texto(df, 'unidad')
+    sufijo = unidad.map(FORMATO_UNIDADES).fillna(' ' + unidad).where(unidad != '', '')
+    valor = df['valor'].where(df['valor'].notna(), 'N/A').astype(str)
+    
+    base = pd.DataFrame({
+        'orden': np.arange(len(df)),
+        'clave': df[col_clave].astype(str).to_numpy(),
+        'resultado': (valor + sufijo).str.strip().to_numpy(),
+    })
+    test = _columna_texto(df, 'Test').to_numpy()
+    subtest = _columna_texto(df, 'Subtest').to_numpy()
+    
+    largo = pd.concat([
+        base.assign(test=test),
+        base.assign(test=subtest)[(subtest != '') & (subtest != test)],
+    ])
+    largo = largo[largo['test'] != ''].sort_values('orden', kind='stable')
+    ultimos = largo.drop_duplicates(['clave', 'test'], keep='last')
+    
+    return ultimos.pivot(index='clave', columns='test', values='resultado').rename_axis(col_clave)
+
+
+@st.cache_data
+def obtener_pivot_tests_fisicos():
+    """Pivot de tests físicos para todos los jugadores (una vez por carga de datos)"""
+    df_combinado = crear_dataframe_integrado()
+    if df_combinado.empty or 'origen_modulo' not in df_combinado.columns:
+        return pd.DataFrame()
+    
+    # Misma clave que usa obtener_datos_jugador
+    col_clave = buscar_columna_dni(df_combinado) or buscar_columna_jugador(df_combinado)
+    df_fisica = df_combinado[df_combinado['origen_modulo'] == 'fisica']
+    return construir_pivot_tests(df_fisica, col_clave)
+
+
+def _resultados_tests_jugador(datos_jugador, tests):
+    """Fila del pivot del jugador, restringida a los tests pedidos"""
+    vacio = pd.Series(index=tests, dtype=object)
+    pivot = obtener_pivot_tests_fisicos()
+    col_clave = pivot.index.name
+    if pivot.empty or col_clave not in datos_jugador.columns:
+        return vacio
     
-    # Separar datos por módulo
-    datos_medicos = datos_jugador[datos_jugador['origen_modulo'] == 'medica']
-    datos_nutricionales = datos_jugador[datos_jugador['origen_modulo'] == 'nutricion']
     datos_fisicos = datos_jugador[datos_jugador['origen_modulo'] == 'fisica']
+    claves = datos_fisicos[col_clave].dropna().astype(str)
+    claves = claves[claves.isin(pivot.index)]
+    if claves.empty:
+        return vacio
+    return pivot.loc[claves.iloc[0]].reindex(tests)
+
+
+def _html_panel_fisico(resultados):
+    items = [(test, resultado if pd.notna(resultado) else '—') for test, resultado in resultados.items()]
+    return PANEL_AREA.format(titulo='💪 PREPARACIÓN FÍSICA', items=render_items(items))
+
+
+def _html_panel_medico(datos_medicos):
+    if datos_medicos.empty:
+        items = [('Estado actual', 'Sin datos'), ('Último control', '—'), ('Lesión activa', '—')]
+        return PANEL_AREA.format(titulo='🏥 MEDICINA', items=render_items(items))
+    
+    estado = '🟢 Disponible'
+    if '¿Puede participar en entrenamientos?' in datos_medicos.columns:
+        participacion = datos_medicos['¿Puede participar en entrenamientos?'].iloc[-1]
+        if participacion == "Solo entrenamiento diferenciado":
+            estado = '🟡 Limitado'
+        elif participacion == "No puede entrenar":
+            estado = '🔴 No disponible'
+    
+    ultimo_control = '—'
+    if 'Marca temporal' in datos_medicos.columns:
+        ultimo_control = datos_medicos['Marca temporal'].max()
+        try:
+            ultimo_control = pd.to_datetime(ultimo_control).strftime('%d/%m/%y')
+        except Exception:
+            pass
+    
+    lesion = '—'
+    if 'Tipo de lesión' in datos_medicos.columns:
+        lesion_reciente = datos_medicos['Tipo de lesión'].iloc[-1]
+        lesion = lesion_reciente if pd.notna(lesion_reciente) and lesion_reciente.strip() else 'Ninguna'
     
-    st.markdown("### 📊 ÁREAS DE SEGUIMIENTO")
+    items = [('Estado actual', estado), ('Último control', ultimo_control), ('Lesión activa', lesion)]
+    return PANEL_AREA.format(titulo='🏥 MEDICINA', items=render_items(items))
+
+
+def _html_panel_nutricion(datos_nutricionales):
+    if datos_nutricionales.empty:
+        items = [('Peso actual', '— kg'), ('% grasa corporal', '— %'), ('IMC', '—')]
+        return PANEL_AREA.format(titulo='🥗 NUTRICIÓN', items=render_items(items))
     
-    # Crear las 3 columnas principales
-    col1, col2, col3 = st.columns(3)
+    def ultimo(columna):
+        return datos_nutricionales[columna].iloc[-1] if columna in datos_nutricionales.columns else None
     
-    # COLUMNA 1: PREPARACIÓN FÍSICA CON SOMBRA GRIS
-    with col1:
-        contenido_html = '<div style="padding: 1.5rem; background: #f7fafc; border-radius: 10px; min-height: 250px;">'
-        contenido_html += '<h4 style="color: #1a365d; margin-top: 0;">💪 PREPARACIÓN FÍSICA</h4>'
-        
-        if datos_fisicos.empty:
-            contenido_html += '<p style="margin: 0.5rem 0;">• <strong>Press Banca:</strong> —</p>'
-            contenido_html += '<p style="margin: 0.5rem 0;">• <strong>Remo Acostado:</strong> —</p>'
-            contenido_html += '<p style="margin: 0.5rem 0;">• <strong>Vel Max:</strong> —</p>'
-        else:
-            tests_mapeo = {
-                'Press Banca': ['Press Banca'],
-                'Remo Acostado': ['Remo Acostado'], 
-                'Vel Max': ['Vel Max']
-            }
-            
-            tiene_test = 'Test' in datos_fisicos.columns
-            tiene_subtest = 'Subtest' in datos_fisicos.columns
-            tiene_valor = 'valor' in datos_fisicos.columns
-            tiene_unidad = 'unidad' in datos_fisicos.columns
-            
-            if tiene_test and tiene_valor:
-                for test_display, test_busqueda_lista in tests_mapeo.items():
-                    resultado_encontrado = False
-                    
-                    for _, fila in datos_fisicos.iterrows():
-                        test = str(fila['Test']).strip() if pd.notna(fila['Test']) else ''
-                        subtest = str(fila['Subtest']).strip() if tiene_subtest and pd.notna(fila['Subtest']) else ''
-                        
-                        for test_buscar in test_busqueda_lista:
-                            if (test == test_buscar or subtest == test_buscar):
-                                valor = fila['valor'] if pd.notna(fila['valor']) else 'N/A'
-                                unidad = str(fila['unidad']).strip() if tiene_unidad and pd.notna(fila['unidad']) else ''
-                                
-                                if unidad == '"':
-                                    resultado = f"{valor}\""
-                                elif unidad == 'kg':
-                                    resultado = f"{valor} kg"
-                                elif unidad == 'Km/h' or unidad == 'km/h':
-                                    resultado = f"{valor} km/h"
-                                elif unidad == 's':
-                                    resultado = f"{valor} s"
-                                else:
-                                    resultado = f"{valor} {unidad}".strip() if unidad else str(valor)
-                                
-                                contenido_html += f'<p style="margin: 0.5rem 0;">• <strong>{test_display}:</strong> {resultado}</p>'
-                                resultado_encontrado = True
-                                break
-                        
-                        if resultado_encontrado:
-                            break
-                    
-                    if not resultado_encontrado:
-                        contenido_html += f'<p style="margin: 0.5rem 0;">• <strong>{test_display}:</strong> —</p>'
-            else:
-                contenido_html += '<p style="margin: 0.5rem 0;">• <strong>Press Banca:</strong> —</p>'
-                contenido_html += '<p style="margin: 0.5rem 0;">• <strong>Remo Acostado:</strong> —</p>'
-                contenido_html += '<p style="margin: 0.5rem 0;">• <strong>Vel Max:</strong> —</p>'
-        
-        contenido_html += '</div>'
-        st.markdown(contenido_html, unsafe_allow_html=True)
+    peso = ultimo('Peso (kg): [Número con decimales 88,5]')
+    grasa = ultimo('% grasa corporal')
+    imc = ultimo('IMC')
     
-    # COLUMNA 2: MEDICINA CON SOMBRA GRIS
-    with col2:
-        contenido_html = '<div style="padding: 1.5rem; background: #f7fafc; border-radius: 10px; min-height: 250px;">'
-        contenido_html += '<h4 style="color: #1a365d; margin-top: 0;">🏥 MEDICINA</h4>'
-        
-        if datos_medicos.empty:
-            contenido_html += '<p style="margin: 0.5rem 0;">• <strong>Estado actual:</strong> Sin datos</p>'
-            contenido_html += '<p style="margin: 0.5rem 0;">• <strong>Último control:</strong> —</p>'
-            contenido_html += '<p style="margin: 0.5rem 0;">• <strong>Lesión activa:</strong> —</p>'
-        else:
-            if '¿Puede participar en entrenamientos?' in datos_medicos.columns:
-                participacion = datos_medicos['¿Puede participar en entrenamientos?'].iloc[-1]
-                if participacion == "Solo entrenamiento diferenciado":
-                    contenido_html += '<p style="margin: 0.5rem 0;">• <strong>Estado actual:</strong> 🟡 Limitado</p>'
-                elif participacion == "No puede entrenar":
-                    contenido_html += '<p style="margin: 0.5rem 0;">• <strong>Estado actual:</strong> 🔴 No disponible</p>'
-                else:
-                    contenido_html += '<p style="margin: 0.5rem 0;">• <strong>Estado actual:</strong> 🟢 Disponible</p>'
-            else:
-                contenido_html += '<p style="margin: 0.5rem 0;">• <strong>Estado actual:</strong> 🟢 Disponible</p>'
-            
-            if 'Marca temporal' in datos_medicos.columns:
-                ultimo_control = datos_medicos['Marca temporal'].max()
-                try:
-                    fecha_legible = pd.to_datetime(ultimo_control).strftime('%d/%m/%y')
-                    contenido_html += f'<p style="margin: 0.5rem 0;">• <strong>Último control:</strong> {fecha_legible}</p>'
-                except:
-                    contenido_html += f'<p style="margin: 0.5rem 0;">• <strong>Último control:</strong> {ultimo_control}</p>'
-            else:
-                contenido_html += '<p style="margin: 0.5rem 0;">• <strong>Último control:</strong> —</p>'
-            
-            if 'Tipo de lesión' in datos_medicos.columns:
-                lesion_reciente = datos_medicos['Tipo de lesión'].iloc[-1]
-                if pd.notna(lesion_reciente) and lesion_reciente.strip():
-                    contenido_html += f'<p style="margin: 0.5rem 0;">• <strong>Lesión activa:</strong> {lesion_reciente}</p>'
-                else:
-                    contenido_html += '<p style="margin: 0.5rem 0;">• <strong>Lesión activa:</strong> Ninguna</p>'
-            else:
-                contenido_html += '<p style="margin: 0.5rem 0;">• <strong>Lesión activa:</strong> —</p>'
-        
-        contenido_html += '</div>'
-        st.markdown(contenido_html, unsafe_allow_html=True)
+    items = [
+        ('Peso actual', f"{peso} kg" if peso is not None and pd.notna(peso) else '— kg'),
+        ('% grasa corporal', f"{grasa}%" if grasa is not None and pd.notna(grasa) else '— %'),
+        ('IMC', f"{imc:.1f}" if imc is not None and pd.notna(imc) else '—'),
+        ('Última evaluación', datos_nutricionales['fecha'].max() if 'fecha' in datos_nutricionales.columns else '—'),
+    ]
+    return PANEL_AREA.format(titulo='🥗 NUTRICIÓN', items=render_items(items))
+
+
+def crear_panel_areas_unificado(datos_jugador, tests_fisicos=None):
+    """Crea el panel unificado de las 3 áreas con información específica"""
     
-    # COLUMNA 3: NUTRICIÓN CON SOMBRA GRIS
-    with col3:
-        contenido_html = '<div style="padding: 1.5rem; background: #f7fafc; border-radius: 10px; min-height: 250px;">'
-        contenido_html += '<h4 style="color: #1a365d; margin-top: 0;">🥗 NUTRICIÓN</h4>'
-        
-        if datos_nutricionales.empty:
-            contenido_html += '<p style="margin: 0.5rem 0;">• <strong>Peso actual:</strong> — kg</p>'
-            contenido_html += '<p style="margin: 0.5rem 0;">• <strong>% grasa corporal:</strong> — %</p>'
-            contenido_html += '<p style="margin: 0.5rem 0;">• <strong>IMC:</strong> —</p>'
-        else:
-            if 'Peso (kg): [Número con decimales 88,5]' in datos_nutricionales.columns:
-                peso = datos_nutricionales['Peso (kg): [Número con decimales 88,5]'].iloc[-1]
-                if pd.notna(peso):
-                    contenido_html += f'<p style="margin: 0.5rem 0;">• <strong>Peso actual:</strong> {peso} kg</p>'
-                else:
-                    contenido_html += '<p style="margin: 0.5rem 0;">• <strong>Peso actual:</strong> — kg</p>'
-            else:
-                contenido_html += '<p style="margin: 0.5rem 0;">• <strong>Peso actual:</strong> — kg</p>'
-            
-            if '% grasa corporal' in datos_nutricionales.columns:
-                grasa = datos_nutricionales['% grasa corporal'].iloc[-1]
-                if pd.notna(grasa):
-                    contenido_html += f'<p style="margin: 0.5rem 0;">• <strong>% grasa corporal:</strong> {grasa}%</p>'
-                else:
-                    contenido_html += '<p style="margin: 0.5rem 0;">• <strong>% grasa corporal:</strong> — %</p>'
-            else:
-                contenido_html += '<p style="margin: 0.5rem 0;">• <strong>% grasa corporal:</strong> — %</p>'
-            
-            if 'IMC' in datos_nutricionales.columns:
-                imc = datos_nutricionales['IMC'].iloc[-1]
-                if pd.notna(imc):
-                    contenido_html += f'<p style="margin: 0.5rem 0;">• <strong>IMC:</strong> {imc:.1f}</p>'
-                else:
-                    contenido_html += '<p style="margin: 0.5rem 0;">• <strong>IMC:</strong> —</p>'
-            else:
-                contenido_html += '<p style="margin: 0.5rem 0;">• <strong>IMC:</strong> —</p>'
-            
-            if 'fecha' in datos_nutricionales.columns:
-                ultima_evaluacion = datos_nutricionales['fecha'].max()
-                contenido_html += f'<p style="margin: 0.5rem 0;">• <strong>Última evaluación:</strong> {ultima_evaluacion}</p>'
-            else:
-                contenido_html += '<p style="margin: 0.5rem 0;">• <strong>Última evaluación:</strong> —</p>'
-        
-        contenido_html += '</div>'
-        st.markdown(contenido_html, unsafe_allow_html=True)
+    dni = _dni_jugador(datos_jugador)
+    
+    # Física: fila precomputada del pivot de tests
+    resultados = _resultados_tests_jugador(datos_jugador, list(tests_fisicos or TESTS_PANEL_FISICO))
+    paneles = [fragment_cache.render(
+        'panel_fisico', dni, frame_revision(resultados.to_frame().reset_index()),
+        lambda: _html_panel_fisico(resultados)
+    )]
+    
+    # Cada área se renderiza (y cachea) por separado: solo se reconstruye la que cambió
+    for origen, kind, builder in (
+        ('medica', 'panel_medico', _html_panel_medico),
+        ('nutricion', 'panel_nutricion', _html_panel_nutricion),
+    ):
+        datos_area = datos_jugador[datos_jugador['origen_modulo'] == origen]
+        paneles.append(fragment_cache.render(
+            kind, dni, frame_revision(datos_area), lambda datos=datos_area, build=builder: build(datos)
+        ))
+    
+    st.markdown("### 📊 ÁREAS DE SEGUIMIENTO")
+    
+    # Crear las 3 columnas principales (física, medicina, nutrición)
+    for columna, html in zip(st.columns(3), paneles):
+        with columna:
+            st.markdown(html, unsafe_allow_html=True)
         
                 
                 
@@ -1250,6 +1277,12 @@ def panel_profesional_jugador():
         st.info("💡 Verifica las credenciales de Google Sheets y la conexión a internet")
         return
     
+    panel_seleccion_jugador(df_combinado)
+
+
+@fragmento
+def panel_seleccion_jugador(df_combinado):
+    """Selección de jugador, ficha y paneles por área (rerun parcial)"""
     # Selectores superiores
     st.markdown("### 🎯 Selección de Jugador")
     
@@ -1300,7 +1333,17 @@ def panel_profesional_jugador():
     st.divider()
     
     # ÁREA DE SEGUIMIENTO (ANCHO COMPLETO DEBAJO DE LA FICHA)
-    crear_panel_areas_unificado(datos_jugador)
+    tests_fisicos = TESTS_PANEL_FISICO
+    tests_disponibles = sorted(obtener_pivot_tests_fisicos().columns)
+    if tests_disponibles:
+        tests_fisicos = st.multiselect(
+            "💪 Tests del panel físico:",
+            tests_disponibles,
+            default=[test for test in TESTS_PANEL_FISICO if test in tests_disponibles],
+            key="tests_panel_fisico"
+        ) or TESTS_PANEL_FISICO
+    
+    crear_panel_areas_unificado(datos_jugador, tests_fisicos)
     
     # Footer con información adicional
     st.divider()
@@ -0,0 +1,113 @@
+"""
+Cache de figuras Plotly
+Figuras serializadas (JSON) cacheadas por
+(tipo de gráfico, revisión de datos, filtros), con desalojo LRU
+y límite de cantidad y de tamaño total
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+import plotly.io as pio
+
+try:
+    from .html_fragments import frame_revision
+except ImportError:
+    from html_fragments import frame_revision
+
+# Marca para builders que no generan figura (p. ej. sin datos)
+_SIN_FIGURA = ""
+
+
+class FigureCache:
+    """
+    Cache LRU de figuras Plotly serializadas
+
+    Una vista repetida (o volver a una página) reconstruye la figura desde su
+    JSON sin repetir la agregación de datos ni la construcción con Plotly.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[tuple, str]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def size_bytes(self) -> int:
+        """Tamaño total de las figuras guardadas"""
+        return self._bytes
+
+    def _store(self, key: tuple, payload: str):
+        with self._lock:
+            if key in self._items:
+                self._bytes -= len(self._items.pop(key))
+            self._items[key] = payload
+            self._bytes += len(payload)
+            while self._items and (len(self._items) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._items.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def figure(self, kind: str, revision: str, filters: Hashable, builder: Callable[[], object]):
+        """
+        Obtener una figura del cache o construirla
+
+        Args:
+            kind (str): Tipo de gráfico ('lesiones_por_division', 'evolucion_peso', ...)
+            revision (str): Revisión de los datos del gráfico
+            filters (Hashable): Filtros aplicados (tupla)
+            builder (Callable): Función que construye la figura (o None si no hay datos)
+
+        Returns:
+            go.Figure: Figura reconstruida (None si el builder no generó figura)
+        """
+        key = (kind, revision, filters)
+        with self._lock:
+            payload = self._items.get(key)
+            if payload is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+
+        if payload is None:
+            fig = builder()
+            with self._lock:
+                self.misses += 1
+            payload = fig.to_json() if fig is not None else _SIN_FIGURA
+            # Figuras más grandes que el límite total no se guardan
+            if len(payload) <= self.max_bytes:
+                self._store(key, payload)
+            if fig is not None:
+                return fig
+
+        return pio.from_json(payload) if payload else None
+
+    def clear(self, kind: Optional[str] = None):
+        """Vaciar el cache (todo o solo un tipo de gráfico)"""
+        with self._lock:
+            for key in [k for k in self._items if kind is None or k[0] == kind]:
+                self._bytes -= len(self._items.pop(key))
+
+
+# Cache compartido por el proceso
+figure_cache = FigureCache()
+
+
+def cached_figure(kind: str, df, filters: Hashable, builder: Callable[[], object], revision: str = None):
+    """
+    Figura cacheada para los datos de `df` y los filtros dados
+
+    Args:
+        kind (str): Tipo de gráfico
+        df (pd.DataFrame): Datos de origen (se usa su revisión como clave)
+        filters (Hashable): Filtros aplicados (tupla)
+        builder (Callable): Función que construye la figura
+        revision (str): Revisión ya conocida de `df` (evita recalcularla)
+
+    Returns:
+        go.Figure: Figura (None si no hay figura para esos datos)
+    """
+    return figure_cache.figure(kind, revision or frame_revision(df), filters, builder)
@@ -0,0 +1,149 @@
+"""
+Fragmentos HTML memoizados
+Plantillas para tarjetas y paneles de jugadores, cacheadas por
+(tipo de fragmento, clave, revisión de datos), y el cache LRU con bloqueo
+que comparten los motores memoizados por revisión
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+import pandas as pd
+
+# Plantillas compartidas por el panel 360 y el área física
+TARJETA_DATO = (
+    '<div style="text-align: center; padding: 1rem; background: #f7fafc; border-radius: 10px;">'
+    '<div style="font-size: 0.85rem; color: #718096; font-weight: 600; margin-bottom: 0.5rem;">{etiqueta}</div>'
+    '<div style="font-size: 1.8rem; color: {color}; font-weight: 800;">{valor}</div>'
+    '</div>'
+)
+
+PANEL_AREA = (
+    '<div style="padding: 1.5rem; background: #f7fafc; border-radius: 10px; min-height: 250px;">'
+    '<h4 style="color: #1a365d; margin-top: 0;">{titulo}</h4>'
+    '{items}'
+    '</div>'
+)
+
+ITEM_AREA = '<p style="margin: 0.5rem 0;">• <strong>{etiqueta}:</strong> {valor}</p>'
+
+
+def render_items(items) -> str:
+    """Renderizar pares (etiqueta, valor) como líneas del panel"""
+    return "".join(ITEM_AREA.format(etiqueta=etiqueta, valor=valor) for etiqueta, valor in items)
+
+
+def frame_revision(df: pd.DataFrame) -> str:
+    """
+    Revisión (hash de contenido) de un DataFrame
+
+    Args:
+        df (pd.DataFrame): Datos de origen del fragmento
+
+    Returns:
+        str: Hash hexadecimal; cambia solo si cambian los datos
+    """
+    if df is None or df.empty:
+        return "vacio"
+    try:
+        hashed = pd.util.hash_pandas_object(df, index=True).values
+    except TypeError:
+        # Columnas con valores no hasheables (listas, dicts)
+        hashed = pd.util.hash_pandas_object(df.astype(str), index=True).values
+    digest = hashlib.sha1(hashed.tobytes())
+    digest.update("|".join(map(str, df.columns)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class MemoCache:
+    """
+    Cache LRU con bloqueo, compartido por las sesiones (hilos) de Streamlit
+
+    La consulta, el reordenamiento y el desalojo ocurren bajo el mismo lock;
+    el builder corre fuera del lock, así que dos sesiones con el mismo
+    fallo pueden construir el valor dos veces (gana el último guardado).
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._items: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get_or_build(self, key: Hashable, builder: Callable[[], object]):
+        """
+        Obtener un valor del cache o construirlo
+
+        Args:
+            key (Hashable): Clave del valor (incluye la revisión de los datos)
+            builder (Callable): Función que construye el valor
+
+        Returns:
+            object: Valor cacheado o recién construido
+        """
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+
+        value = builder()
+
+        with self._lock:
+            self.misses += 1
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+        return value
+
+    def clear(self, predicate: Optional[Callable[[Hashable], bool]] = None):
+        """Vaciar el cache (todo o solo las claves que cumplen `predicate`)"""
+        with self._lock:
+            if predicate is None:
+                self._items.clear()
+            else:
+                for key in [k for k in self._items if predicate(k)]:
+                    del self._items[key]
+
+
+class FragmentCache(MemoCache):
+    """
+    Cache LRU de fragmentos HTML renderizados
+
+    Cada fragmento se identifica por (tipo, clave, revisión): un jugador sin
+    cambios reutiliza su HTML y solo se reconstruye el fragmento cuyos datos
+    cambiaron.
+    """
+
+    def __init__(self, max_size: int = 512):
+        super().__init__(max_size)
+
+    def render(self, kind: str, key: Hashable, revision: str, builder: Callable[[], object]):
+        """
+        Obtener un fragmento del cache o construirlo
+
+        Args:
+            kind (str): Tipo de fragmento ('panel_fisico', 'ficha', ...)
+            key (Hashable): Clave del fragmento (p. ej. DNI del jugador)
+            revision (str): Revisión de los datos usados por el fragmento
+            builder (Callable): Función que construye el fragmento
+
+        Returns:
+            object: Fragmento renderizado (str o dict de str)
+        """
+        return self.get_or_build((kind, key, revision), builder)
+
+    def clear(self, kind: Optional[str] = None):
+        """Vaciar el cache (todo o solo un tipo de fragmento)"""
+        super().clear(None if kind is None else (lambda cache_key: cache_key[0] == kind))
+
+
+# Cache compartido por el proceso
+fragment_cache = FragmentCache()
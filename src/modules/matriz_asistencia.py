@@ -0,0 +1,165 @@
+"""
+Matriz de Asistencia (bitsets)
+Representación jugadores × sesiones con un bitset empaquetado por estado:
+las consultas ("faltó 3 de las últimas 5", concurrencia por sesión,
+sesiones compartidas entre jugadores) se resuelven con operaciones de bits
+"""
+
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .asistencia_stats import normalizar_historial
+    from .html_fragments import MemoCache, frame_revision
+except ImportError:
+    from asistencia_stats import normalizar_historial
+    from html_fragments import MemoCache, frame_revision
+
+ESTADOS = ("Presente", "Ausente", "Lesionado")
+
+# Cantidad de bits en 1 de cada byte posible
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint16)
+
+# Matrices memoizadas: revisión -> MatrizAsistencia
+_MATRIX_CACHE = MemoCache(max_size=4)
+
+
+def _contar_bits(bits: np.ndarray) -> np.ndarray:
+    """Cantidad de bits en 1 por fila de un bitset empaquetado"""
+    if bits.size == 0:
+        return np.zeros(bits.shape[0], dtype=np.int64)
+    return _POPCOUNT[bits].sum(axis=-1, dtype=np.int64)
+
+
+class MatrizAsistencia:
+    """
+    Bitsets jugadores × sesiones por estado de asistencia
+
+    Cada jugador es una fila y cada sesión (fecha, categoría, actividad) un
+    bit, ordenado por fecha. Ocupa 1 bit por jugador, sesión y estado, de
+    modo que una temporada de 500 jugadores × 300 sesiones pesa ~75 KB.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        datos = normalizar_historial(df)
+
+        sesiones = (
+            datos[["Fecha", "Categoria", "Tipo_Actividad"]]
+            .drop_duplicates()
+            .sort_values(["Fecha", "Categoria", "Tipo_Actividad"], kind="stable", ignore_index=True)
+        )
+        jugadores = datos.groupby("DNI", sort=True)[["Jugador", "Categoria"]].last()
+
+        self.sesiones = sesiones
+        self.jugadores = jugadores
+        self._fila = pd.Index(jugadores.index)
+        self._num_sesiones = len(sesiones)
+
+        fila = self._fila.get_indexer(datos["DNI"])
+        columna = pd.MultiIndex.from_frame(sesiones).get_indexer(
+            pd.MultiIndex.from_frame(datos[["Fecha", "Categoria", "Tipo_Actividad"]])
+        )
+
+        self.bits: Dict[str, np.ndarray] = {}
+        for estado in ESTADOS + ("Registrado",):
+            mascara = np.zeros((len(jugadores), self._num_sesiones), dtype=bool)
+            seleccion = np.ones(len(datos), dtype=bool) if estado == "Registrado" else datos["Estado"].eq(estado).to_numpy()
+            mascara[fila[seleccion], columna[seleccion]] = True
+            self.bits[estado] = np.packbits(mascara, axis=1)
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria ocupada por los bitsets"""
+        return sum(bits.nbytes for bits in self.bits.values())
+
+    def mascara_sesiones(self, indices: Iterable[int]) -> np.ndarray:
+        """Bitset (empaquetado) con las sesiones indicadas"""
+        mascara = np.zeros(self._num_sesiones, dtype=bool)
+        mascara[list(indices)] = True
+        return np.packbits(mascara)
+
+    def ultimas_sesiones(self, n: int, categoria: Optional[str] = None) -> np.ndarray:
+        """Índices de las últimas `n` sesiones (opcionalmente de una categoría)"""
+        if n <= 0:
+            return np.array([], dtype=np.int64)
+        indices = np.arange(self._num_sesiones)
+        if categoria:
+            indices = indices[self.sesiones["Categoria"].to_numpy() == categoria]
+        return indices[-n:]
+
+    def ultimas_registradas(self, n: int, categoria: Optional[str] = None) -> np.ndarray:
+        """
+        Bitset (empaquetado) con las últimas `n` sesiones registradas de cada jugador
+
+        Cada fila conserva los últimos `n` bits de `Registrado` del jugador, de
+        modo que las sesiones de otras categorías no desplazan su ventana.
+        """
+        registrado = np.unpackbits(self.bits["Registrado"], axis=1, count=self._num_sesiones).astype(bool)
+        if categoria:
+            registrado &= self.sesiones["Categoria"].to_numpy() == categoria
+        # Sesiones registradas desde cada columna hasta el final de la fila
+        desde_el_final = np.cumsum(registrado[:, ::-1], axis=1)[:, ::-1]
+        return np.packbits(registrado & (desde_el_final <= max(n, 0)), axis=1)
+
+    def faltas_recientes(self, ultimas: int = 5, minimo: int = 3,
+                         categoria: Optional[str] = None) -> pd.DataFrame:
+        """
+        Jugadores que faltaron al menos `minimo` de sus últimas `ultimas` sesiones
+
+        Args:
+            ultimas (int): Cantidad de sesiones recientes (registradas) de cada jugador
+            minimo (int): Ausencias mínimas para incluir al jugador
+            categoria (str): Limitar a las sesiones de una categoría
+
+        Returns:
+            pd.DataFrame: DNI, Jugador, Categoria, Ausencias, Registradas
+        """
+        ventana = self.ultimas_registradas(ultimas, categoria)
+        ausencias = _contar_bits(self.bits["Ausente"] & ventana)
+        registradas = _contar_bits(ventana)
+
+        resultado = self.jugadores.assign(Ausencias=ausencias, Registradas=registradas)
+        resultado = resultado[resultado["Ausencias"] >= minimo]
+        return resultado.sort_values("Ausencias", ascending=False, kind="stable").reset_index()
+
+    def concurrencia(self) -> pd.DataFrame:
+        """Jugadores por estado en cada sesión"""
+        conteos = {
+            estado: np.unpackbits(self.bits[estado], axis=1, count=self._num_sesiones).sum(axis=0)
+            for estado in ESTADOS + ("Registrado",)
+        }
+        return self.sesiones.assign(**conteos)
+
+    def sesiones_compartidas(self, dni_a: str, dni_b: str, estado: str = "Presente") -> int:
+        """Cantidad de sesiones en las que ambos jugadores tuvieron el mismo estado"""
+        filas = self._fila.get_indexer([dni_a, dni_b])
+        if (filas < 0).any():
+            return 0
+        bits = self.bits[estado]
+        return int(_contar_bits(bits[filas[0]] & bits[filas[1]]))
+
+    def coincidencias(self, dni: str, estado: str = "Presente") -> pd.Series:
+        """Sesiones compartidas de un jugador con todos los demás (una operación AND por fila)"""
+        if dni not in self._fila:
+            return pd.Series(dtype=np.int64, index=pd.Index([], name=self._fila.name))
+        fila = self._fila.get_loc(dni)
+        bits = self.bits[estado]
+        compartidas = pd.Series(_contar_bits(bits & bits[fila]), index=self._fila)
+        return compartidas.drop(dni).sort_values(ascending=False)
+
+
+def obtener_matriz_asistencia(df: pd.DataFrame, revision: str = None) -> MatrizAsistencia:
+    """
+    Obtener la matriz de asistencia, memoizada por revisión de datos
+
+    Args:
+        df (pd.DataFrame): Historial completo de asistencias
+        revision (str): Revisión ya conocida del historial (se calcula si falta)
+
+    Returns:
+        MatrizAsistencia: Bitsets jugadores × sesiones
+    """
+    key = revision or frame_revision(df)
+    return _MATRIX_CACHE.get_or_build(key, lambda: MatrizAsistencia(df))
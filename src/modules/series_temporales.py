@@ -0,0 +1,120 @@
+"""
+Series Temporales
+Agregación adaptativa (día, semana o mes según el rango visible),
+reducción min/max del lado del servidor y elección de trazas WebGL,
+para que los gráficos de historial largo mantengan acotada la cantidad
+de puntos enviados al navegador
+"""
+
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# Cantidad máxima de intervalos de una serie agregada
+MAX_INTERVALOS = 120
+# Cantidad máxima de puntos de una serie cruda después de reducirla
+MAX_PUNTOS = 600
+# A partir de esta cantidad de puntos se usa Scattergl (WebGL)
+UMBRAL_WEBGL = 500
+# Series con más puntos se dibujan sin etiquetas de texto por punto
+MAX_ETIQUETAS = 60
+
+# Granularidad -> (frecuencia de pandas, días aproximados, etiqueta)
+GRANULARIDADES = {
+    "D": ("D", 1, "día"),
+    "W": ("W-MON", 7, "semana"),
+    "M": ("MS", 30.44, "mes"),
+}
+
+
+def elegir_granularidad(inicio, fin, max_intervalos: int = MAX_INTERVALOS) -> str:
+    """
+    Elegir día, semana o mes según el rango de fechas visible
+
+    Args:
+        inicio: Primera fecha del rango
+        fin: Última fecha del rango
+        max_intervalos (int): Intervalos máximos deseados
+
+    Returns:
+        str: 'D', 'W' o 'M' (la más fina que no supere `max_intervalos`)
+    """
+    dias = (pd.Timestamp(fin) - pd.Timestamp(inicio)).days + 1
+    for granularidad, (_, largo, _) in GRANULARIDADES.items():
+        if dias / largo <= max_intervalos:
+            return granularidad
+    return "M"
+
+
+def agrupar_conteos(fechas: pd.Series, granularidad: str = None,
+                    max_intervalos: int = MAX_INTERVALOS) -> Tuple[pd.Series, str]:
+    """
+    Contar eventos por intervalo de tiempo (los intervalos vacíos cuentan 0)
+
+    Args:
+        fechas (pd.Series): Fechas de los eventos (se descartan las inválidas)
+        granularidad (str): 'D', 'W' o 'M'; si falta se elige según el rango
+        max_intervalos (int): Intervalos máximos para la elección automática
+
+    Returns:
+        Tuple[pd.Series, str]: Conteo indexado por inicio de intervalo y la granularidad usada
+    """
+    fechas = pd.to_datetime(fechas, errors="coerce").dropna()
+    if fechas.empty:
+        return pd.Series(dtype="int64"), granularidad or "D"
+
+    granularidad = granularidad or elegir_granularidad(fechas.min(), fechas.max(), max_intervalos)
+    frecuencia = GRANULARIDADES[granularidad][0]
+    conteo = (
+        pd.Series(1, index=pd.DatetimeIndex(fechas).normalize())
+        .resample(frecuencia, label="left", closed="left")
+        .sum()
+    )
+    return conteo.astype("int64"), granularidad
+
+
+def reducir_min_max(y, max_puntos: int = MAX_PUNTOS) -> np.ndarray:
+    """
+    Índices de una serie reducida conservando la forma (mínimo y máximo por tramo)
+
+    La serie se divide en `max_puntos / 2` tramos consecutivos y de cada uno
+    se conservan el punto mínimo y el máximo en su orden original, además
+    del primero y el último, de modo que picos y valles siguen visibles.
+    Los valores faltantes (NaN) se ignoran al buscar el mínimo y el máximo.
+
+    Args:
+        y: Valores del eje y (ordenados por el eje x)
+        max_puntos (int): Puntos máximos a conservar
+
+    Returns:
+        np.ndarray: Posiciones (ordenadas) de los puntos a conservar
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= max_puntos:
+        return np.arange(n)
+
+    tramos = max(max_puntos // 2 - 1, 1)
+    tramo = np.arange(n) * tramos // n
+    # Los NaN no compiten por el mínimo/máximo (tramos sin valores no aportan puntos)
+    validos = ~np.isnan(y)
+    serie = pd.Series(y[validos], index=np.flatnonzero(validos))
+    por_tramo = serie.groupby(tramo[validos])
+    indices = np.concatenate([
+        por_tramo.idxmin().to_numpy(),
+        por_tramo.idxmax().to_numpy(),
+        [0, n - 1],
+    ])
+    return np.unique(indices)
+
+
+def clase_traza(puntos: int):
+    """Scattergl (WebGL) para series grandes, Scatter (SVG) para el resto"""
+    return go.Scattergl if puntos > UMBRAL_WEBGL else go.Scatter
+
+
+def etiqueta_granularidad(granularidad: str) -> str:
+    """Texto de la granularidad para títulos ('día', 'semana', 'mes')"""
+    return GRANULARIDADES[granularidad][2]
@@ -8,6 +8,14 @@ import hashlib
 import json
 from datetime import datetime, timedelta
 from typing import Dict, Optional, Tuple
+import os
+
+try:
+    from .login_audit import login_audit_log
+    from .user_directory import get_user_directory
+except ImportError:
+    from login_audit import login_audit_log
+    from user_directory import get_user_directory
 
 
 class AuthManager:
@@ -18,7 +26,7 @@ class AuthManager:
     - Login seguro con hash de contraseñas
     - Gestión de sesiones
     - Control de roles (Médico, Administrador)
-    - Registro de accesos
+    - Registro de accesos (log JSONL de solo-agregado)
     """
     
     def __init__(self):
@@ -26,13 +34,11 @@ class AuthManager:
         self.users_file = "data/medical_users.json"
         self.session_duration = timedelta(hours=8)  # 8 horas de sesión
         self._ensure_users_file()
+        self.directory = get_user_directory(self.users_file)
     
     def _ensure_users_file(self):
         """Crear archivo de usuarios si no existe"""
-        try:
-            with open(self.users_file, 'r', encoding='utf-8') as f:
-                json.load(f)
-        except FileNotFoundError:
+        if not os.path.exists(self.users_file):
             # Crear usuarios por defecto
             default_users = {
                 "users": [
@@ -69,10 +75,10 @@ class AuthManager:
                         "created_date": datetime.now().strftime("%Y-%m-%d"),
                         "last_login": None
                     }
-                ],
-                "login_logs": []
+                ]
             }
             
+            os.makedirs(os.path.dirname(self.users_file), exist_ok=True)
             with open(self.users_file, 'w', encoding='utf-8') as f:
                 json.dump(default_users, f, indent=2, ensure_ascii=False)
     
@@ -102,43 +108,20 @@ class AuthManager:
             Tuple[bool, Optional[Dict]]: (Success, User_Data)
         """
         try:
-            with open(self.users_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            password_hash = self._hash_password(password)
+            user = self.directory.get(username)
             
-            for user in data['users']:
-                if (user['username'] == username and 
-                    user['password_hash'] == password_hash and 
-                    user['active']):
-                    
-                    # Actualizar último login
-                    user['last_login'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    
-                    # Registrar login
-                    data['login_logs'].append({
-                        "username": username,
-                        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                        "ip": "local",  # En producción, obtener IP real
-                        "success": True
-                    })
-                    
-                    # Guardar cambios
-                    with open(self.users_file, 'w', encoding='utf-8') as f:
-                        json.dump(data, f, indent=2, ensure_ascii=False)
-                    
-                    return True, user
+            if (user is not None and
+                user['password_hash'] == self._hash_password(password) and
+                user['active']):
+                
+                # El último login se deriva del log de auditoría (persistente)
+                login_audit_log.record(username, success=True)
+                user['last_login'] = login_audit_log.last_success(username)
+                
+                return True, user
             
             # Registrar intento fallido
-            data['login_logs'].append({
-                "username": username,
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "ip": "local",
-                "success": False
-            })
-            
-            with open(self.users_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            login_audit_log.record(username, success=False)
             
             return False, None
             
@@ -318,11 +301,4 @@ class AuthManager:
         if not required_role:
             return True
         
-        user_role = st.session_state.get('role', '')
-        
-        # Admin tiene acceso a todo
-        if user_role == 'admin':
-            return True
-        
-        # Verificar rol específico
-        return user_role == required_role
\ No newline at end of file
+        return self.directory.has_permission(st.session_state.get('username', ''), required_role)
@@ -0,0 +1,136 @@
+"""
+Registro de Accesos (Auditoría de Login)
+Log JSONL de solo-agregado con rotación por tamaño
+Cada intento de login agrega una línea; nunca se reescribe el archivo de usuarios
+"""
+
+import json
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+class LoginAuditLog:
+    """
+    Log de accesos en formato JSON Lines
+
+    Funcionalidades:
+    - Escritura O(1) por intento (append)
+    - Rotación automática: login_audit.jsonl -> .1 -> .2 ...
+    - Lectura de los últimos N eventos
+    - Último login exitoso por usuario (derivado del log, persiste entre reinicios)
+    """
+
+    def __init__(self, path: str = "data/login_audit.jsonl",
+                 max_bytes: int = 5 * 1024 * 1024, backups: int = 5):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lock = threading.Lock()
+        # Usuario -> timestamp del último login exitoso (se arma al primer uso)
+        self._last_success: Optional[Dict[str, str]] = None
+
+    def _scan_last_success(self) -> Dict[str, str]:
+        """Recorrer los archivos (del más antiguo al actual) buscando logins exitosos"""
+        last_success = {}
+        paths = [f"{self.path}.{i}" for i in range(self.backups, 0, -1)] + [self.path]
+        for path in paths:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            event = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
+                        if event.get("success") and event.get("username"):
+                            last_success[event["username"]] = event.get("timestamp")
+            except FileNotFoundError:
+                continue
+        return last_success
+
+    def _rotate(self):
+        """Rotar el archivo actual si superó el tamaño máximo"""
+        try:
+            if os.path.getsize(self.path) < self.max_bytes:
+                return
+        except OSError:
+            return
+
+        for i in range(self.backups - 1, 0, -1):
+            source = f"{self.path}.{i}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+    def record(self, username: str, success: bool, ip: str = "local", **extra):
+        """
+        Registrar un intento de login
+
+        Args:
+            username (str): Usuario que intentó ingresar
+            success (bool): Resultado del intento
+            ip (str): Origen del intento
+        """
+        event = {
+            "username": username,
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "ip": ip,
+            "success": success,
+            **extra
+        }
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._rotate()
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+            if success and self._last_success is not None:
+                self._last_success[username] = event["timestamp"]
+
+    def last_success(self, username: str) -> Optional[str]:
+        """
+        Timestamp del último login exitoso de un usuario
+
+        Args:
+            username (str): Usuario
+
+        Returns:
+            Optional[str]: "%Y-%m-%d %H:%M:%S" o None si nunca ingresó
+        """
+        with self._lock:
+            if self._last_success is None:
+                self._last_success = self._scan_last_success()
+            return self._last_success.get(username)
+
+    def recent(self, limit: int = 50) -> List[Dict]:
+        """
+        Obtener los últimos eventos del archivo actual
+
+        Args:
+            limit (int): Cantidad máxima de eventos
+
+        Returns:
+            List[Dict]: Eventos, del más antiguo al más reciente
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                lines = deque(f, maxlen=limit)
+        except FileNotFoundError:
+            return []
+
+        events = []
+        for line in lines:
+            try:
+                events.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+        return events
+
+
+# Log compartido por el proceso
+login_audit_log = LoginAuditLog()
@@ -10,10 +10,18 @@ import pandas as pd
 import json
 import hashlib
 import os
-from PIL import Image
-import base64
+import sys
 from datetime import datetime, timedelta
 
+try:
+    from user_directory import get_user_directory
+except ImportError:
+    from src.otro.user_directory import get_user_directory
+
+# Recursos estáticos compartidos (src/assets.py)
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from assets import image_base64, inject_css, optimized_image
+
 # Configuración de la página
 st.set_page_config(
     page_title="CAR - Club Argentino de Rugby",
@@ -30,19 +38,26 @@ class AuthManager:
     
     def __init__(self):
         self.credentials_file = CREDENTIALS_FILE
+        self.directory = get_user_directory(self.credentials_file)
         self.load_credentials()
     
+    @property
+    def users(self):
+        """Copia de todos los usuarios (para consultas puntuales usar get / in)"""
+        return self.directory.users
+    
+    def __contains__(self, username):
+        """Existe el usuario (sin copiar el directorio)"""
+        return username in self.directory
+    
+    def get(self, username):
+        """Datos de un usuario (copia solo de ese usuario)"""
+        return self.directory.get(username)
+    
     def load_credentials(self):
-        """Cargar credenciales desde archivo JSON"""
-        if os.path.exists(self.credentials_file):
-            try:
-                with open(self.credentials_file, 'r', encoding='utf-8') as f:
-                    self.users = json.load(f)
-            except:
-                self.users = {}
-        else:
-            # Crear usuario administrador por defecto
-            self.users = {
+        """Crear el archivo de credenciales con el administrador por defecto si no existe"""
+        if not os.path.exists(self.credentials_file):
+            self.save_credentials({
                 "admin": {
                     "password": self.hash_password("admin123"),
                     "name": "Administrador",
@@ -50,13 +65,13 @@ class AuthManager:
                     "role": "admin",
                     "created_at": datetime.now().isoformat()
                 }
-            }
-            self.save_credentials()
+            })
     
-    def save_credentials(self):
+    def save_credentials(self, users=None):
         """Guardar credenciales en archivo JSON"""
         with open(self.credentials_file, 'w', encoding='utf-8') as f:
-            json.dump(self.users, f, indent=2, ensure_ascii=False)
+            json.dump(self.users if users is None else users, f, indent=2, ensure_ascii=False)
+        self.directory.invalidate()
     
     def hash_password(self, password):
         """Encriptar contraseña"""
@@ -64,30 +79,34 @@ class AuthManager:
     
     def verify_credentials(self, username, password):
         """Verificar credenciales de usuario"""
-        if username in self.users:
-            hashed_password = self.hash_password(password)
-            if self.users[username]["password"] == hashed_password:
-                return True, self.users[username]
+        user = self.get(username)
+        if user is not None and user["password"] == self.hash_password(password):
+            return True, user
         return False, None
     
+    def has_permission(self, username, required_role=None):
+        """Verificar el rol de un usuario desde el directorio en memoria"""
+        return self.directory.has_permission(username, required_role)
+    
     def register_user(self, username, password, name, email):
         """Registrar nuevo usuario"""
-        if username in self.users:
+        if username in self:
             return False, "El usuario ya existe"
         
-        self.users[username] = {
+        users = self.users
+        users[username] = {
             "password": self.hash_password(password),
             "name": name,
             "email": email,
             "role": "user",
             "created_at": datetime.now().isoformat()
         }
-        self.save_credentials()
+        self.save_credentials(users)
         return True, "Usuario creado exitosamente"
 
 def load_css():
     """Cargar estilos CSS personalizados"""
-    st.markdown("""
+    inject_css("""
     <style>
     /* Importar fuente moderna */
     @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
@@ -238,14 +257,13 @@ def load_css():
         }
     }
     </style>
-    """, unsafe_allow_html=True)
+    """)
 
 def get_base64_image(image_path):
-    """Convertir imagen a base64 para mostrar en HTML"""
+    """Convertir imagen a base64 (WebP optimizada, cacheada por hash) para mostrar en HTML"""
     try:
-        with open(image_path, "rb") as img_file:
-            return base64.b64encode(img_file.read()).decode()
-    except:
+        return image_base64(image_path)
+    except Exception:
         return None
 
 def show_logo():
@@ -254,10 +272,8 @@ def show_logo():
     
     if os.path.exists(logo_path):
         try:
-            # Cargar y mostrar la imagen
-            image = Image.open(logo_path)
-            # Redimensionar manteniendo proporción
-            image.thumbnail((100, 100), Image.Resampling.LANCZOS)
+            # Imagen redimensionada una sola vez (cacheada por hash del archivo)
+            image = optimized_image(logo_path, max_width=200)
             
             st.markdown("""
             <div class="logo-container">
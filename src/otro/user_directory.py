@@ -0,0 +1,135 @@
+"""
+Directorio de Usuarios en Memoria
+Cache por proceso de los archivos de credenciales, indexado por usuario
+Se relee solo cuando cambia el mtime/tamaño del archivo y su contenido (hash)
+Las consultas devuelven copias: el índice compartido nunca se modifica desde afuera
+"""
+
+import copy
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+
+class UserDirectory:
+    """
+    Índice usuario -> datos para un archivo de credenciales
+
+    Acepta los dos formatos usados en el sistema:
+    - {"usuario": {...}, ...}                      (login principal)
+    - {"users": [{"username": "usuario", ...}]}    (área médica)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stat = None
+        self._digest = None
+        self._data: Dict = {}
+        self._by_username: Dict[str, Dict] = {}
+
+    @staticmethod
+    def _index(data: Dict) -> Dict[str, Dict]:
+        """Construir el índice por nombre de usuario"""
+        if isinstance(data.get("users"), list):
+            return {user.get("username"): user for user in data["users"] if user.get("username")}
+        return {username: user for username, user in data.items() if isinstance(user, dict)}
+
+    def _refresh(self):
+        """Releer el archivo si cambió en disco"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._stat, self._digest, self._data, self._by_username = None, None, {}, {}
+            return
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._stat:
+            return
+
+        with open(self.path, "rb") as f:
+            content = f.read()
+        digest = hashlib.sha1(content).hexdigest()
+
+        # Mismo contenido (p. ej. archivo re-guardado sin cambios): conservar el índice
+        if digest != self._digest:
+            try:
+                data = json.loads(content.decode("utf-8")) if content.strip() else {}
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                data = {}
+            self._data = data if isinstance(data, dict) else {}
+            self._by_username = self._index(self._data)
+            self._digest = digest
+        self._stat = signature
+
+    @property
+    def data(self) -> Dict:
+        """Contenido completo del archivo (copia)"""
+        with self._lock:
+            self._refresh()
+            return copy.deepcopy(self._data)
+
+    @property
+    def users(self) -> Dict[str, Dict]:
+        """Usuarios indexados por nombre de usuario (copia)"""
+        with self._lock:
+            self._refresh()
+            return copy.deepcopy(self._by_username)
+
+    def __contains__(self, username: str) -> bool:
+        """Existe el usuario (sin copiar el índice)"""
+        with self._lock:
+            self._refresh()
+            return username in self._by_username
+
+    def get(self, username: str) -> Optional[Dict]:
+        """Buscar un usuario en O(1) (copia de sus datos)"""
+        with self._lock:
+            self._refresh()
+            user = self._by_username.get(username)
+            return copy.deepcopy(user) if user is not None else None
+
+    def role_of(self, username: str) -> Optional[str]:
+        """Rol del usuario (o None si no existe)"""
+        with self._lock:
+            self._refresh()
+            user = self._by_username.get(username)
+            return user.get("role") if user else None
+
+    def has_permission(self, username: str, required_role: Optional[str] = None) -> bool:
+        """
+        Verificar permisos de un usuario
+
+        Args:
+            username (str): Usuario
+            required_role (str): Rol requerido ('admin', 'medico', etc.)
+
+        Returns:
+            bool: True si tiene permisos (admin tiene acceso a todo)
+        """
+        role = self.role_of(username)
+        if role is None:
+            return False
+        if not required_role or role == "admin":
+            return True
+        return role == required_role
+
+    def invalidate(self):
+        """Forzar la relectura en el próximo acceso"""
+        with self._lock:
+            self._stat = None
+
+
+_directories: Dict[str, UserDirectory] = {}
+_directories_lock = threading.Lock()
+
+
+def get_user_directory(path: str) -> UserDirectory:
+    """Directorio compartido por el proceso para un archivo de credenciales"""
+    key = os.path.abspath(path)
+    with _directories_lock:
+        if key not in _directories:
+            _directories[key] = UserDirectory(path)
+        return _directories[key]
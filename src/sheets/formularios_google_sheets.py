@@ -12,6 +12,26 @@ from typing import List, Dict, Optional, Tuple
 import os
 import json
 
+try:
+    from .medical_stats import compute_medical_statistics, sheet_revision
+except ImportError:
+    from medical_stats import compute_medical_statistics, sheet_revision
+
+try:
+    from .medical_normalization import determine_status
+except ImportError:
+    from medical_normalization import determine_status
+
+try:
+    from src.local_store import get_local_store
+except ImportError:
+    from local_store import get_local_store
+
+try:
+    from .public_csv import public_csv_url, fetch_public_csv, public_csv_revision
+except ImportError:
+    from public_csv import public_csv_url, fetch_public_csv, public_csv_revision
+
 
 import os
 
@@ -33,6 +53,7 @@ class FormulariosGoogleSheets:
         self.gc = None
         self.worksheet = None
         self.credentials_loaded = False  # ASEGURAR QUE EXISTE
+        self.records_revision = None  # Revisión de la última lectura (para cachear estadísticas)
         
         # Intentar configurar conexión
         try:
@@ -215,6 +236,9 @@ class FormulariosGoogleSheets:
                 spreadsheet = self.client.open_by_key(self.sheet_config["sheet_id"])
                 worksheet = spreadsheet.worksheet(self.sheet_config["worksheet_name"])
                 
+                # Revisión leída antes que los datos: una edición posterior la cambia
+                self.records_revision = sheet_revision(spreadsheet, self.sheet_config["worksheet_name"])
+                
                 # Obtener todos los registros como diccionarios
                 records = worksheet.get_all_records()
                 
@@ -259,69 +283,6 @@ class FormulariosGoogleSheets:
             # Usar API pública directamente
             return self.get_public_data()
     
-    def get_statistics(self) -> Dict:
-        """
-        Obtener estadísticas de los registros médicos
-        
-        Returns:
-            Dict: Diccionario con estadísticas
-        """
-        success, records = self.read_medical_records()
-        
-        if not success or not records:
-            return {
-                "total_registros": 0,
-                "registros_hoy": 0,
-                "profesionales_activos": 0,
-                "casos_graves": 0,
-                "ultimo_registro": "N/A"
-            }
-        
-        # Calcular estadísticas
-        hoy = datetime.now().date()
-        registros_hoy = 0
-        profesionales = set()
-        casos_graves = 0
-        
-        for record in records:
-            # Profesionales únicos
-            if record.get("nombre_profesional"):
-                profesionales.add(record["nombre_profesional"])
-            
-            # Registros de hoy
-            fecha_str = record.get("fecha_registro", "")
-            if fecha_str:
-                try:
-                    fecha = datetime.strptime(fecha_str, "%Y-%m-%d").date()
-                    if fecha == hoy:
-                        registros_hoy += 1
-                except:
-                    pass
-            
-            # Casos graves
-            severidad = record.get("severidad", "").lower()
-            if any(word in severidad for word in ["grave", "crítico", "severo"]):
-                casos_graves += 1
-        
-        # Último registro
-        ultimo_registro = "N/A"
-        if records:
-            ultimo_timestamp = records[-1].get("timestamp", "")
-            if ultimo_timestamp:
-                try:
-                    dt = datetime.strptime(ultimo_timestamp, "%Y-%m-%d %H:%M:%S")
-                    ultimo_registro = dt.strftime("%d/%m/%Y %H:%M")
-                except:
-                    ultimo_registro = ultimo_timestamp[:16]
-        
-        return {
-            "total_registros": len(records),
-            "registros_hoy": registros_hoy,
-            "profesionales_activos": len(profesionales),
-            "casos_graves": casos_graves,
-            "ultimo_registro": ultimo_registro
-        }
-    
     def _determinar_estado(self, severidad: str) -> str:
         """
         Determinar estado del paciente basado en severidad
@@ -332,16 +293,7 @@ class FormulariosGoogleSheets:
         Returns:
             str: Estado determinado
         """
-        severidad_lower = severidad.lower()
-        
-        if any(word in severidad_lower for word in ["leve", "menor"]):
-            return "Seguimiento"
-        elif any(word in severidad_lower for word in ["moderada", "intermedio"]):
-            return "Tratamiento activo"
-        elif any(word in severidad_lower for word in ["grave", "severo", "crítico"]):
-            return "Atención prioritaria"
-        else:
-            return "En evaluación"
+        return determine_status(severidad)
     
     def sync_with_car_system(self) -> int:
         """
@@ -357,16 +309,9 @@ class FormulariosGoogleSheets:
             if not success or not gs_records:
                 return 0
             
-            # Cargar registros existentes del sistema CAR
-            from src.utils import load_json_data, save_medical_data
-            
-            existing_data = load_json_data('data/medical_records.json', {'injuries': []})
-            
-            # Crear set de timestamps existentes para evitar duplicados
-            existing_timestamps = set()
-            for injury in existing_data['injuries']:
-                if 'timestamp' in injury:
-                    existing_timestamps.add(injury['timestamp'])
+            # Timestamps ya presentes en el almacén local (para evitar duplicados)
+            store = get_local_store()
+            existing_timestamps = store.field_values('injuries', 'timestamp')
             
             # Convertir registros de Google Sheets al formato CAR
             nuevos_registros = []
@@ -391,9 +336,8 @@ class FormulariosGoogleSheets:
                     nuevos_registros.append(car_record)
             
             if nuevos_registros:
-                # Agregar al sistema CAR
-                existing_data['injuries'].extend(nuevos_registros)
-                save_medical_data(existing_data['injuries'])
+                # Agregar al sistema CAR (una transacción, sin reescribir el resto)
+                store.upsert_many('injuries', nuevos_registros)
                 return len(nuevos_registros)
             
             return 0
@@ -422,16 +366,14 @@ class FormulariosGoogleSheets:
                     "error": "No se pudieron cargar los datos"
                 }
             
-            # Calcular estadísticas
-            lesiones_totales = len(records)
-            lesiones_activas = len([r for r in records if r.get('estado', '').lower() in ['activa', 'active', 'en tratamiento']])
-            casos_graves = len([r for r in records if r.get('severidad', '').lower() in ['grave', 'severa', 'critica']])
+            # Calcular estadísticas (memoizadas por revisión de datos)
+            stats = compute_medical_statistics(records, revision=self.records_revision)
             
             return {
-                "lesiones_totales": lesiones_totales,
-                "lesiones_activas": lesiones_activas,
-                "registros_google": lesiones_totales,
-                "casos_graves": casos_graves,
+                "lesiones_totales": stats["total_registros"],
+                "lesiones_activas": stats["registros_activos"],
+                "registros_google": stats["total_registros"],
+                "casos_graves": stats["casos_graves"],
                 "ultima_actualizacion": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                 "error": None
             }
@@ -477,23 +419,29 @@ class FormulariosGoogleSheets:
             Tuple[bool, str]: (Success, Message)
         """
         try:
-            import requests
-            
-            # URL para obtener datos CSV públicos
-            csv_url = f"https://docs.google.com/spreadsheets/d/{self.sheet_config['sheet_id']}/export?format=csv&gid=0"
-            
-            response = requests.get(csv_url, timeout=10)
-            response.raise_for_status()
-            
-            # Contar líneas para obtener número de registros
-            lines = response.text.strip().split('\n')
-            total_records = max(0, len(lines) - 1)  # -1 para excluir headers
+            # CSV público (no se re-descarga si el export no cambió)
+            frame = self.get_public_frame()
+            total_records = len(frame)
             
             return True, f"✅ Conectado vía API pública - {total_records} registros"
             
         except Exception as e:
             return False, f"❌ Error al leer registros: {str(e)}"
     
+    def get_public_frame(self, force: bool = False) -> pd.DataFrame:
+        """
+        Obtener el export CSV público como DataFrame
+        
+        Args:
+            force (bool): Descargar aunque el export no haya cambiado
+            
+        Returns:
+            pd.DataFrame: Datos de la hoja (columnas de texto)
+        """
+        csv_url = public_csv_url(self.sheet_config['sheet_id'])
+        frame, _ = fetch_public_csv(csv_url, force=force)
+        return frame
+    
     def get_public_data(self) -> Tuple[bool, List[Dict]]:
         """
         Obtener datos usando API pública de Google Sheets
@@ -502,35 +450,13 @@ class FormulariosGoogleSheets:
             Tuple[bool, List[Dict]]: (Success, Data)
         """
         try:
-            import requests
-            
-            # URL para CSV público
-            csv_url = f"https://docs.google.com/spreadsheets/d/{self.sheet_config['sheet_id']}/export?format=csv&gid=0"
-            
-            response = requests.get(csv_url, timeout=10)
-            response.raise_for_status()
-            
-            # Procesar CSV
-            lines = response.text.strip().split('\n')
-            if len(lines) < 2:
-                return True, []
-            
-            # Headers
-            headers = [h.strip('"') for h in lines[0].split(',')]
-            
-            # Datos
-            data = []
-            for line in lines[1:]:
-                if line.strip():
-                    values = [v.strip('"') for v in line.split(',')]
-                    if len(values) >= len(headers):
-                        row_data = dict(zip(headers, values))
-                        data.append(row_data)
-            
-            return True, data
+            frame = self.get_public_frame()
+            self.records_revision = public_csv_revision(public_csv_url(self.sheet_config['sheet_id']))
+            return True, frame.to_dict('records')
             
         except Exception as e:
             print(f"Error en get_public_data: {e}")
+            self.records_revision = None
             return False, []
     
     def get_statistics(self) -> Dict:
@@ -568,25 +494,13 @@ class FormulariosGoogleSheets:
                     'ultima_actualizacion': 'Sin datos'
                 }
             
-            # Calcular estadísticas
-            total_registros = len(data)
-            registros_activos = 0
-            casos_graves = 0
-            
-            for row in data:
-                # Buscar estados activos (adaptable a diferentes columnas)
-                for key, value in row.items():
-                    if isinstance(value, str):
-                        value_lower = value.lower()
-                        if 'activ' in value_lower and key.lower() in ['estado', 'status']:
-                            registros_activos += 1
-                        if any(word in value_lower for word in ['grave', 'crítico', 'serio']) and key.lower() in ['severidad', 'gravedad']:
-                            casos_graves += 1
+            # Calcular estadísticas (memoizadas por revisión de datos)
+            stats = compute_medical_statistics(data, revision=self.records_revision)
             
             return {
-                'total_registros': total_registros,
-                'registros_activos': registros_activos,
-                'casos_graves': casos_graves,
+                'total_registros': stats['total_registros'],
+                'registros_activos': stats['registros_activos'],
+                'casos_graves': stats['casos_graves'],
                 'ultima_actualizacion': datetime.now().strftime("%Y-%m-%d %H:%M")
             }
             
@@ -600,10 +514,27 @@ class FormulariosGoogleSheets:
     
     def _get_authenticated_statistics(self) -> Dict:
         """Estadísticas usando autenticación original"""
-        # Método original existente
+        success, records = self.read_medical_records()
+        
+        if not success or not records:
+            return {
+                'total_registros': 0,
+                'registros_activos': 0,
+                'registros_hoy': 0,
+                'profesionales_activos': 0,
+                'casos_graves': 0,
+                'ultimo_registro': 'N/A',
+                'ultima_actualizacion': 'Sin datos'
+            }
+        
+        stats = compute_medical_statistics(records, revision=self.records_revision)
+        
         return {
-            'total_registros': 0,
-            'registros_activos': 0,
-            'casos_graves': 0,
+            'total_registros': stats['total_registros'],
+            'registros_activos': stats['registros_activos'],
+            'registros_hoy': stats['registros_hoy'],
+            'profesionales_activos': stats['profesionales_activos'],
+            'casos_graves': stats['casos_graves'],
+            'ultimo_registro': stats['ultimo_registro'],
             'ultima_actualizacion': datetime.now().strftime("%Y-%m-%d %H:%M")
-        }
\ No newline at end of file
+        }
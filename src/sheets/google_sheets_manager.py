@@ -12,6 +12,17 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple
 import os
 import json
+import bisect
+
+try:
+    from .medical_stats import compute_medical_statistics, sheet_revision
+except ImportError:
+    from medical_stats import compute_medical_statistics, sheet_revision
+
+try:
+    from .medical_normalization import determine_status
+except ImportError:
+    from medical_normalization import determine_status
 
 
 class GoogleSheetsManager:
@@ -45,6 +56,13 @@ class GoogleSheetsManager:
         self.credentials_loaded = False
         self.use_secrets = use_secrets
         
+        # Índices cacheados por hoja: header->columna e ID->fila
+        self._worksheet_index = {}
+        self.index_ttl = timedelta(minutes=5)
+        
+        # Revisión de la última lectura de registros (para cachear estadísticas)
+        self.records_revision = None
+        
         # Configuración por defecto del Google Sheet
         self.sheet_config = {
             "sheet_id": None,  # Se cargará desde secrets o config
@@ -308,6 +326,9 @@ class GoogleSheetsManager:
             worksheet_name = self.sheet_config["worksheets"]["medical_records"]
             worksheet = spreadsheet.worksheet(worksheet_name)
             
+            # Revisión leída antes que los datos: una edición posterior la cambia
+            self.records_revision = sheet_revision(spreadsheet, worksheet_name)
+            
             # Obtener todos los registros como diccionarios
             records = worksheet.get_all_records()
             
@@ -373,6 +394,9 @@ class GoogleSheetsManager:
             existing_records = worksheet.get_all_values()
             next_id = len(existing_records)  # Incluye header, así que es el siguiente ID
             
+            # Aprovechar la descarga para refrescar el índice de la hoja
+            index = self._build_worksheet_index(worksheet, existing_records)
+            
             # Preparar fila de datos
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             fecha_registro = datetime.now().strftime("%Y-%m-%d")
@@ -402,11 +426,181 @@ class GoogleSheetsManager:
             # Agregar a Google Sheets
             worksheet.append_row(row_data)
             
+            # La fila agregada queda al final de la hoja
+            index["total_rows"] += 1
+            index["rows"][str(next_id)] = index["total_rows"]
+            
             return True, f"✅ Registro #{next_id} guardado exitosamente"
             
         except Exception as e:
             return False, f"❌ Error al guardar: {str(e)}"
     
+    def _get_medical_worksheet(self):
+        """
+        Obtener la hoja de registros médicos
+
+        Returns:
+            gspread.Worksheet: Hoja de trabajo configurada
+        """
+        spreadsheet = self.client.open_by_key(self.sheet_config["sheet_id"])
+        worksheet_name = self.sheet_config["worksheets"]["medical_records"]
+        return spreadsheet.worksheet(worksheet_name)
+
+    def _build_worksheet_index(self, worksheet, all_values: List[List[str]]) -> Dict:
+        """
+        Construir índice de columnas y filas a partir de los valores de la hoja
+
+        Args:
+            worksheet: Hoja de trabajo indexada
+            all_values (List[List[str]]): Valores completos de la hoja (con header)
+
+        Returns:
+            Dict: Índice con headers, columnas por campo y filas por ID
+        """
+        headers = all_values[0] if all_values else []
+
+        # Campo normalizado -> columna (1-indexed para gspread)
+        columns = {}
+        id_col_index = None
+        for i, header in enumerate(headers):
+            columns.setdefault(header.lower().replace(' ', '_'), i + 1)
+            if id_col_index is None and header.lower() in ['id', 'id_registro']:
+                id_col_index = i
+
+        # ID -> fila (1-indexed, la fila 1 es el header)
+        rows = {}
+        if id_col_index is not None:
+            for i, row in enumerate(all_values[1:], start=2):
+                if len(row) > id_col_index and str(row[id_col_index]):
+                    rows.setdefault(str(row[id_col_index]), i)
+
+        index = {
+            "headers": headers,
+            "columns": columns,
+            "id_col_index": id_col_index,
+            "rows": rows,
+            "total_rows": len(all_values),
+            "loaded_at": datetime.now()
+        }
+        self._worksheet_index[worksheet.title] = index
+        return index
+
+    def _get_worksheet_index(self, worksheet, refresh: bool = False) -> Dict:
+        """
+        Obtener índice cacheado de la hoja (header->columna, ID->fila)
+
+        Args:
+            worksheet: Hoja de trabajo
+            refresh (bool): Forzar descarga de la hoja
+
+        Returns:
+            Dict: Índice de la hoja
+        """
+        index = self._worksheet_index.get(worksheet.title)
+        if (
+            refresh
+            or index is None
+            or datetime.now() - index["loaded_at"] > self.index_ttl
+        ):
+            index = self._build_worksheet_index(worksheet, worksheet.get_all_values())
+        return index
+
+    def invalidate_index(self, worksheet_name: Optional[str] = None):
+        """
+        Descartar el índice cacheado de una hoja (o de todas)
+
+        Args:
+            worksheet_name (Optional[str]): Nombre de la hoja, None para todas
+        """
+        if worksheet_name is None:
+            self._worksheet_index.clear()
+        else:
+            self._worksheet_index.pop(worksheet_name, None)
+
+    def _resolve_record_rows(self, worksheet, record_ids: List[str]) -> Tuple[Dict, List[str]]:
+        """
+        Resolver las filas de varios IDs verificándolas contra la hoja
+
+        El índice cacheado puede estar desplazado si otra sesión (o alguien
+        desde la interfaz de Sheets) insertó o eliminó filas: antes de
+        escribir se leen las celdas de ID de las filas destino con un único
+        batch_get y, si alguna no coincide, se recarga el índice.
+
+        Args:
+            worksheet: Hoja de trabajo
+            record_ids (List[str]): IDs de los registros
+
+        Returns:
+            Tuple[Dict, List[str]]: (Índice vigente, IDs no encontrados)
+        """
+        cached = self._worksheet_index.get(worksheet.title)
+        index = self._get_worksheet_index(worksheet)
+        if index["id_col_index"] is None:
+            return index, []
+
+        # Un índice recién descargado ya refleja la hoja actual
+        fresh = index is not cached
+        if not fresh and all(rid in index["rows"] for rid in record_ids):
+            id_col = index["id_col_index"] + 1
+            ranges = [gspread.utils.rowcol_to_a1(index["rows"][rid], id_col) for rid in record_ids]
+            found = worksheet.batch_get(ranges)
+            current = [str(cell[0][0]) if cell and cell[0] else "" for cell in found]
+            if current == list(record_ids):
+                return index, []
+
+        # Índice desactualizado (o ID faltante): recargar la hoja completa
+        if not fresh:
+            index = self._get_worksheet_index(worksheet, refresh=True)
+        return index, [rid for rid in record_ids if rid not in index["rows"]]
+
+    def update_records(self, updates: Dict[str, Dict]) -> Tuple[bool, str]:
+        """
+        Actualizar varios registros en una sola petición batch
+
+        Args:
+            updates (Dict[str, Dict]): ID del registro -> datos actualizados
+
+        Returns:
+            Tuple[bool, str]: (Success, Message)
+        """
+        if not self.credentials_loaded:
+            return False, "❌ No hay conexión con Google Sheets"
+
+        if not updates:
+            return True, "✅ Sin cambios para actualizar"
+
+        try:
+            worksheet = self._get_medical_worksheet()
+            index, missing = self._resolve_record_rows(worksheet, [str(rid) for rid in updates])
+
+            if index["id_col_index"] is None:
+                return False, "❌ No se encontró columna de ID"
+            if missing:
+                return False, f"❌ No se encontró registro con ID: {', '.join(missing)}"
+
+            # Armar todas las celdas modificadas
+            cells = []
+            for record_id, updated_data in updates.items():
+                row_index = index["rows"][str(record_id)]
+                for field, value in updated_data.items():
+                    col_index = index["columns"].get(field.lower())
+                    if col_index:
+                        cells.append({
+                            "range": gspread.utils.rowcol_to_a1(row_index, col_index),
+                            "values": [[value]]
+                        })
+
+            if cells:
+                worksheet.batch_update(cells, value_input_option="USER_ENTERED")
+
+            if len(updates) == 1:
+                return True, f"✅ Registro {next(iter(updates))} actualizado"
+            return True, f"✅ {len(updates)} registros actualizados"
+
+        except Exception as e:
+            self.invalidate_index()
+            return False, f"❌ Error actualizando: {str(e)}"
+
     def update_record(self, record_id: str, updated_data: Dict) -> Tuple[bool, str]:
         """
         Actualizar registro existente en Google Sheets
@@ -415,58 +609,89 @@ class GoogleSheetsManager:
             record_id (str): ID del registro a actualizar
             updated_data (Dict): Datos actualizados
             
+        Returns:
+            Tuple[bool, str]: (Success, Message)
+        """
+        return self.update_records({record_id: updated_data})
+    
+    @staticmethod
+    def _coalesce_row_ranges(row_indices: List[int]) -> List[Tuple[int, int]]:
+        """
+        Agrupar filas en rangos contiguos, ordenados de abajo hacia arriba
+
+        Args:
+            row_indices (List[int]): Filas a eliminar (1-indexed)
+
+        Returns:
+            List[Tuple[int, int]]: Rangos (inicio, fin) inclusivos
+        """
+        ranges = []
+        for row in sorted(set(row_indices)):
+            if ranges and row == ranges[-1][1] + 1:
+                ranges[-1] = (ranges[-1][0], row)
+            else:
+                ranges.append((row, row))
+        return ranges[::-1]
+
+    def delete_records(self, record_ids: List[str]) -> Tuple[bool, str]:
+        """
+        Eliminar varios registros en una sola petición batch
+
+        Args:
+            record_ids (List[str]): IDs de los registros a eliminar
+
         Returns:
             Tuple[bool, str]: (Success, Message)
         """
         if not self.credentials_loaded:
             return False, "❌ No hay conexión con Google Sheets"
-        
+
+        record_ids = list(dict.fromkeys(str(rid) for rid in record_ids))
+        if not record_ids:
+            return True, "✅ Sin registros para eliminar"
+
         try:
-            spreadsheet = self.client.open_by_key(self.sheet_config["sheet_id"])
-            worksheet_name = self.sheet_config["worksheets"]["medical_records"]
-            worksheet = spreadsheet.worksheet(worksheet_name)
-            
-            # Buscar la fila del registro
-            all_records = worksheet.get_all_values()
-            headers = all_records[0]
-            
-            # Encontrar índice de columna ID
-            id_col_index = None
-            for i, header in enumerate(headers):
-                if header.lower() in ['id', 'id_registro']:
-                    id_col_index = i
-                    break
-            
-            if id_col_index is None:
+            worksheet = self._get_medical_worksheet()
+            index, missing = self._resolve_record_rows(worksheet, record_ids)
+
+            if index["id_col_index"] is None:
                 return False, "❌ No se encontró columna de ID"
-            
-            # Buscar fila del registro
-            row_index = None
-            for i, row in enumerate(all_records[1:], start=2):  # Start=2 porque skippeamos header
-                if len(row) > id_col_index and str(row[id_col_index]) == str(record_id):
-                    row_index = i
-                    break
-            
-            if row_index is None:
-                return False, f"❌ No se encontró registro con ID: {record_id}"
-            
-            # Actualizar campos específicos
-            for field, value in updated_data.items():
-                # Mapear campo a columna
-                field_col_index = None
-                for i, header in enumerate(headers):
-                    if header.lower().replace(' ', '_') == field.lower():
-                        field_col_index = i + 1  # gspread usa 1-indexed
-                        break
-                
-                if field_col_index:
-                    worksheet.update_cell(row_index, field_col_index, value)
-            
-            return True, f"✅ Registro {record_id} actualizado"
-            
+            if missing:
+                return False, f"❌ No se encontró registro con ID: {', '.join(missing)}"
+
+            # Rangos contiguos de abajo hacia arriba para no desplazar los pendientes
+            ranges = self._coalesce_row_ranges([index["rows"][rid] for rid in record_ids])
+            requests = [
+                {
+                    "deleteDimension": {
+                        "range": {
+                            "sheetId": worksheet.id,
+                            "dimension": "ROWS",
+                            "startIndex": start - 1,  # API 0-indexed, fin exclusivo
+                            "endIndex": end
+                        }
+                    }
+                }
+                for start, end in ranges
+            ]
+            worksheet.spreadsheet.batch_update({"requests": requests})
+
+            # Parchear el índice: quitar IDs y desplazar las filas restantes
+            deleted_rows = sorted(index["rows"].pop(rid) for rid in record_ids)
+            for rid, row in index["rows"].items():
+                shift = bisect.bisect_left(deleted_rows, row)
+                if shift:
+                    index["rows"][rid] = row - shift
+            index["total_rows"] -= len(deleted_rows)
+
+            if len(record_ids) == 1:
+                return True, f"✅ Registro {record_ids[0]} eliminado"
+            return True, f"✅ {len(record_ids)} registros eliminados"
+
         except Exception as e:
-            return False, f"❌ Error actualizando: {str(e)}"
-    
+            self.invalidate_index()
+            return False, f"❌ Error eliminando: {str(e)}"
+
     def delete_record(self, record_id: str) -> Tuple[bool, str]:
         """
         Eliminar registro de Google Sheets
@@ -477,34 +702,7 @@ class GoogleSheetsManager:
         Returns:
             Tuple[bool, str]: (Success, Message)
         """
-        if not self.credentials_loaded:
-            return False, "❌ No hay conexión con Google Sheets"
-        
-        try:
-            spreadsheet = self.client.open_by_key(self.sheet_config["sheet_id"])
-            worksheet_name = self.sheet_config["worksheets"]["medical_records"]
-            worksheet = spreadsheet.worksheet(worksheet_name)
-            
-            # Buscar y eliminar fila
-            all_records = worksheet.get_all_values()
-            headers = all_records[0]
-            
-            # Encontrar fila del registro
-            row_index = None
-            for i, row in enumerate(all_records[1:], start=2):
-                if len(row) > 0 and str(row[0]) == str(record_id):  # Asumiendo ID en primera columna
-                    row_index = i
-                    break
-            
-            if row_index is None:
-                return False, f"❌ No se encontró registro con ID: {record_id}"
-            
-            worksheet.delete_rows(row_index)
-            
-            return True, f"✅ Registro {record_id} eliminado"
-            
-        except Exception as e:
-            return False, f"❌ Error eliminando: {str(e)}"
+        return self.delete_records([record_id])
     
     def get_statistics(self) -> Dict:
         """
@@ -524,50 +722,15 @@ class GoogleSheetsManager:
                 "ultimo_registro": "N/A"
             }
         
-        # Calcular estadísticas
-        hoy = datetime.now().date()
-        registros_hoy = 0
-        profesionales = set()
-        casos_graves = 0
-        
-        for record in records:
-            # Profesionales únicos
-            prof = record.get("nombre_profesional") or record.get("nombre_profesional", "")
-            if prof:
-                profesionales.add(prof)
-            
-            # Registros de hoy
-            fecha_str = record.get("fecha_registro") or record.get("fecha_registro", "")
-            if fecha_str:
-                try:
-                    fecha = datetime.strptime(fecha_str, "%Y-%m-%d").date()
-                    if fecha == hoy:
-                        registros_hoy += 1
-                except:
-                    pass
-            
-            # Casos graves
-            severidad = (record.get("severidad") or record.get("severidad", "")).lower()
-            if any(word in severidad for word in ["grave", "crítico", "severo"]):
-                casos_graves += 1
-        
-        # Último registro
-        ultimo_registro = "N/A"
-        if records:
-            ultimo_timestamp = records[-1].get("timestamp", "")
-            if ultimo_timestamp:
-                try:
-                    dt = datetime.strptime(ultimo_timestamp, "%Y-%m-%d %H:%M:%S")
-                    ultimo_registro = dt.strftime("%d/%m/%Y %H:%M")
-                except:
-                    ultimo_registro = ultimo_timestamp[:16]
+        # Calcular estadísticas (memoizadas por revisión de datos)
+        stats = compute_medical_statistics(records, revision=self.records_revision)
         
         return {
-            "total_registros": len(records),
-            "registros_hoy": registros_hoy,
-            "profesionales_activos": len(profesionales),
-            "casos_graves": casos_graves,
-            "ultimo_registro": ultimo_registro
+            "total_registros": stats["total_registros"],
+            "registros_hoy": stats["registros_hoy"],
+            "profesionales_activos": stats["profesionales_activos"],
+            "casos_graves": stats["casos_graves"],
+            "ultimo_registro": stats["ultimo_registro"]
         }
     
     def _determine_status(self, severidad: str) -> str:
@@ -580,16 +743,7 @@ class GoogleSheetsManager:
         Returns:
             str: Estado determinado
         """
-        severidad_lower = severidad.lower()
-        
-        if any(word in severidad_lower for word in ["leve", "menor"]):
-            return "Seguimiento"
-        elif any(word in severidad_lower for word in ["moderada", "intermedio"]):
-            return "Tratamiento activo"
-        elif any(word in severidad_lower for word in ["grave", "severo", "crítico"]):
-            return "Atención prioritaria"
-        else:
-            return "En evaluación"
+        return determine_status(severidad)
 
 
 # Función de compatibilidad con el sistema actual
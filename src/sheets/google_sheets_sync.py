@@ -7,47 +7,131 @@ import gspread
 from google.oauth2.service_account import Credentials
 import pandas as pd
 import streamlit as st
+import numpy as np
 from datetime import datetime
+import hashlib
 import json
 import re
 import os
+import logging
+import tempfile
+import threading
+
+# Siempre como src.local_store: importarlo con otro nombre crearía un segundo
+# módulo (y un segundo almacén) sobre el mismo archivo SQLite
+try:
+    from src.local_store import get_local_store
+except ImportError:
+    from local_store import get_local_store
+
+SYNC_CONFIG_PATH = 'data/sync_config.json'
+CREDENTIALS_PATH = 'data/car_google_credentials.json'
+
+logger = logging.getLogger(__name__)
+
+# Tipo de datos -> (tabla del almacén local, prefijo de los IDs sincronizados)
+SYNC_KINDS = {
+    'medical': ('injuries', 'gs_'),
+    'nutrition': ('meal_plans', 'gs_nut_'),
+    'strength': ('strength_tests', 'gs_str_'),
+    'field': ('field_tests', 'gs_field_'),
+}
+
+# Serializa lecturas y read-modify-write de la configuración (UI y workers)
+_sync_config_lock = threading.RLock()
+
+
+def load_service_account_info():
+    """
+    Credenciales de la cuenta de servicio desde st.secrets o archivo local
+
+    Returns:
+        dict: Credenciales, o None si no hay ninguna configurada
+    """
+    try:
+        # Primero st.secrets (para Streamlit Cloud)
+        if hasattr(st, 'secrets') and "gcp_service_account" in st.secrets:
+            return dict(st.secrets["gcp_service_account"])
+    except Exception:
+        pass
+
+    # Si estamos local, el archivo de credenciales
+    if os.path.exists(CREDENTIALS_PATH):
+        with open(CREDENTIALS_PATH, encoding='utf-8') as f:
+            return json.load(f)
+    return None
+
+
+def _normalize_columns(df, column_mapping):
+    """Normalizar nombres de columnas y aplicar el mapeo (sin duplicados)"""
+    df = df.copy()
+    df.columns = df.columns.astype(str).str.lower().str.strip().str.replace(' ', '_')
+    df = df.rename(columns=column_mapping)
+    return df.loc[:, ~df.columns.duplicated()]
+
+
+def _text_column(df, column, default=''):
+    """Columna de texto limpia (o el valor por defecto si la columna no existe)"""
+    if column not in df.columns:
+        return pd.Series(str(default), index=df.index)
+    return df[column].astype(str).str.strip()
+
+
+def _number_column(df, column, missing=0, default=0):
+    """Columna numérica (equivalente vectorizado de safe_float)"""
+    if column not in df.columns:
+        return pd.Series(float(missing), index=df.index)
+    values = df[column].astype(str).str.strip().str.replace(',', '.', regex=False)
+    return pd.to_numeric(values, errors='coerce').fillna(default).astype(float)
+
+
+def _optional_number(series):
+    """Convertir ceros en None (equivalente de `safe_float(...) or None`)"""
+    return series.astype(object).where(series != 0, None)
+
+
+def _has_player(df):
+    """Filas con nombre de jugador no vacío"""
+    if 'player_name' not in df.columns:
+        return pd.Series(False, index=df.index)
+    return df['player_name'].notna() & (df['player_name'].astype(str).str.strip() != '')
+
 
 class GoogleSheetsCAR:
-    def __init__(self):
-        """Inicializar conexión con Google Sheets"""
+    def __init__(self, credentials_info=None):
+        """
+        Inicializar conexión con Google Sheets
+
+        Args:
+            credentials_info (dict): Credenciales explícitas de la cuenta de servicio.
+                Los clientes de los workers en segundo plano las reciben así: no
+                leen st.secrets ni muestran errores en la UI (no tienen sesión).
+        """
         self.scope = [
             "https://spreadsheets.google.com/feeds",
             "https://www.googleapis.com/auth/drive",
             "https://www.googleapis.com/auth/spreadsheets"
         ]
         self.client = None
-        self.setup_credentials()
+        # Resumen pendiente de persistir por hoja (clave de hoja -> filas y fecha)
+        self.pending_sync_state = {}
+        self.last_sync_summary = None
+        self.setup_credentials(credentials_info)
     
-    def setup_credentials(self):
-        """Configurar credenciales de Google desde st.secrets o archivo local"""
+    def setup_credentials(self, credentials_info=None):
+        """Configurar credenciales de Google (explícitas, st.secrets o archivo local)"""
         try:
-            # Primero intentar obtener desde st.secrets (para Streamlit Cloud)
-            if hasattr(st, 'secrets') and "gcp_service_account" in st.secrets:
-                creds = Credentials.from_service_account_info(
-                    dict(st.secrets["gcp_service_account"]), 
-                    scopes=self.scope
-                )
-                self.client = gspread.authorize(creds)
-                return True
-            
-            # Si estamos local, intentar cargar desde archivo
-            creds_path = "data/car_google_credentials.json"
-            if os.path.exists(creds_path):
-                creds = Credentials.from_service_account_file(
-                    creds_path, 
-                    scopes=self.scope
-                )
-                self.client = gspread.authorize(creds)
-                return True
-            else:
+            info = credentials_info if credentials_info is not None else load_service_account_info()
+            if not info:
                 return False
+            creds = Credentials.from_service_account_info(dict(info), scopes=self.scope)
+            self.client = gspread.authorize(creds)
+            return True
         except Exception as e:
-            st.error(f"❌ Error en credenciales: {e}")
+            if credentials_info is None:
+                st.error(f"❌ Error en credenciales: {e}")
+            else:
+                logger.error("Error en credenciales de Google: %s", e)
             return False
 
     def extract_sheet_id(self, url):
@@ -94,6 +178,74 @@ class GoogleSheetsCAR:
         except Exception as e:
             return False, f"Error al leer datos: {e}"
 
+    def sheet_key(self, kind, sheet_url, worksheet_name=None):
+        """Clave estable de una hoja (tipo de datos + ID del documento + pestaña)"""
+        sheet_id = self.extract_sheet_id(sheet_url) or sheet_url
+        raw_key = f"{kind}|{sheet_id}|{worksheet_name or ''}"
+        return hashlib.sha1(raw_key.encode('utf-8')).hexdigest()[:12]
+
+    def _select_changed_rows(self, kind, df, sheet_url, worksheet_name=None):
+        """
+        Comparar las filas con los registros ya guardados y devolver solo las nuevas o modificadas
+
+        Cada fila se identifica por el hash de su contenido (no por su posición):
+        insertar o borrar filas no cambia el ID de las demás, una fila editada es
+        un registro nuevo y los registros cuyo hash ya no está en la hoja se
+        eliminan (removed_record_ids). Las filas ya sincronizadas se leen del
+        almacén local, así que data/sync_config.json solo guarda un resumen.
+        """
+        key = self.sheet_key(kind, sheet_url, worksheet_name)
+        table, prefix = SYNC_KINDS[kind]
+        id_prefix = f"{prefix}{key}_"
+
+        row_ids = pd.Index(id_prefix + self._row_keys(df))
+        stored = get_local_store().ids_with_prefix(table, id_prefix)
+        is_new = ~row_ids.isin(list(stored))
+        removed = sorted(stored.difference(row_ids))
+
+        self.pending_sync_state[key] = {
+            'total_rows': int(len(df)),
+            'last_sync': datetime.now().isoformat()
+        }
+        self.last_sync_summary = {
+            'sheet_key': key,
+            'total_rows': int(len(df)),
+            'new_rows': int(is_new.sum()),
+            'unchanged_rows': int((~is_new).sum()),
+            'removed_rows': len(removed),
+            'removed_ids': removed
+        }
+        changed = df[is_new].copy()
+        changed.index = row_ids[is_new]
+        return key, changed
+
+    @staticmethod
+    def _row_keys(df):
+        """Hash del contenido de cada fila (las filas idénticas se numeran: hash-1, hash-2...)"""
+        hashes = pd.Series(pd.util.hash_pandas_object(df.astype(str), index=False).to_numpy(), index=df.index)
+        keys = hashes.map('{:016x}'.format)
+        repeated = hashes.groupby(hashes).cumcount()
+        return keys.where(repeated == 0, keys + '-' + repeated.astype(str)).to_numpy(dtype=object)
+
+    def commit_sync_state(self, sheet_key=None):
+        """Persistir el resumen de las hojas sincronizadas en data/sync_config.json"""
+        keys = [sheet_key] if sheet_key else list(self.pending_sync_state)
+
+        def apply(config):
+            sync_state = config.setdefault('sync_state', {})
+            for key in keys:
+                if key in self.pending_sync_state:
+                    sync_state[key] = self.pending_sync_state.pop(key)
+
+        update_sync_config(apply)
+
+    def removed_record_ids(self):
+        """IDs de registros cuyas filas ya no existen en la hoja (o fueron editadas)"""
+        summary = self.last_sync_summary
+        if not summary:
+            return []
+        return list(summary['removed_ids'])
+
     def sync_medical_data(self, sheet_url, doctor_name, worksheet_name=None):
         """Sincronizar datos médicos desde Google Sheets"""
         success, data = self.get_sheet_data(sheet_url, worksheet_name)
@@ -101,9 +253,6 @@ class GoogleSheetsCAR:
         if not success:
             return False, data
         
-        df = data
-        medical_records = []
-        
         # Mapeo de columnas (flexible)
         column_mapping = {
             'jugador': 'player_name',
@@ -126,34 +275,30 @@ class GoogleSheetsCAR:
             'notas': 'notes'
         }
         
-        # Normalizar nombres de columnas
-        df.columns = df.columns.str.lower().str.strip().str.replace(' ', '_')
+        # Solo filas nuevas o modificadas desde la última sincronización
+        key, df = self._select_changed_rows('medical', data, sheet_url, worksheet_name)
+        df = _normalize_columns(df, column_mapping)
+        df = df[_has_player(df)]
         
-        # Renombrar columnas
-        df = df.rename(columns=column_mapping)
+        now = datetime.now()
+        records = pd.DataFrame({
+            "id": df.index,
+            "player_name": _text_column(df, 'player_name'),
+            "division": _text_column(df, 'division'),
+            "injury_type": _text_column(df, 'injury_type'),
+            "severity": _text_column(df, 'severity', 'Moderada'),
+            "date_occurred": _text_column(df, 'date_occurred', now.date()),
+            "expected_recovery": _text_column(df, 'expected_recovery'),
+            "status": _text_column(df, 'status', 'En tratamiento'),
+            "treatment": _text_column(df, 'treatment'),
+            "doctor": doctor_name,
+            "notes": _text_column(df, 'notes'),
+            "sync_source": "Google Sheets",
+            "sync_date": now.isoformat(),
+            "sheet_url": sheet_url
+        }, index=df.index)
         
-        # Procesar cada fila
-        for index, row in df.iterrows():
-            if pd.notna(row.get('player_name')) and row.get('player_name').strip():
-                record = {
-                    "id": f"gs_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{index}",
-                    "player_name": str(row.get('player_name', '')).strip(),
-                    "division": str(row.get('division', '')).strip(),
-                    "injury_type": str(row.get('injury_type', '')).strip(),
-                    "severity": str(row.get('severity', 'Moderada')).strip(),
-                    "date_occurred": str(row.get('date_occurred', datetime.now().date())),
-                    "expected_recovery": str(row.get('expected_recovery', '')),
-                    "status": str(row.get('status', 'En tratamiento')).strip(),
-                    "treatment": str(row.get('treatment', '')).strip(),
-                    "doctor": doctor_name,
-                    "notes": str(row.get('notes', '')).strip(),
-                    "sync_source": "Google Sheets",
-                    "sync_date": datetime.now().isoformat(),
-                    "sheet_url": sheet_url
-                }
-                medical_records.append(record)
-        
-        return True, medical_records
+        return True, records.to_dict('records')
 
     def sync_nutrition_data(self, sheet_url, nutritionist_name, worksheet_name=None):
         """Sincronizar datos nutricionales desde Google Sheets"""
@@ -162,9 +307,6 @@ class GoogleSheetsCAR:
         if not success:
             return False, data
         
-        df = data
-        nutrition_records = []
-        
         # Mapeo de columnas nutricionales
         column_mapping = {
             'jugador': 'player_name',
@@ -184,35 +326,33 @@ class GoogleSheetsCAR:
             'notas': 'notes'
         }
         
-        # Normalizar y renombrar
-        df.columns = df.columns.str.lower().str.strip().str.replace(' ', '_')
-        df = df.rename(columns=column_mapping)
+        # Solo filas nuevas o modificadas desde la última sincronización
+        key, df = self._select_changed_rows('nutrition', data, sheet_url, worksheet_name)
+        df = _normalize_columns(df, column_mapping)
+        df = df[_has_player(df)]
         
-        # Procesar cada fila
-        for index, row in df.iterrows():
-            if pd.notna(row.get('player_name')) and row.get('player_name').strip():
-                record = {
-                    "id": f"gs_nut_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{index}",
-                    "player_name": str(row.get('player_name', '')).strip(),
-                    "division": str(row.get('division', '')).strip(),
-                    "plan_type": str(row.get('plan_type', 'Plan General')).strip(),
-                    "calories_target": self.safe_float(row.get('calories_target', 2500)),
-                    "protein_target": self.safe_float(row.get('protein_target', 150)),
-                    "carbs_target": self.safe_float(row.get('carbs_target', 300)),
-                    "fat_target": self.safe_float(row.get('fat_target', 80)),
-                    "current_weight": self.safe_float(row.get('current_weight', 0)),
-                    "height": self.safe_float(row.get('height', 0)),
-                    "goal": str(row.get('goal', 'Mantener peso')).strip(),
-                    "nutritionist": nutritionist_name,
-                    "notes": str(row.get('notes', '')).strip(),
-                    "created_date": datetime.now().date().isoformat(),
-                    "sync_source": "Google Sheets",
-                    "sync_date": datetime.now().isoformat(),
-                    "sheet_url": sheet_url
-                }
-                nutrition_records.append(record)
+        now = datetime.now()
+        records = pd.DataFrame({
+            "id": df.index,
+            "player_name": _text_column(df, 'player_name'),
+            "division": _text_column(df, 'division'),
+            "plan_type": _text_column(df, 'plan_type', 'Plan General'),
+            "calories_target": _number_column(df, 'calories_target', 2500),
+            "protein_target": _number_column(df, 'protein_target', 150),
+            "carbs_target": _number_column(df, 'carbs_target', 300),
+            "fat_target": _number_column(df, 'fat_target', 80),
+            "current_weight": _number_column(df, 'current_weight'),
+            "height": _number_column(df, 'height'),
+            "goal": _text_column(df, 'goal', 'Mantener peso'),
+            "nutritionist": nutritionist_name,
+            "notes": _text_column(df, 'notes'),
+            "created_date": now.date().isoformat(),
+            "sync_source": "Google Sheets",
+            "sync_date": now.isoformat(),
+            "sheet_url": sheet_url
+        }, index=df.index)
         
-        return True, nutrition_records
+        return True, records.to_dict('records')
 
     def sync_strength_data(self, sheet_url, trainer_name, worksheet_name=None):
         """Sincronizar datos de tests de fuerza desde Google Sheets"""
@@ -221,9 +361,6 @@ class GoogleSheetsCAR:
         if not success:
             return False, data
         
-        df = data
-        strength_records = []
-        
         # Mapeo de columnas para tests de fuerza
         column_mapping = {
             'jugador': 'player_name',
@@ -250,42 +387,40 @@ class GoogleSheetsCAR:
             'notas': 'notes'
         }
         
-        # Normalizar y renombrar
-        df.columns = df.columns.str.lower().str.strip().str.replace(' ', '_')
-        df = df.rename(columns=column_mapping)
+        # Solo filas nuevas o modificadas desde la última sincronización
+        key, df = self._select_changed_rows('strength', data, sheet_url, worksheet_name)
+        df = _normalize_columns(df, column_mapping)
+        df = df[_has_player(df)]
         
-        # Procesar cada fila
-        for index, row in df.iterrows():
-            if pd.notna(row.get('player_name')) and row.get('player_name').strip():
-                # Calcular 1RM estimado
-                weight = self.safe_float(row.get('weight', 0))
-                reps = max(1, int(self.safe_float(row.get('repetitions', 1))))
-                one_rm = weight * (36 / (37 - reps)) if reps < 37 else weight
-                
-                record = {
-                    "id": f"gs_str_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{index}",
-                    "player_name": str(row.get('player_name', '')).strip(),
-                    "division": str(row.get('division', '')).strip(),
-                    "test_date": str(row.get('test_date', datetime.now().date())),
-                    "test_type": str(row.get('test_type', 'Bench Press')).strip(),
-                    "weight": weight,
-                    "repetitions": reps,
-                    "series": max(1, int(self.safe_float(row.get('series', 1)))),
-                    "one_rm_estimated": round(one_rm, 1),
-                    "body_weight": self.safe_float(row.get('body_weight', 0)) or None,
-                    "height": self.safe_float(row.get('height', 0)) or None,
-                    "body_fat": self.safe_float(row.get('body_fat', 0)) or None,
-                    "muscle_mass": self.safe_float(row.get('muscle_mass', 0)) or None,
-                    "tester": trainer_name,
-                    "notes": str(row.get('notes', '')).strip(),
-                    "sync_source": "Google Sheets",
-                    "sync_date": datetime.now().isoformat(),
-                    "sheet_url": sheet_url,
-                    "created_at": datetime.now().isoformat()
-                }
-                strength_records.append(record)
+        # Calcular 1RM estimado (fórmula de Brzycki)
+        weight = _number_column(df, 'weight')
+        reps = np.trunc(_number_column(df, 'repetitions', 1)).clip(lower=1).astype(int)
+        one_rm = (weight * (36 / (37 - reps))).where(reps < 37, weight)
+        
+        now = datetime.now()
+        records = pd.DataFrame({
+            "id": df.index,
+            "player_name": _text_column(df, 'player_name'),
+            "division": _text_column(df, 'division'),
+            "test_date": _text_column(df, 'test_date', now.date()),
+            "test_type": _text_column(df, 'test_type', 'Bench Press'),
+            "weight": weight,
+            "repetitions": reps,
+            "series": np.trunc(_number_column(df, 'series', 1)).clip(lower=1).astype(int),
+            "one_rm_estimated": one_rm.round(1),
+            "body_weight": _optional_number(_number_column(df, 'body_weight')),
+            "height": _optional_number(_number_column(df, 'height')),
+            "body_fat": _optional_number(_number_column(df, 'body_fat')),
+            "muscle_mass": _optional_number(_number_column(df, 'muscle_mass')),
+            "tester": trainer_name,
+            "notes": _text_column(df, 'notes'),
+            "sync_source": "Google Sheets",
+            "sync_date": now.isoformat(),
+            "sheet_url": sheet_url,
+            "created_at": now.isoformat()
+        }, index=df.index)
         
-        return True, strength_records
+        return True, records.to_dict('records')
 
     def sync_field_data(self, sheet_url, trainer_name, worksheet_name=None):
         """Sincronizar datos de tests de campo desde Google Sheets"""
@@ -294,9 +429,6 @@ class GoogleSheetsCAR:
         if not success:
             return False, data
         
-        df = data
-        field_records = []
-        
         # Mapeo de columnas para tests de campo
         column_mapping = {
             'jugador': 'player_name',
@@ -323,49 +455,51 @@ class GoogleSheetsCAR:
             'notas': 'notes'
         }
         
-        # Normalizar y renombrar
-        df.columns = df.columns.str.lower().str.strip().str.replace(' ', '_')
-        df = df.rename(columns=column_mapping)
+        # Solo filas nuevas o modificadas desde la última sincronización
+        key, df = self._select_changed_rows('field', data, sheet_url, worksheet_name)
+        df = _normalize_columns(df, column_mapping)
+        df = df[_has_player(df)]
         
-        # Procesar cada fila
-        for index, row in df.iterrows():
-            if pd.notna(row.get('player_name')) and row.get('player_name').strip():
-                # Determinar unidad según tipo de test
-                test_type = str(row.get('test_type', '')).strip()
-                unit = str(row.get('unit', ''))
-                
-                if not unit:
-                    if "sprint" in test_type.lower() or "velocidad" in test_type.lower():
-                        unit = "segundos"
-                    elif "salto" in test_type.lower():
-                        unit = "cm"
-                    elif "yo-yo" in test_type.lower() or "cooper" in test_type.lower():
-                        unit = "metros"
-                    else:
-                        unit = "unidades"
-                
-                record = {
-                    "id": f"gs_field_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{index}",
-                    "player_name": str(row.get('player_name', '')).strip(),
-                    "division": str(row.get('division', '')).strip(),
-                    "test_date": str(row.get('test_date', datetime.now().date())),
-                    "test_type": test_type,
-                    "result": self.safe_float(row.get('result', 0)),
-                    "unit": unit,
-                    "weather": str(row.get('weather', 'No especificado')).strip(),
-                    "temperature": self.safe_float(row.get('temperature', 0)) or None,
-                    "surface": str(row.get('surface', 'No especificado')).strip(),
-                    "humidity": self.safe_float(row.get('humidity', 0)) or None,
-                    "tester": trainer_name,
-                    "notes": str(row.get('notes', '')).strip(),
-                    "sync_source": "Google Sheets",
-                    "sync_date": datetime.now().isoformat(),
-                    "sheet_url": sheet_url,
-                    "created_at": datetime.now().isoformat()
-                }
-                field_records.append(record)
+        # Determinar unidad según tipo de test (si la hoja no la trae)
+        test_type = _text_column(df, 'test_type')
+        test_lower = test_type.str.lower()
+        inferred_unit = pd.Series(
+            np.select(
+                [
+                    test_lower.str.contains('sprint|velocidad'),
+                    test_lower.str.contains('salto'),
+                    test_lower.str.contains('yo-yo|cooper')
+                ],
+                ['segundos', 'cm', 'metros'],
+                default='unidades'
+            ),
+            index=df.index
+        )
+        unit = df['unit'].astype(str) if 'unit' in df.columns else pd.Series('', index=df.index)
+        unit = unit.where(unit != '', inferred_unit)
+        
+        now = datetime.now()
+        records = pd.DataFrame({
+            "id": df.index,
+            "player_name": _text_column(df, 'player_name'),
+            "division": _text_column(df, 'division'),
+            "test_date": _text_column(df, 'test_date', now.date()),
+            "test_type": test_type,
+            "result": _number_column(df, 'result'),
+            "unit": unit,
+            "weather": _text_column(df, 'weather', 'No especificado'),
+            "temperature": _optional_number(_number_column(df, 'temperature')),
+            "surface": _text_column(df, 'surface', 'No especificado'),
+            "humidity": _optional_number(_number_column(df, 'humidity')),
+            "tester": trainer_name,
+            "notes": _text_column(df, 'notes'),
+            "sync_source": "Google Sheets",
+            "sync_date": now.isoformat(),
+            "sheet_url": sheet_url,
+            "created_at": now.isoformat()
+        }, index=df.index)
         
-        return True, field_records
+        return True, records.to_dict('records')
 
     def safe_float(self, value, default=0):
         """Convertir valor a float de forma segura"""
@@ -388,19 +522,61 @@ class GoogleSheetsCAR:
 
 # Funciones de utilidad
 def save_sync_config(config):
-    """Guardar configuración de sincronización"""
-    with open('data/sync_config.json', 'w') as f:
-        json.dump(config, f, indent=2)
+    """Guardar configuración de sincronización (escritura atómica)"""
+    config_dir = os.path.dirname(SYNC_CONFIG_PATH)
+    os.makedirs(config_dir, exist_ok=True)
+    with _sync_config_lock:
+        # Escribir en un temporal y reemplazar: un lector nunca ve un archivo a medias
+        fd, tmp_path = tempfile.mkstemp(dir=config_dir, prefix='.sync_config.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(config, f, indent=2)
+            os.replace(tmp_path, SYNC_CONFIG_PATH)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+def update_sync_config(apply):
+    """
+    Leer, modificar y guardar la configuración bajo un único bloqueo
+    
+    Args:
+        apply (callable): Función que modifica el dict de configuración en el lugar
+        
+    Returns:
+        dict: Configuración guardada
+    """
+    with _sync_config_lock:
+        config = load_sync_config()
+        apply(config)
+        save_sync_config(config)
+        return config
 
 def load_sync_config():
     """Cargar configuración de sincronización"""
     try:
-        with open('data/sync_config.json', 'r') as f:
+        with _sync_config_lock, open(SYNC_CONFIG_PATH, 'r') as f:
             return json.load(f)
-    except FileNotFoundError:
+    except (FileNotFoundError, json.JSONDecodeError):
         return {
             "medical_sheets": [], 
             "nutrition_sheets": [],
             "strength_sheets": [],
             "field_sheets": []
-        }
\ No newline at end of file
+        }
+
+def store_synced_records(table, records, removed_ids=()):
+    """
+    Guardar registros sincronizados reemplazando por ID (sin duplicar)
+    
+    Args:
+        table (str): Tabla del almacén local ('injuries', 'meal_plans'...)
+        records (list): Registros nuevos o modificados
+        removed_ids (iterable): IDs cuyas filas ya no existen en la hoja
+        
+    Returns:
+        int: Registros escritos
+    """
+    store = get_local_store()
+    store.delete_many(table, removed_ids)
+    return store.upsert_many(table, records)
@@ -0,0 +1,121 @@
+"""
+Normalización de Registros Médicos
+Tablas de búsqueda para clasificar texto libre (severidad, estado)
+Cada valor distinto se clasifica una sola vez y se cachea
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+# Categorías canónicas de severidad (el índice es el código entero)
+SEVERITY_LEVELS = ["Sin clasificar", "Leve", "Moderada", "Grave"]
+SEVERITY_UNKNOWN, SEVERITY_LEVE, SEVERITY_MODERADA, SEVERITY_GRAVE = range(len(SEVERITY_LEVELS))
+
+# Palabras clave en orden de prioridad (la primera coincidencia gana)
+SEVERITY_KEYWORDS = [
+    (SEVERITY_LEVE, ("leve", "menor")),
+    (SEVERITY_MODERADA, ("moderada", "moderado", "intermedio")),
+    (SEVERITY_GRAVE, ("grave", "severo", "severa", "crítico", "critico", "crítica", "critica", "serio")),
+]
+
+# Estado del paciente según la severidad (mismo índice que SEVERITY_LEVELS)
+STATUS_BY_SEVERITY = ["En evaluación", "Seguimiento", "Tratamiento activo", "Atención prioritaria"]
+
+# Categorías canónicas del estado registrado
+ESTADO_LEVELS = ["Sin clasificar", "Activo", "Alta"]
+ESTADO_UNKNOWN, ESTADO_ACTIVO, ESTADO_ALTA = range(len(ESTADO_LEVELS))
+
+ESTADO_KEYWORDS = [
+    (ESTADO_ALTA, ("alta", "recuperad", "finalizad", "resuelt")),
+    (ESTADO_ACTIVO, ("activ", "en tratamiento")),
+]
+
+
+def _classify(text: str, keywords) -> int:
+    """Buscar la primera categoría cuyas palabras clave aparezcan en el texto"""
+    text_lower = text.strip().lower()
+    for code, words in keywords:
+        if any(word in text_lower for word in words):
+            return code
+    return 0
+
+
+@lru_cache(maxsize=4096)
+def severity_code(severidad: str) -> int:
+    """
+    Clasificar un texto de severidad en su código canónico
+
+    Args:
+        severidad (str): Texto libre ("Grave", "lesión moderada"...)
+
+    Returns:
+        int: Índice en SEVERITY_LEVELS
+    """
+    return _classify(severidad, SEVERITY_KEYWORDS)
+
+
+@lru_cache(maxsize=4096)
+def estado_code(estado: str) -> int:
+    """
+    Clasificar un texto de estado en su código canónico
+
+    Args:
+        estado (str): Texto libre ("Tratamiento activo", "Alta médica"...)
+
+    Returns:
+        int: Índice en ESTADO_LEVELS
+    """
+    return _classify(estado, ESTADO_KEYWORDS)
+
+
+def determine_status(severidad: str) -> str:
+    """
+    Determinar estado del paciente basado en severidad
+
+    Args:
+        severidad (str): Nivel de severidad
+
+    Returns:
+        str: Estado determinado
+    """
+    return STATUS_BY_SEVERITY[severity_code(severidad or "")]
+
+
+def code_column(series: pd.Series, classifier) -> np.ndarray:
+    """
+    Aplicar un clasificador cacheado como columna de códigos enteros
+
+    Solo se clasifica cada valor distinto; el resto es un take vectorizado.
+
+    Args:
+        series (pd.Series): Columna de texto libre
+        classifier: severity_code o estado_code
+
+    Returns:
+        np.ndarray: Códigos int8 alineados con la serie
+    """
+    categorical = pd.Categorical(series.fillna("").astype(str))
+    lookup = np.array(
+        [classifier(value) for value in categorical.categories] + [0],
+        dtype=np.int8
+    )
+    # Los códigos -1 (nulos) caen en el 0 agregado al final
+    return lookup[categorical.codes]
+
+
+def count_codes(codes: np.ndarray, levels) -> dict:
+    """
+    Contar códigos enteros por categoría canónica
+
+    Args:
+        codes (np.ndarray): Códigos devueltos por code_column
+        levels (list): Etiquetas de las categorías
+
+    Returns:
+        dict: Etiqueta -> cantidad
+    """
+    counts = np.bincount(codes.astype(np.intp), minlength=len(levels))
+    return {label: int(count) for label, count in zip(levels, counts)}
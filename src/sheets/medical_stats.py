@@ -0,0 +1,205 @@
+"""
+Estadísticas de Registros Médicos
+Motor de agregación vectorizado para los registros de Google Sheets
+Memoización de resultados por revisión de datos
+"""
+
+import hashlib
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+try:
+    from .medical_normalization import (
+        SEVERITY_LEVELS, SEVERITY_GRAVE, ESTADO_LEVELS, ESTADO_ACTIVO,
+        severity_code, estado_code, code_column, count_codes
+    )
+except ImportError:
+    from medical_normalization import (
+        SEVERITY_LEVELS, SEVERITY_GRAVE, ESTADO_LEVELS, ESTADO_ACTIVO,
+        severity_code, estado_code, code_column, count_codes
+    )
+
+try:
+    from src.modules.html_fragments import MemoCache
+except ImportError:
+    from html_fragments import MemoCache
+
+# Nombres alternativos de columnas según el origen de los datos
+COLUMN_ALIASES = {
+    "status": "estado",
+    "gravedad": "severidad",
+    "profesional": "nombre_profesional",
+    "doctor": "nombre_profesional",
+    "jugador": "nombre_paciente",
+    "categoria": "division",
+}
+
+TEXT_COLUMNS = ["severidad", "estado", "division", "nombre_profesional", "nombre_paciente"]
+
+# Formato de cada columna de fecha (None = inferir)
+DATE_FORMATS = {
+    "timestamp": "%Y-%m-%d %H:%M:%S",
+    "fecha_atencion": None,
+    "fecha_registro": "%Y-%m-%d",
+}
+DATE_COLUMNS = list(DATE_FORMATS)
+
+# Resultados memoizados: (revisión, fecha de hoy) -> estadísticas
+_STATS_CACHE = MemoCache(max_size=16)
+
+
+def build_raw_frame(records: List[Dict]) -> pd.DataFrame:
+    """
+    Construir un DataFrame de texto con columnas normalizadas
+
+    Args:
+        records (List[Dict]): Registros tal como los devuelve Google Sheets o el CSV público
+
+    Returns:
+        pd.DataFrame: Columnas conocidas como texto limpio
+    """
+    df = pd.DataFrame.from_records(records) if records else pd.DataFrame()
+    df.columns = [str(col).strip().lower().replace(' ', '_') for col in df.columns]
+    df = df.rename(columns={k: v for k, v in COLUMN_ALIASES.items() if v not in df.columns})
+    df = df.loc[:, ~df.columns.duplicated()]
+
+    raw = pd.DataFrame(index=df.index)
+    for col in TEXT_COLUMNS + DATE_COLUMNS:
+        if col in df.columns:
+            raw[col] = df[col].fillna("").astype(str).str.strip()
+        else:
+            raw[col] = ""
+    return raw
+
+
+def data_revision(raw: pd.DataFrame) -> str:
+    """
+    Calcular la revisión (hash de contenido) de un frame de registros
+
+    Args:
+        raw (pd.DataFrame): Frame devuelto por build_raw_frame
+
+    Returns:
+        str: Hash hexadecimal del contenido
+    """
+    hashed = pd.util.hash_pandas_object(raw, index=True).values
+    return hashlib.sha1(hashed.tobytes()).hexdigest()
+
+
+def build_typed_frame(raw: pd.DataFrame) -> pd.DataFrame:
+    """
+    Tipar el frame de registros: fechas parseadas y códigos de categoría
+
+    Args:
+        raw (pd.DataFrame): Frame devuelto por build_raw_frame
+
+    Returns:
+        pd.DataFrame: Frame tipado listo para agregar
+    """
+    typed = raw[TEXT_COLUMNS].copy()
+    for col, fmt in DATE_FORMATS.items():
+        typed[col] = pd.to_datetime(raw[col], errors="coerce", format=fmt)
+
+    typed["severidad_code"] = code_column(raw["severidad"], severity_code)
+    typed["estado_code"] = code_column(raw["estado"], estado_code)
+    typed["mes"] = typed["fecha_atencion"].fillna(typed["fecha_registro"]).dt.to_period("M")
+    return typed
+
+
+def _counts(series: pd.Series) -> Dict[str, int]:
+    """Contar valores no vacíos de una serie como diccionario"""
+    series = series[series != ""]
+    return {str(k): int(v) for k, v in series.value_counts().items()}
+
+
+def _aggregate(raw: pd.DataFrame, hoy) -> Dict:
+    """
+    Calcular todos los contadores sobre el frame tipado
+
+    Args:
+        raw (pd.DataFrame): Frame devuelto por build_raw_frame
+        hoy (date): Fecha de referencia para "registros de hoy"
+
+    Returns:
+        Dict: Estadísticas agregadas
+    """
+    typed = build_typed_frame(raw)
+
+    # Último registro según el orden de la hoja
+    ultimo_registro = "N/A"
+    if len(raw):
+        ultimo_timestamp = raw["timestamp"].iloc[-1]
+        if ultimo_timestamp:
+            try:
+                dt = datetime.strptime(ultimo_timestamp, "%Y-%m-%d %H:%M:%S")
+                ultimo_registro = dt.strftime("%d/%m/%Y %H:%M")
+            except ValueError:
+                ultimo_registro = ultimo_timestamp[:16]
+
+    severidad_codes = typed["severidad_code"].to_numpy()
+    estado_codes = typed["estado_code"].to_numpy()
+    por_mes = typed["mes"].dropna().value_counts().sort_index()
+
+    return {
+        "total_registros": int(len(typed)),
+        "registros_hoy": int((typed["fecha_registro"].dt.date == hoy).sum()),
+        "profesionales_activos": int(typed.loc[typed["nombre_profesional"] != "", "nombre_profesional"].nunique()),
+        "casos_graves": int((severidad_codes == SEVERITY_GRAVE).sum()),
+        "registros_activos": int((estado_codes == ESTADO_ACTIVO).sum()),
+        "ultimo_registro": ultimo_registro,
+        "por_severidad": count_codes(severidad_codes, SEVERITY_LEVELS),
+        "por_estado": count_codes(estado_codes, ESTADO_LEVELS),
+        "por_division": _counts(typed["division"]),
+        "por_profesional": _counts(typed["nombre_profesional"]),
+        "por_mes": {str(k): int(v) for k, v in por_mes.items()},
+    }
+
+
+def sheet_revision(spreadsheet, worksheet_name: str) -> Optional[str]:
+    """
+    Revisión barata de una hoja: fecha de última modificación en Drive
+
+    Args:
+        spreadsheet (gspread.Spreadsheet): Planilla abierta
+        worksheet_name (str): Pestaña leída
+
+    Returns:
+        Optional[str]: Revisión o None si no se pudo consultar
+    """
+    try:
+        getter = getattr(spreadsheet, "get_lastUpdateTime", None)
+        modified = getter() if getter else spreadsheet.lastUpdateTime
+    except Exception:
+        return None
+    return f"{spreadsheet.id}/{worksheet_name}@{modified}" if modified else None
+
+
+def compute_medical_statistics(records: List[Dict], revision: Optional[str] = None) -> Dict:
+    """
+    Obtener estadísticas de registros médicos, memoizadas por revisión de datos
+
+    Args:
+        records (List[Dict]): Registros médicos
+        revision (Optional[str]): Revisión del origen (fecha de modificación,
+            ETag); si falta se calcula un hash del contenido
+
+    Returns:
+        Dict: Estadísticas agregadas (incluye la clave "revision")
+    """
+    hoy = datetime.now().date()
+
+    # Con una revisión del origen, un acierto no construye ni hashea el frame
+    raw = None
+    if revision is None:
+        raw = build_raw_frame(records)
+        revision = data_revision(raw)
+    key = (revision, hoy)
+
+    def agregar():
+        stats = _aggregate(raw if raw is not None else build_raw_frame(records), hoy)
+        stats["revision"] = key[0]
+        return stats
+
+    return dict(_STATS_CACHE.get_or_build(key, agregar))
@@ -0,0 +1,129 @@
+"""
+Lectura del CSV público de Google Sheets
+Descarga en streaming (el lector CSV consume directamente la respuesta HTTP)
+y GET condicional (ETag / Last-Modified) para no re-descargar exports sin cambios
+"""
+
+import itertools
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+
+REQUEST_TIMEOUT = 10
+
+# Exports descargados por URL: {"etag", "last_modified", "revision", "frame"}
+_CSV_CACHE: Dict[str, Dict] = {}
+_downloads = itertools.count(1)
+
+
+def public_csv_url(sheet_id: str, gid: int = 0) -> str:
+    """
+    Construir la URL de exportación CSV de una hoja pública
+
+    Args:
+        sheet_id (str): ID del Google Sheet
+        gid (int): ID de la pestaña
+
+    Returns:
+        str: URL de exportación
+    """
+    return f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid={gid}"
+
+
+def _parse_csv_stream(stream) -> pd.DataFrame:
+    """
+    Parsear un CSV desde un stream binario
+
+    El lector de pandas consume el stream a medida que llega, sin
+    descargar antes el cuerpo completo ni concatenar bloques intermedios.
+
+    Args:
+        stream: Objeto tipo archivo en modo binario
+
+    Returns:
+        pd.DataFrame: Columnas de texto (celdas vacías como "")
+    """
+    try:
+        frame = pd.read_csv(
+            stream,
+            dtype=str,
+            keep_default_na=False,
+            encoding="utf-8",
+            skip_blank_lines=True
+        )
+    except pd.errors.EmptyDataError:
+        return pd.DataFrame()
+
+    frame.columns = [str(col).strip() for col in frame.columns]
+    return frame
+
+
+def fetch_public_csv(url: str, session=None, force: bool = False) -> Tuple[pd.DataFrame, bool]:
+    """
+    Descargar y parsear un CSV público con GET condicional
+
+    Args:
+        url (str): URL del export CSV
+        session: Sesión de requests opcional (por defecto el módulo requests)
+        force (bool): Ignorar el caché y descargar de nuevo
+
+    Returns:
+        Tuple[pd.DataFrame, bool]: (Copia de los datos, True si el contenido cambió)
+
+    Raises:
+        requests.HTTPError: Si la respuesta no es 200 ni 304
+    """
+    import requests
+
+    http = session or requests
+    cached: Optional[Dict] = None if force else _CSV_CACHE.get(url)
+
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    response = http.get(url, headers=headers, stream=True, timeout=REQUEST_TIMEOUT)
+    try:
+        if cached and response.status_code == 304:
+            return cached["frame"].copy(), False
+
+        response.raise_for_status()
+        response.raw.decode_content = True
+        frame = _parse_csv_stream(response.raw)
+    finally:
+        response.close()
+
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    _CSV_CACHE[url] = {
+        "etag": etag,
+        "last_modified": last_modified,
+        # Sin validadores HTTP, cada descarga cuenta como una revisión nueva
+        "revision": etag or last_modified or f"descarga-{next(_downloads)}",
+        "frame": frame
+    }
+    # Copia: el llamador puede modificarla sin alterar el caché
+    return frame.copy(), True
+
+
+def public_csv_revision(url: str) -> Optional[str]:
+    """
+    Revisión del último export descargado (ETag, Last-Modified o nº de descarga)
+
+    Args:
+        url (str): URL del export CSV
+
+    Returns:
+        Optional[str]: Revisión o None si la URL no se descargó todavía
+    """
+    cached = _CSV_CACHE.get(url)
+    return f"{url}@{cached['revision']}" if cached else None
+
+
+def clear_public_csv_cache():
+    """Descartar todos los exports cacheados"""
+    _CSV_CACHE.clear()
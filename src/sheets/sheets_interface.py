@@ -4,11 +4,39 @@ Integración completa con Streamlit para CAR Rugby Club
 """
 
 import streamlit as st
-from google_sheets_sync import GoogleSheetsCAR, save_sync_config, load_sync_config
-from utils import save_medical_data, save_nutrition_data, load_json_data
+try:
+    from .google_sheets_sync import (
+        GoogleSheetsCAR, save_sync_config, load_sync_config, update_sync_config, store_synced_records,
+        load_service_account_info
+    )
+    from .sync_scheduler import SyncScheduler
+except ImportError:
+    from google_sheets_sync import (
+        GoogleSheetsCAR, save_sync_config, load_sync_config, update_sync_config, store_synced_records,
+        load_service_account_info
+    )
+    from sync_scheduler import SyncScheduler
 import pandas as pd
 from datetime import datetime
-import json
+
+# Intervalos de sincronización automática (en segundos)
+SYNC_INTERVALS = {
+    "Cada hora": 3600,
+    "Cada 6 horas": 6 * 3600,
+    "Diario": 24 * 3600,
+    "Semanal": 7 * 24 * 3600
+}
+
+@st.cache_resource
+def get_sync_scheduler():
+    """Planificador de sincronización compartido por todas las sesiones"""
+    scheduler = SyncScheduler(credentials_info=load_service_account_info())
+    
+    # Reanudar la sincronización automática guardada
+    auto_sync = load_sync_config().get('auto_sync', {})
+    if auto_sync.get('enabled'):
+        scheduler.start(auto_sync.get('interval_seconds', SYNC_INTERVALS["Cada hora"]))
+    return scheduler
 
 def google_sheets_page():
     """Página principal de Google Sheets"""
@@ -204,43 +232,61 @@ def nutrition_sync_interface(gs):
             else:
                 st.error(f"❌ {message}")
 
+def remember_sheet(config_key, entry):
+    """Registrar (o actualizar) una hoja conectada en la configuración de sincronización"""
+    def apply(config):
+        sheets = config.setdefault(config_key, [])
+        for sheet in sheets:
+            if sheet.get('url') == entry['url'] and sheet.get('worksheet') == entry['worksheet']:
+                sheet.update(entry)
+                break
+        else:
+            sheets.append(entry)
+    
+    update_sync_config(apply)
+
+def show_sync_summary(gs):
+    """Mostrar filas nuevas o modificadas / eliminadas / sin cambios de la última sincronización"""
+    summary = gs.last_sync_summary or {}
+    st.caption(
+        f"🆕 {summary.get('new_rows', 0)} nuevas o modificadas · "
+        f"🗑️ {summary.get('removed_rows', 0)} eliminadas · "
+        f"✅ {summary.get('unchanged_rows', 0)} sin cambios"
+    )
+
 def sync_medical_data(gs, sheet_url, doctor_name, worksheet):
     """Ejecutar sincronización de datos médicos"""
     with st.spinner("🔄 Sincronizando datos médicos..."):
         success, records = gs.sync_medical_data(sheet_url, doctor_name, worksheet)
         
         if success:
+            # Persistir solo lo nuevo o modificado, reemplazando por ID
+            removed_ids = gs.removed_record_ids()
+            if records or removed_ids:
+                store_synced_records('injuries', records, removed_ids)
+            gs.commit_sync_state()
+            
+            # Guardar configuración
+            remember_sheet('medical_sheets', {
+                'url': sheet_url,
+                'doctor': doctor_name,
+                'worksheet': worksheet,
+                'last_sync': datetime.now().isoformat()
+            })
+            
             if records:
-                # Cargar datos existentes
-                existing_data = load_json_data('medical_records.json', {'injuries': []})
-                
-                # Agregar nuevos registros
-                existing_data['injuries'].extend(records)
-                
-                # Guardar usando la función de utils
-                with open('medical_records.json', 'w') as f:
-                    json.dump(existing_data, f, indent=2)
-                
                 st.success(f"✅ {len(records)} registros médicos sincronizados correctamente!")
+                show_sync_summary(gs)
                 
                 # Mostrar resumen
                 with st.expander("📊 Resumen de sincronización"):
                     df_summary = pd.DataFrame(records)
                     st.dataframe(df_summary[['player_name', 'injury_type', 'severity', 'doctor']])
                 
-                # Guardar configuración
-                config = load_sync_config()
-                config['medical_sheets'].append({
-                    'url': sheet_url,
-                    'doctor': doctor_name,
-                    'worksheet': worksheet,
-                    'last_sync': datetime.now().isoformat()
-                })
-                save_sync_config(config)
-                
                 st.balloons()
             else:
-                st.warning("⚠️ No se encontraron datos para sincronizar")
+                st.info("ℹ️ Sin cambios desde la última sincronización")
+                show_sync_summary(gs)
         else:
             st.error(f"❌ Error en sincronización: {records}")
 
@@ -250,37 +296,33 @@ def sync_nutrition_data(gs, sheet_url, nutritionist, worksheet):
         success, records = gs.sync_nutrition_data(sheet_url, nutritionist, worksheet)
         
         if success:
+            # Persistir solo lo nuevo o modificado, reemplazando por ID
+            removed_ids = gs.removed_record_ids()
+            if records or removed_ids:
+                store_synced_records('meal_plans', records, removed_ids)
+            gs.commit_sync_state()
+            
+            # Guardar configuración
+            remember_sheet('nutrition_sheets', {
+                'url': sheet_url,
+                'nutritionist': nutritionist,
+                'worksheet': worksheet,
+                'last_sync': datetime.now().isoformat()
+            })
+            
             if records:
-                # Cargar datos existentes
-                existing_data = load_json_data('nutrition_records.json', {'meal_plans': []})
-                
-                # Agregar nuevos registros
-                existing_data['meal_plans'].extend(records)
-                
-                # Guardar usando la función de utils
-                with open('nutrition_records.json', 'w') as f:
-                    json.dump(existing_data, f, indent=2)
-                
                 st.success(f"✅ {len(records)} registros nutricionales sincronizados correctamente!")
+                show_sync_summary(gs)
                 
                 # Mostrar resumen
                 with st.expander("📊 Resumen de sincronización"):
                     df_summary = pd.DataFrame(records)
                     st.dataframe(df_summary[['player_name', 'plan_type', 'calories_target', 'nutritionist']])
                 
-                # Guardar configuración
-                config = load_sync_config()
-                config['nutrition_sheets'].append({
-                    'url': sheet_url,
-                    'nutritionist': nutritionist,
-                    'worksheet': worksheet,
-                    'last_sync': datetime.now().isoformat()
-                })
-                save_sync_config(config)
-                
                 st.balloons()
             else:
-                st.warning("⚠️ No se encontraron datos para sincronizar")
+                st.info("ℹ️ Sin cambios desde la última sincronización")
+                show_sync_summary(gs)
         else:
             st.error(f"❌ Error en sincronización: {records}")
 
@@ -392,37 +434,33 @@ def sync_strength_data(gs, sheet_url, trainer, worksheet):
         success, records = gs.sync_strength_data(sheet_url, trainer, worksheet)
         
         if success:
+            # Persistir solo lo nuevo o modificado, reemplazando por ID
+            removed_ids = gs.removed_record_ids()
+            if records or removed_ids:
+                store_synced_records('strength_tests', records, removed_ids)
+            gs.commit_sync_state()
+            
+            # Guardar configuración
+            remember_sheet('strength_sheets', {
+                'url': sheet_url,
+                'trainer': trainer,
+                'worksheet': worksheet,
+                'last_sync': datetime.now().isoformat()
+            })
+            
             if records:
-                # Cargar datos existentes
-                existing_data = load_json_data('strength_tests.json', {'tests': []})
-                
-                # Agregar nuevos registros
-                existing_data['tests'].extend(records)
-                
-                # Guardar
-                with open('strength_tests.json', 'w') as f:
-                    json.dump(existing_data, f, indent=2)
-                
                 st.success(f"✅ {len(records)} tests de fuerza sincronizados correctamente!")
+                show_sync_summary(gs)
                 
                 # Mostrar resumen
                 with st.expander("📊 Resumen de sincronización"):
                     df_summary = pd.DataFrame(records)
                     st.dataframe(df_summary[['player_name', 'test_type', 'weight', 'one_rm_estimated']])
                 
-                # Guardar configuración
-                config = load_sync_config()
-                config['strength_sheets'].append({
-                    'url': sheet_url,
-                    'trainer': trainer,
-                    'worksheet': worksheet,
-                    'last_sync': datetime.now().isoformat()
-                })
-                save_sync_config(config)
-                
                 st.balloons()
             else:
-                st.warning("⚠️ No se encontraron datos para sincronizar")
+                st.info("ℹ️ Sin cambios desde la última sincronización")
+                show_sync_summary(gs)
         else:
             st.error(f"❌ Error en sincronización: {records}")
 
@@ -432,44 +470,66 @@ def sync_field_data(gs, sheet_url, trainer, worksheet):
         success, records = gs.sync_field_data(sheet_url, trainer, worksheet)
         
         if success:
+            # Persistir solo lo nuevo o modificado, reemplazando por ID
+            removed_ids = gs.removed_record_ids()
+            if records or removed_ids:
+                store_synced_records('field_tests', records, removed_ids)
+            gs.commit_sync_state()
+            
+            # Guardar configuración
+            remember_sheet('field_sheets', {
+                'url': sheet_url,
+                'trainer': trainer,
+                'worksheet': worksheet,
+                'last_sync': datetime.now().isoformat()
+            })
+            
             if records:
-                # Cargar datos existentes
-                existing_data = load_json_data('field_tests.json', {'tests': []})
-                
-                # Agregar nuevos registros
-                existing_data['tests'].extend(records)
-                
-                # Guardar
-                with open('field_tests.json', 'w') as f:
-                    json.dump(existing_data, f, indent=2)
-                
                 st.success(f"✅ {len(records)} tests de campo sincronizados correctamente!")
+                show_sync_summary(gs)
                 
                 # Mostrar resumen
                 with st.expander("📊 Resumen de sincronización"):
                     df_summary = pd.DataFrame(records)
                     st.dataframe(df_summary[['player_name', 'test_type', 'result', 'unit']])
                 
-                # Guardar configuración
-                config = load_sync_config()
-                config['field_sheets'].append({
-                    'url': sheet_url,
-                    'trainer': trainer,
-                    'worksheet': worksheet,
-                    'last_sync': datetime.now().isoformat()
-                })
-                save_sync_config(config)
-                
                 st.balloons()
             else:
-                st.warning("⚠️ No se encontraron datos para sincronizar")
+                st.info("ℹ️ Sin cambios desde la última sincronización")
+                show_sync_summary(gs)
         else:
             st.error(f"❌ Error en sincronización: {records}")
 
+def sync_status_panel():
+    """Estado de la sincronización en segundo plano (solo lectura)"""
+    scheduler = get_sync_scheduler()
+    
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        if scheduler.running:
+            st.info("⏳ Sincronización en curso...")
+        elif scheduler.last_run:
+            st.caption(
+                f"Última sincronización: {scheduler.last_run['finished_at'][:16]} · "
+                f"{scheduler.last_run['sheets']} hojas en {scheduler.last_run['duration']} s"
+            )
+    with col2:
+        if st.button("🔄 Sincronizar todo", key="sync_all", disabled=scheduler.running):
+            scheduler.trigger()
+            st.toast("🔄 Sincronización iniciada en segundo plano")
+    
+    status = scheduler.status()
+    if status:
+        df_status = pd.DataFrame(status)
+        columns = ['area', 'owner', 'worksheet', 'state', 'duration', 'rows_total', 'rows_imported', 'error']
+        st.dataframe(df_status.reindex(columns=columns), use_container_width=True, hide_index=True)
+
 def connection_status(gs):
     """Mostrar estado de las conexiones"""
     st.subheader("📊 Estado de Conexiones")
     
+    sync_status_panel()
+    
     config = load_sync_config()
     
     # Conexiones médicas
@@ -570,17 +630,39 @@ def sync_configuration(gs):
     """Configuración de sincronización"""
     st.subheader("⚙️ Configuración de Sincronización")
     
-    # Sincronización automática
-    auto_sync = st.checkbox("🔄 Sincronización automática", value=False)
+    # Sincronización automática (en segundo plano, todas las hojas configuradas)
+    scheduler = get_sync_scheduler()
+    config = load_sync_config()
+    saved = {'enabled': False, 'interval_seconds': None, **config.get('auto_sync', {})}
+    interval_labels = list(SYNC_INTERVALS)
+    saved_label = next(
+        (label for label, seconds in SYNC_INTERVALS.items() if seconds == saved.get('interval_seconds')),
+        interval_labels[0]
+    )
+    
+    auto_sync = st.checkbox("🔄 Sincronización automática", value=saved.get('enabled', False))
     
     if auto_sync:
         sync_interval = st.selectbox(
             "⏰ Intervalo de sincronización:",
-            ["Cada hora", "Cada 6 horas", "Diario", "Semanal"]
+            interval_labels,
+            index=interval_labels.index(saved_label)
         )
         
         st.info(f"⏰ Sincronización configurada: {sync_interval}")
     
+    new_setting = {
+        'enabled': auto_sync,
+        'interval_seconds': SYNC_INTERVALS[sync_interval] if auto_sync else saved.get('interval_seconds')
+    }
+    if new_setting != saved:
+        # Sin pisar el sync_state que los workers escribieron desde la lectura
+        update_sync_config(lambda current: current.update(auto_sync=new_setting))
+        if auto_sync:
+            scheduler.start(new_setting['interval_seconds'])
+        else:
+            scheduler.stop()
+    
     # Configuración de mapeo de columnas
     with st.expander("🗂️ Mapeo de Columnas Personalizado"):
         st.write("**Configurar nombres de columnas en tus hojas:**")
@@ -0,0 +1,260 @@
+"""
+Planificador de Sincronización en Segundo Plano
+Refresca en paralelo todas las hojas configuradas en data/sync_config.json
+respetando un presupuesto compartido de llamadas a la API de Google Sheets
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+try:
+    from .google_sheets_sync import GoogleSheetsCAR, load_sync_config, store_synced_records
+except ImportError:
+    from google_sheets_sync import GoogleSheetsCAR, load_sync_config, store_synced_records
+
+logger = logging.getLogger(__name__)
+
+
+# Tipo de hoja en la configuración -> cómo sincronizarla y dónde guardarla
+SYNC_TARGETS = {
+    "medical_sheets": {
+        "method": "sync_medical_data",
+        "owner": "doctor",
+        "table": "injuries"
+    },
+    "nutrition_sheets": {
+        "method": "sync_nutrition_data",
+        "owner": "nutritionist",
+        "table": "meal_plans"
+    },
+    "strength_sheets": {
+        "method": "sync_strength_data",
+        "owner": "trainer",
+        "table": "strength_tests"
+    },
+    "field_sheets": {
+        "method": "sync_field_data",
+        "owner": "trainer",
+        "table": "field_tests"
+    }
+}
+
+# Llamadas a la API por sincronización (abrir documento, pestaña, leer registros)
+CALLS_PER_SYNC = 3
+
+
+class RateBudget:
+    """Presupuesto de llamadas compartido entre hilos (token bucket)"""
+
+    def __init__(self, max_calls: int = 50, period: float = 60.0):
+        self.max_calls = max_calls
+        self.period = period
+        self._tokens = float(max_calls)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, calls: int = 1):
+        """Bloquear hasta que haya presupuesto para `calls` llamadas"""
+        calls = min(calls, self.max_calls)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                refill = (now - self._updated) * self.max_calls / self.period
+                self._tokens = min(self.max_calls, self._tokens + refill)
+                self._updated = now
+
+                if self._tokens >= calls:
+                    self._tokens -= calls
+                    return
+                wait = (calls - self._tokens) * self.period / self.max_calls
+            time.sleep(wait)
+
+
+class SyncScheduler:
+    """
+    Sincroniza todas las hojas configuradas en paralelo
+
+    Funcionalidades:
+    - Ejecución bajo demanda (trigger) o periódica (start/stop)
+    - Presupuesto de llamadas compartido entre todos los workers
+    - Estado por hoja: duración, filas leídas/importadas y errores
+    """
+
+    def __init__(self, max_workers: int = 4, max_calls_per_minute: int = 50,
+                 credentials_info: Optional[Dict] = None):
+        self.max_workers = max_workers
+        # Credenciales resueltas en la UI: los workers no tienen sesión de Streamlit
+        self.credentials_info = credentials_info
+        self.budget = RateBudget(max_calls_per_minute, 60.0)
+        self.interval_seconds: Optional[int] = None
+
+        self._status: Dict[str, Dict] = {}
+        self._status_lock = threading.Lock()
+        self._persist_lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self._local = threading.local()
+
+        self._wake = threading.Event()
+        self._run_now = threading.Event()
+        # Cada hilo periódico tiene su propio evento de parada: un hilo que
+        # está terminando tras stop() no se lleva consigo al que lo reemplaza
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        self.last_run: Optional[Dict] = None
+
+    def _client(self) -> GoogleSheetsCAR:
+        """Un cliente por hilo (el estado incremental es por instancia)"""
+        if getattr(self._local, "gs", None) is None:
+            if not self.credentials_info:
+                raise RuntimeError("Credenciales de Google no configuradas")
+            self._local.gs = GoogleSheetsCAR(credentials_info=self.credentials_info)
+        return self._local.gs
+
+    def _set_status(self, sheet_id: str, **values):
+        with self._status_lock:
+            self._status.setdefault(sheet_id, {}).update(values)
+
+    def _sync_sheet(self, config_key: str, sheet: Dict):
+        """Sincronizar una hoja y registrar su estado"""
+        target = SYNC_TARGETS[config_key]
+        sheet_id = f"{config_key}:{sheet['url']}:{sheet.get('worksheet') or ''}"
+        started = time.monotonic()
+
+        self._set_status(
+            sheet_id,
+            area=config_key,
+            owner=sheet.get(target["owner"], ""),
+            url=sheet["url"],
+            worksheet=sheet.get("worksheet"),
+            state="running",
+            started_at=datetime.now().isoformat()
+        )
+
+        gs = None
+        try:
+            gs = self._client()
+            if gs.client is None:
+                raise RuntimeError("Credenciales de Google no configuradas")
+
+            self.budget.acquire(CALLS_PER_SYNC)
+            sync = getattr(gs, target["method"])
+            success, records = sync(sheet["url"], sheet.get(target["owner"], ""), sheet.get("worksheet"))
+            if not success:
+                raise RuntimeError(records)
+
+            removed_ids = gs.removed_record_ids()
+            with self._persist_lock:
+                if records or removed_ids:
+                    store_synced_records(target["table"], records, removed_ids)
+                summary = gs.last_sync_summary or {}
+                gs.commit_sync_state(summary.get("sheet_key"))
+
+            self._set_status(
+                sheet_id,
+                state="ok",
+                rows_total=summary.get("total_rows", 0),
+                rows_imported=len(records),
+                rows_removed=len(removed_ids),
+                error=None
+            )
+        except Exception as e:
+            # No persistir marcas de agua de una sincronización fallida
+            if gs is not None:
+                gs.pending_sync_state.clear()
+            logger.warning("Error sincronizando %s: %s", sheet_id, e)
+            self._set_status(sheet_id, state="error", error=str(e))
+        finally:
+            self._set_status(
+                sheet_id,
+                duration=round(time.monotonic() - started, 2),
+                finished_at=datetime.now().isoformat()
+            )
+
+    def run_all(self) -> Dict:
+        """
+        Sincronizar todas las hojas configuradas (bloqueante)
+
+        Returns:
+            Dict: Resumen de la ejecución
+        """
+        with self._run_lock:
+            config = load_sync_config()
+            jobs = [
+                (config_key, sheet)
+                for config_key in SYNC_TARGETS
+                for sheet in config.get(config_key, [])
+                if sheet.get("url")
+            ]
+
+            started = time.monotonic()
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                list(executor.map(lambda job: self._sync_sheet(*job), jobs))
+
+            self.last_run = {
+                "sheets": len(jobs),
+                "duration": round(time.monotonic() - started, 2),
+                "finished_at": datetime.now().isoformat()
+            }
+            return self.last_run
+
+    def _loop(self, stop: threading.Event):
+        while not stop.is_set():
+            self.run_all()
+            finished = time.monotonic()
+            # Esperar el intervalo vigente: se recalcula cada vez que _wake avisa
+            while not stop.is_set() and not self._run_now.is_set():
+                remaining = finished + (self.interval_seconds or 0) - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._wake.wait(remaining)
+                self._wake.clear()
+            self._run_now.clear()
+
+    def _periodic(self) -> bool:
+        """True si hay un hilo periódico activo y no detenido"""
+        return self._thread is not None and self._thread.is_alive() and not self._stop.is_set()
+
+    def start(self, interval_seconds: int):
+        """Sincronizar periódicamente cada `interval_seconds`"""
+        with self._thread_lock:
+            self.interval_seconds = interval_seconds
+            if self._periodic():
+                # El hilo activo toma el nuevo intervalo sin esperar el anterior
+                self._wake.set()
+                return
+            # Sin hilo, o uno que todavía está terminando tras stop(): crear uno nuevo
+            self._stop = threading.Event()
+            self._thread = threading.Thread(
+                target=self._loop, args=(self._stop,), name="car-sync-scheduler", daemon=True
+            )
+            self._thread.start()
+
+    def trigger(self):
+        """Sincronizar ahora en segundo plano (sin bloquear la UI)"""
+        with self._thread_lock:
+            if self._periodic():
+                self._run_now.set()
+                self._wake.set()
+                return
+        threading.Thread(target=self.run_all, name="car-sync-once", daemon=True).start()
+
+    def stop(self):
+        """Detener la sincronización periódica"""
+        with self._thread_lock:
+            self.interval_seconds = None
+            self._stop.set()
+            self._wake.set()
+
+    @property
+    def running(self) -> bool:
+        return self._run_lock.locked()
+
+    def status(self) -> List[Dict]:
+        """Estado por hoja (copia, segura para leer desde la UI)"""
+        with self._status_lock:
+            return [dict(values) for values in self._status.values()]
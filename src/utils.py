@@ -1,6 +1,12 @@
 import json
 import os
 
+import streamlit as st
+
+# st.fragment (>= 1.37) o st.experimental_fragment (1.33 - 1.36)
+_st_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+
+
 def load_json_data(filename, default_data=None):
     """Carga un archivo JSON desde la carpeta data."""
     filepath = os.path.join('data', filename)
@@ -8,4 +14,15 @@ def load_json_data(filename, default_data=None):
         with open(filepath, 'r', encoding='utf-8') as f:
             return json.load(f)
     except FileNotFoundError:
-        return default_data if default_data is not None else {}
\ No newline at end of file
+        return default_data if default_data is not None else {}
+
+
+def fragmento(func):
+    """
+    Declarar una sección de página como fragmento (rerun parcial)
+
+    Los widgets dentro del fragmento solo vuelven a ejecutar esa función,
+    no la página completa. En versiones de Streamlit sin fragmentos la
+    función se ejecuta normalmente.
+    """
+    return _st_fragment(func) if _st_fragment else func
@@ -0,0 +1,17 @@
+"""
+Configuración de pytest: mismas carpetas en el path que main_app.py
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for path in (
+    ROOT,
+    os.path.join(ROOT, 'src'),
+    os.path.join(ROOT, 'src', 'modules'),
+    os.path.join(ROOT, 'src', 'sheets'),
+):
+    if path not in sys.path:
+        sys.path.append(path)
@@ -0,0 +1,166 @@
+"""
+Tests de la analítica de asistencia contra el cálculo directo con pandas
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.modules import asistencia_stats
+from src.modules.asistencia_stats import (
+    VENTANA_SEMANAS,
+    compute_attendance_analytics,
+    normalizar_historial,
+)
+from src.modules.html_fragments import MemoCache
+
+
+def _historial(jugadores=10, fechas=30, semilla=3):
+    rng = np.random.default_rng(semilla)
+    filas = []
+    for dia in pd.date_range('2024-03-04', periods=fechas, freq='2D'):
+        for dni in range(jugadores):
+            if rng.random() < 0.2:
+                continue  # jugador sin registro en esa sesión
+            filas.append({
+                'Fecha': dia,
+                'Categoria': ('M19', 'Primera', 'M17')[dni % 3],
+                'Tipo_Actividad': rng.choice(['Entrenamiento', 'Partido', 'Gimnasio']),
+                'DNI': str(2000 + dni),
+                'Nombre': f'Jugador{dni}',
+                'Apellido': 'Test',
+                'Estado_Asistencia': rng.choice(['Presente', 'Ausente', 'Lesionado'], p=[0.55, 0.35, 0.1]),
+            })
+    return pd.DataFrame(filas)
+
+
+@pytest.fixture(scope='module')
+def historial():
+    return _historial()
+
+
+@pytest.fixture(scope='module')
+def datos(historial):
+    return normalizar_historial(historial)
+
+
+@pytest.fixture(scope='module')
+def analytics(historial):
+    asistencia_stats._ANALYTICS_CACHE.clear()
+    return compute_attendance_analytics(historial)
+
+
+@pytest.fixture(scope='module')
+def resumen(analytics):
+    return analytics['resumen'].set_index('DNI')
+
+
+def test_rachas_coinciden_con_un_recorrido(datos, resumen):
+    for dni, grupo in datos.groupby('DNI'):
+        actual = maxima = 0
+        for estado in grupo['Estado']:
+            actual = actual + 1 if estado == 'Ausente' else 0
+            maxima = max(maxima, actual)
+        assert resumen.loc[dni, 'Racha Ausencias'] == actual
+        assert resumen.loc[dni, 'Racha Máxima'] == maxima
+
+
+def test_participacion_movil_de_4_semanas(datos, resumen):
+    semana = datos['Fecha'].dt.to_period('W').dt.start_time
+    desde = semana.max() - pd.Timedelta(weeks=VENTANA_SEMANAS - 1)
+    ventana = datos[semana >= desde]
+    participa = ventana['Estado'].isin(['Presente', 'Lesionado']).groupby(ventana['DNI']).mean()
+
+    columna = resumen[f'% Part. {VENTANA_SEMANAS} sem']
+    esperado = (participa * 100).round(1).reindex(columna.index)
+    pd.testing.assert_series_equal(columna, esperado, check_names=False)
+
+
+def test_evolucion_semanal_por_categoria(datos, analytics):
+    evolucion = analytics['evolucion_categorias']
+    semana = datos['Fecha'].dt.to_period('W').dt.start_time
+
+    esperado = {}
+    for fin in evolucion.index:
+        ventana = datos[(semana <= fin) & (semana > fin - pd.Timedelta(weeks=VENTANA_SEMANAS))]
+        participa = ventana['Estado'].isin(['Presente', 'Lesionado']).groupby(ventana['Categoria']).mean()
+        esperado[fin] = (participa * 100).round(1)
+    esperado = pd.DataFrame(esperado).T.reindex(columns=evolucion.columns)
+
+    assert len(evolucion) == semana.nunique()
+    np.testing.assert_array_equal(evolucion.to_numpy(), esperado.to_numpy())
+
+
+def test_tasas_por_actividad(datos, analytics):
+    tasas = analytics['tasas_actividad'].set_index('DNI')
+    esperado = (
+        datos['Estado'].eq('Presente')
+        .groupby([datos['DNI'], datos['Tipo_Actividad']]).mean()
+        .mul(100).round(1)
+    )
+
+    for (dni, actividad), valor in esperado.items():
+        assert tasas.loc[dni, f'% {actividad}'] == valor
+    assert set(tasas.columns) == {'Jugador', 'Categoria', '% Entrenamiento', '% Partido', '% Gimnasio'}
+
+
+def test_resumen_y_ranking_por_categoria(datos, analytics, resumen):
+    por_dni = datos.groupby('DNI')
+    assert (resumen['Sesiones'] == por_dni.size().reindex(resumen.index)).all()
+    asistencia = (datos['Estado'].eq('Presente').groupby(datos['DNI']).mean() * 100).round(1)
+    assert (resumen['% Asistencia'] == asistencia.reindex(resumen.index)).all()
+
+    for dni, fila in resumen.iterrows():
+        companeros = resumen[resumen['Categoria'] == fila['Categoria']]
+        mejores = (companeros['% Participación'] > fila['% Participación']).sum()
+        assert fila['Ranking Categoría'] == mejores + 1
+
+    # Ordenado por categoría y luego por ranking
+    ordenado = analytics['resumen'][['Categoria', 'Ranking Categoría']]
+    assert ordenado.equals(ordenado.sort_values(['Categoria', 'Ranking Categoría'], kind='stable'))
+
+
+def test_historial_vacio():
+    analytics = compute_attendance_analytics(pd.DataFrame())
+
+    assert analytics['resumen'].empty
+    assert analytics['tasas_actividad'].empty
+
+
+def test_memoizada_por_revision(historial, monkeypatch):
+    monkeypatch.setattr(asistencia_stats, '_ANALYTICS_CACHE', MemoCache(max_size=2))
+    cache = asistencia_stats._ANALYTICS_CACHE
+
+    primera = compute_attendance_analytics(historial)
+    segunda = compute_attendance_analytics(historial.copy())
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert segunda['resumen'] is primera['resumen']
+    assert segunda['revision'] == primera['revision']
+
+    compute_attendance_analytics(historial.iloc[:-1])
+    assert cache.misses == 2
+
+
+def test_memo_cache_lru():
+    cache = MemoCache(max_size=2)
+    llamadas = []
+
+    def constructor(valor):
+        def construir():
+            llamadas.append(valor)
+            return valor
+        return construir
+
+    cache.get_or_build('a', constructor(1))
+    cache.get_or_build('b', constructor(2))
+    cache.get_or_build('a', constructor(1))  # 'a' pasa a ser la más reciente
+    cache.get_or_build('c', constructor(3))  # desaloja 'b'
+
+    assert list(cache._items) == ['a', 'c']
+    assert cache.get_or_build('b', constructor(2)) == 2
+    assert llamadas == [1, 2, 3, 2]
+
+    cache.clear(lambda key: key == 'c')
+    assert list(cache._items) == ['b']
+    cache.clear()
+    assert len(cache) == 0
@@ -0,0 +1,113 @@
+"""
+Tests del cubo mensual de tendencias de lesiones contra los filtros de pandas
+"""
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('streamlit')
+pytest.importorskip('gspread')
+
+from src.modules import areamedica
+from src.modules.areamedica import CuboLesiones, obtener_cubo_lesiones
+
+
+def _lesiones(n=400, semilla=1):
+    rng = np.random.default_rng(semilla)
+    fechas = pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 600, n), unit='D')
+    fechas = pd.Series(fechas.strftime('%Y-%m-%d'))
+    fechas[rng.random(n) < 0.05] = 'sin fecha'
+    return pd.DataFrame({
+        'Fecha': fechas,
+        'Categoría': rng.choice(['M19', 'Primera', 'Intermedia'], n),
+        'Parte Afectada': rng.choice(['Rodilla', 'Tobillo', 'Hombro', None], n),
+        'Tipo de Lesión': rng.choice(['Esguince', 'Desgarro', 'Contractura'], n),
+        'Severidad de la Lesión': rng.choice(['Leve', 'Moderada', 'Grave'], n),
+    })
+
+
+@pytest.fixture(scope='module')
+def df():
+    return _lesiones()
+
+
+@pytest.fixture(scope='module')
+def cubo(df):
+    return CuboLesiones(df)
+
+
+def _filtrar_con_pandas(df, rango=None, division='Todas', parte='Todas'):
+    fechas = pd.to_datetime(df['Fecha'], format='%Y-%m-%d', errors='coerce')
+    mascara = pd.Series(True, index=df.index)
+    if rango:
+        mascara &= (fechas.dt.date >= rango[0]) & (fechas.dt.date <= rango[1])
+    if division != 'Todas':
+        mascara &= df['Categoría'] == division
+    if parte != 'Todas':
+        mascara &= df['Parte Afectada'] == parte
+    return df[mascara]
+
+
+RANGOS = [
+    None,
+    (date(2023, 1, 1), date(2024, 8, 22)),    # todo el historial
+    (date(2023, 3, 1), date(2023, 6, 30)),    # meses completos
+    (date(2023, 3, 17), date(2023, 9, 4)),    # bordes incompletos
+    (date(2023, 5, 10), date(2023, 5, 20)),   # dentro de un mes
+    (date(2023, 5, 31), date(2023, 6, 1)),    # dos meses incompletos
+    (date(2025, 1, 1), date(2025, 2, 1)),     # fuera del historial
+]
+
+
+@pytest.mark.parametrize('rango', RANGOS)
+@pytest.mark.parametrize('division,parte', [('Todas', 'Todas'), ('M19', 'Todas'), ('Primera', 'Rodilla')])
+def test_cortes_coinciden_con_pandas(df, cubo, rango, division, parte):
+    esperado = _filtrar_con_pandas(df, rango, division, parte)
+    corte = cubo.seleccionar(rango, division, parte)
+
+    assert int(corte['cantidad'].sum()) == len(esperado)
+    assert CuboLesiones.conteo(corte, 'parte').to_dict() == esperado['Parte Afectada'].value_counts().to_dict()
+    assert CuboLesiones.conteo(corte, 'tipo').to_dict() == esperado['Tipo de Lesión'].value_counts().to_dict()
+
+    meses = pd.to_datetime(esperado['Fecha'], format='%Y-%m-%d', errors='coerce').dt.to_period('M').value_counts().sort_index()
+    por_mes = CuboLesiones.por_mes(corte)
+    assert por_mes[por_mes > 0].to_dict() == meses.to_dict()
+
+    pd.testing.assert_frame_equal(cubo.registros(rango, division, parte), esperado)
+
+
+def test_cubo_mensual_agrega_las_filas(df, cubo):
+    # Una celda por combinación mes × dimensiones, no por fila o día
+    assert len(cubo.cubo) < len(df)
+    assert not cubo.cubo.duplicated(['mes'] + CuboLesiones.DIMENSIONES).any()
+    assert (cubo.cubo['mes'].dropna().dt.day == 1).all()
+
+
+def test_rango_y_valores(df, cubo):
+    fechas = pd.to_datetime(df['Fecha'], format='%Y-%m-%d', errors='coerce')
+
+    assert cubo.rango_fechas() == (fechas.min().date(), fechas.max().date())
+    assert cubo.valores('division') == ['Intermedia', 'M19', 'Primera']
+    assert CuboLesiones.moda(CuboLesiones.conteo(cubo.seleccionar(), 'severidad')) == \
+        df['Severidad de la Lesión'].mode().iloc[0]
+
+
+def test_sin_columna_de_fechas():
+    df = pd.DataFrame({'Categoría': ['M19', 'M19', 'Primera']})
+    cubo = CuboLesiones(df)
+
+    assert not cubo.tiene_fechas
+    assert cubo.rango_fechas() is None
+    assert CuboLesiones.conteo(cubo.seleccionar(), 'division').to_dict() == {'M19': 2, 'Primera': 1}
+    assert CuboLesiones.por_mes(cubo.seleccionar()).empty
+
+
+def test_memoizado_por_revision(df):
+    areamedica._CUBE_CACHE.clear()
+
+    primero = obtener_cubo_lesiones(df)
+    assert obtener_cubo_lesiones(df.copy()) is primero
+    assert obtener_cubo_lesiones(df.iloc[:-1]) is not primero
@@ -0,0 +1,100 @@
+"""
+Tests del cubo de la Base Test (Área Física) contra los filtros de pandas
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('streamlit')
+pytest.importorskip('gspread')
+
+from src.modules.areafisica import CuboTests
+
+
+def _base_test(n=300, semilla=2):
+    rng = np.random.default_rng(semilla)
+    valores = rng.normal(50, 10, n).round(1).astype(str)
+    valores = np.char.replace(valores, '.', ',')  # la hoja usa coma decimal
+    valores[rng.random(n) < 0.05] = 'N/A'
+    fechas = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.permutation(n), unit='h')
+    return pd.DataFrame({
+        'Marca temporal': fechas.strftime('%d/%m/%Y %H:%M:%S'),
+        'Categoría': rng.choice(['M19', 'Primera'], n),
+        'Test': rng.choice(['Velocidad', 'Fuerza'], n),
+        'Subtest': rng.choice(['10m', '40m', 'Sentadilla'], n),
+        'Posición del jugador': rng.choice(['Pilar', 'Wing', None], n),
+        'Nombre y Apellido': rng.choice([f'Jugador {i}' for i in range(15)], n),
+        'valor': valores,
+        'unidad': 's',
+    })
+
+
+@pytest.fixture(scope='module')
+def df():
+    return _base_test()
+
+
+@pytest.fixture(scope='module')
+def cubo(df):
+    return CuboTests(df)
+
+
+def _numerico(df):
+    return pd.to_numeric(df['valor'].str.replace(',', '.'), errors='coerce')
+
+
+@pytest.mark.parametrize('filtros,columnas', [
+    ({}, {}),
+    ({'categoria': 'M19'}, {'Categoría': ['M19']}),
+    ({'test': 'Velocidad', 'subtest': ['10m', '40m']}, {'Test': ['Velocidad'], 'Subtest': ['10m', '40m']}),
+    ({'categoria': 'Primera', 'posicion': ['Pilar']}, {'Categoría': ['Primera'], 'Posición del jugador': ['Pilar']}),
+    ({'test': 'Natación'}, {'Test': ['Natación']}),
+])
+def test_registros_coinciden_con_pandas(df, cubo, filtros, columnas):
+    esperado = df
+    for columna, valores in columnas.items():
+        esperado = esperado[esperado[columna].isin(valores)]
+
+    registros = cubo.registros(**filtros)
+
+    assert list(registros['Nombre y Apellido']) == list(esperado['Nombre y Apellido'])
+    np.testing.assert_allclose(registros['valor'].to_numpy(dtype=float), _numerico(esperado).to_numpy())
+
+
+def test_agregados_coinciden_con_pandas(df, cubo):
+    datos = df.assign(valor=_numerico(df), _fecha=pd.to_datetime(df['Marca temporal'], dayfirst=True))
+    velocidad = datos[datos['Test'] == 'Velocidad']
+    esperado = velocidad.groupby('Nombre y Apellido')['valor'].mean()
+
+    agregados = CuboTests.seleccionar(cubo.agregados, test='Velocidad')
+    promedios = CuboTests.promedios_por_jugador(agregados)
+
+    pd.testing.assert_series_equal(promedios, esperado, check_names=False, check_index_type=False)
+
+    # 'ultimo' es el valor con la marca temporal más reciente de cada combinación
+    grupo = velocidad[(velocidad['Subtest'] == '10m') & (velocidad['Categoría'] == 'M19')].fillna({'Posición del jugador': ''})
+    jugador = grupo['Nombre y Apellido'].iloc[0]
+    posicion = grupo['Posición del jugador'].iloc[0]
+    celda = grupo[(grupo['Nombre y Apellido'] == jugador) & (grupo['Posición del jugador'] == posicion)]
+    celda = celda.dropna(subset=['valor']).sort_values('_fecha')
+    fila = cubo.agregados.loc[('M19', 'Velocidad', '10m', posicion, jugador)]
+    assert fila['cantidad'] == len(celda)
+    if len(celda):
+        assert fila['ultimo'] == celda['valor'].iloc[-1]
+        assert fila['maximo'] == celda['valor'].max()
+
+
+def test_valores_de_un_nivel(df, cubo):
+    assert CuboTests.valores(cubo.agregados, 'test') == ['Fuerza', 'Velocidad']
+    assert CuboTests.valores(cubo.agregados, 'posicion') == ['', 'Pilar', 'Wing']
+
+
+def test_columnas_faltantes():
+    df = pd.DataFrame({'Test': ['Fuerza', 'Fuerza'], 'Nombre y Apellido': ['Ana', 'Ana'], 'valor': ['10', 'x']})
+    cubo = CuboTests(df)
+
+    assert CuboTests.valores(cubo.agregados, 'categoria') == ['']
+    fila = cubo.agregados.iloc[0]
+    assert (fila['cantidad'], fila['suma']) == (1, 10.0)
+    assert len(cubo.registros(test='Fuerza')) == 2
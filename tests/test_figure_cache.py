@@ -0,0 +1,120 @@
+"""
+Tests del cache LRU de figuras Plotly
+"""
+
+import pandas as pd
+import pytest
+
+go = pytest.importorskip('plotly.graph_objects')
+
+from src.modules import figure_cache as modulo
+from src.modules.figure_cache import FigureCache, cached_figure
+
+
+def _constructor(y, llamadas):
+    def construir():
+        llamadas.append(y)
+        return go.Figure(go.Bar(x=list(range(len(y))), y=y))
+    return construir
+
+
+def test_hit_reconstruye_la_misma_figura():
+    cache = FigureCache()
+    llamadas = []
+
+    primera = cache.figure('barras', 'r1', (), _constructor([1, 2, 3], llamadas))
+    segunda = cache.figure('barras', 'r1', (), _constructor([1, 2, 3], llamadas))
+
+    assert len(llamadas) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert segunda is not primera
+    assert list(segunda.data[0].y) == [1, 2, 3]
+
+
+def test_revision_y_filtros_son_parte_de_la_clave():
+    cache = FigureCache()
+    llamadas = []
+
+    cache.figure('barras', 'r1', (), _constructor([1], llamadas))
+    cache.figure('barras', 'r2', (), _constructor([2], llamadas))
+    cache.figure('barras', 'r1', ('M19',), _constructor([3], llamadas))
+    cache.figure('torta', 'r1', (), _constructor([4], llamadas))
+
+    assert llamadas == [[1], [2], [3], [4]]
+
+
+def test_builder_sin_figura_se_cachea():
+    cache = FigureCache()
+    llamadas = []
+
+    def sin_datos():
+        llamadas.append(None)
+        return None
+
+    assert cache.figure('vacio', 'r1', (), sin_datos) is None
+    assert cache.figure('vacio', 'r1', (), sin_datos) is None
+    assert len(llamadas) == 1
+    assert cache.hits == 1
+
+
+def test_desalojo_por_cantidad_lru():
+    cache = FigureCache(max_entries=2)
+    llamadas = []
+
+    cache.figure('a', 'r', (), _constructor([1], llamadas))
+    cache.figure('b', 'r', (), _constructor([2], llamadas))
+    cache.figure('a', 'r', (), _constructor([1], llamadas))  # 'a' pasa a ser la más reciente
+    cache.figure('c', 'r', (), _constructor([3], llamadas))  # desaloja 'b'
+
+    assert [k[0] for k in cache._items] == ['a', 'c']
+    cache.figure('b', 'r', (), _constructor([2], llamadas))
+    assert llamadas == [[1], [2], [3], [2]]
+
+
+def test_desalojo_por_tamano():
+    tamano = len(go.Figure(go.Bar(x=[0], y=[1])).to_json())
+    cache = FigureCache(max_bytes=int(tamano * 2.5))
+    llamadas = []
+
+    for kind in ('a', 'b', 'c'):
+        cache.figure(kind, 'r', (), _constructor([1], llamadas))
+
+    assert [k[0] for k in cache._items] == ['b', 'c']
+    assert cache.size_bytes == sum(len(p) for p in cache._items.values())
+    assert cache.size_bytes <= cache.max_bytes
+
+
+def test_figura_mayor_que_el_limite_no_se_guarda():
+    cache = FigureCache(max_bytes=10)
+    llamadas = []
+
+    fig = cache.figure('grande', 'r', (), _constructor([1, 2], llamadas))
+
+    assert fig is not None
+    assert len(cache._items) == 0 and cache.size_bytes == 0
+
+
+def test_clear_por_tipo():
+    cache = FigureCache()
+    llamadas = []
+    for kind in ('a', 'b', 'a'):
+        cache.figure(kind, f'r{len(llamadas)}', (), _constructor([1], llamadas))
+
+    cache.clear('a')
+    assert [k[0] for k in cache._items] == ['b']
+    assert cache.size_bytes == len(cache._items[('b', 'r1', ())])
+
+    cache.clear()
+    assert len(cache._items) == 0 and cache.size_bytes == 0
+
+
+def test_cached_figure_usa_la_revision_del_frame(monkeypatch):
+    monkeypatch.setattr(modulo, 'figure_cache', FigureCache())
+    df = pd.DataFrame({'x': [1, 2]})
+    llamadas = []
+
+    cached_figure('barras', df, (), _constructor([1], llamadas))
+    cached_figure('barras', df.copy(), (), _constructor([1], llamadas))
+    cached_figure('barras', df.assign(x=[1, 3]), (), _constructor([1], llamadas))
+
+    assert len(llamadas) == 2
@@ -0,0 +1,133 @@
+"""
+Tests de escrituras batch del GoogleSheetsManager contra una hoja simulada
+"""
+
+from datetime import timedelta
+
+import pytest
+
+gspread = pytest.importorskip('gspread')
+
+from src.sheets.google_sheets_manager import GoogleSheetsManager
+
+
+class HojaSimulada:
+    """Hoja en memoria con la parte de la API de gspread que usa el manager"""
+
+    title = 'Registros_Medicos'
+    id = 0
+
+    def __init__(self, valores):
+        self.valores = [list(fila) for fila in valores]
+        self.spreadsheet = self
+        self.descargas = 0
+
+    def get_all_values(self):
+        self.descargas += 1
+        return [list(fila) for fila in self.valores]
+
+    def batch_get(self, rangos):
+        celdas = []
+        for rango in rangos:
+            fila, columna = gspread.utils.a1_to_rowcol(rango)
+            if fila <= len(self.valores) and columna <= len(self.valores[fila - 1]):
+                celdas.append([[self.valores[fila - 1][columna - 1]]])
+            else:
+                celdas.append([])
+        return celdas
+
+    def batch_update(self, cuerpo, **kwargs):
+        if isinstance(cuerpo, dict):
+            # spreadsheet.batch_update con deleteDimension
+            for request in cuerpo['requests']:
+                rango = request['deleteDimension']['range']
+                del self.valores[rango['startIndex']:rango['endIndex']]
+            return
+        for celda in cuerpo:
+            fila, columna = gspread.utils.a1_to_rowcol(celda['range'])
+            self.valores[fila - 1][columna - 1] = celda['values'][0][0]
+
+
+def _manager(hoja):
+    manager = GoogleSheetsManager.__new__(GoogleSheetsManager)
+    manager._worksheet_index = {}
+    manager.index_ttl = timedelta(minutes=5)
+    manager.credentials_loaded = True
+    manager._get_medical_worksheet = lambda: hoja
+    return manager
+
+
+@pytest.fixture
+def hoja():
+    return HojaSimulada([
+        ['ID', 'Nombre', 'Estado'],
+        ['1', 'Ana', 'Activo'],
+        ['2', 'Juan', 'Activo'],
+        ['3', 'Luis', 'Activo'],
+        ['4', 'Sofía', 'Activo'],
+    ])
+
+
+def test_coalesce_row_ranges():
+    rangos = GoogleSheetsManager._coalesce_row_ranges([7, 2, 3, 3, 9, 8, 5])
+
+    assert rangos == [(7, 9), (5, 5), (2, 3)]
+    assert GoogleSheetsManager._coalesce_row_ranges([]) == []
+
+
+def test_update_records_con_indice_vigente(hoja):
+    manager = _manager(hoja)
+    manager._get_worksheet_index(hoja)
+
+    ok, _ = manager.update_records({'2': {'estado': 'Alta'}, 3: {'Estado': 'Alta'}})
+
+    assert ok
+    assert [fila[2] for fila in hoja.valores[1:]] == ['Activo', 'Alta', 'Alta', 'Activo']
+    assert hoja.descargas == 1
+
+
+def test_update_records_detecta_filas_desplazadas(hoja):
+    manager = _manager(hoja)
+    manager._get_worksheet_index(hoja)
+    # Otra sesión inserta una fila arriba: las posiciones cacheadas quedan corridas
+    hoja.valores.insert(1, ['9', 'Nuevo', 'Activo'])
+
+    ok, _ = manager.update_records({'2': {'estado': 'Alta'}})
+
+    assert ok
+    assert hoja.valores[3] == ['2', 'Juan', 'Alta']
+    assert hoja.valores[2] == ['1', 'Ana', 'Activo']
+    assert hoja.descargas == 2
+
+
+def test_update_records_id_inexistente(hoja):
+    manager = _manager(hoja)
+
+    ok, mensaje = manager.update_records({'99': {'estado': 'Alta'}})
+
+    assert not ok
+    assert '99' in mensaje
+
+
+def test_delete_records_detecta_filas_desplazadas(hoja):
+    manager = _manager(hoja)
+    manager._get_worksheet_index(hoja)
+    # Alguien borra la primera fila desde la interfaz de Sheets
+    del hoja.valores[1]
+
+    ok, _ = manager.delete_records(['3', '4'])
+
+    assert ok
+    assert hoja.valores == [['ID', 'Nombre', 'Estado'], ['2', 'Juan', 'Activo']]
+
+
+def test_delete_records_parchea_el_indice(hoja):
+    manager = _manager(hoja)
+    manager._get_worksheet_index(hoja)
+
+    manager.delete_records(['1', '3'])
+    ok, _ = manager.update_records({'4': {'estado': 'Alta'}})
+
+    assert ok
+    assert hoja.valores == [['ID', 'Nombre', 'Estado'], ['2', 'Juan', 'Activo'], ['4', 'Sofía', 'Alta']]
+    assert hoja.descargas == 1
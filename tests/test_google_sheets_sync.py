@@ -0,0 +1,119 @@
+"""
+Tests de la sincronización incremental de hojas (claves por contenido de fila)
+"""
+
+import json
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('gspread')
+pytest.importorskip('streamlit')
+
+from src.local_store import LocalStore
+from src.sheets import google_sheets_sync
+from src.sheets.google_sheets_sync import GoogleSheetsCAR, store_synced_records
+
+URL = 'https://docs.google.com/spreadsheets/d/abc123/edit'
+
+
+def _fila(jugador, lesion='Esguince', fecha='01/05/2024'):
+    return {'Jugador': jugador, 'Lesion': lesion, 'Severidad': 'Leve', 'Fecha': fecha}
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = LocalStore(str(tmp_path / 'car.db'))
+    monkeypatch.setattr(google_sheets_sync, 'get_local_store', lambda: store)
+    monkeypatch.setattr(google_sheets_sync, 'SYNC_CONFIG_PATH', str(tmp_path / 'data' / 'sync_config.json'))
+    return store
+
+
+@pytest.fixture
+def hoja():
+    return [_fila('Ana'), _fila('Juan'), _fila('Luis')]
+
+
+@pytest.fixture
+def gs(hoja, store):
+    gs = GoogleSheetsCAR.__new__(GoogleSheetsCAR)
+    gs.client = object()
+    gs.pending_sync_state = {}
+    gs.last_sync_summary = None
+    gs.get_sheet_data = lambda url, worksheet=None: (True, pd.DataFrame(hoja))
+    return gs
+
+
+def _sincronizar(gs):
+    success, records = gs.sync_medical_data(URL, 'dr', None)
+    assert success
+    store_synced_records('injuries', records, gs.removed_record_ids())
+    gs.commit_sync_state()
+    return records
+
+
+def _jugadores(store):
+    return sorted((r['player_name'], r['injury_type']) for r in store.all('injuries'))
+
+
+def test_primera_sincronizacion_y_repeticion_idempotente(gs, store):
+    assert len(_sincronizar(gs)) == 3
+    ids = {r['id'] for r in store.all('injuries')}
+
+    assert _sincronizar(gs) == []
+    assert gs.last_sync_summary['unchanged_rows'] == 3
+    assert {r['id'] for r in store.all('injuries')} == ids
+
+
+def test_insertar_una_fila_arriba_solo_importa_esa_fila(gs, store, hoja):
+    _sincronizar(gs)
+    ids = {r['id'] for r in store.all('injuries')}
+
+    hoja.insert(0, _fila('Pedro'))
+    records = _sincronizar(gs)
+
+    assert [r['player_name'] for r in records] == ['Pedro']
+    assert gs.removed_record_ids() == []
+    assert ids < {r['id'] for r in store.all('injuries')}
+    assert _jugadores(store) == [('Ana', 'Esguince'), ('Juan', 'Esguince'), ('Luis', 'Esguince'), ('Pedro', 'Esguince')]
+
+
+def test_borrar_y_editar_filas(gs, store, hoja):
+    _sincronizar(gs)
+
+    del hoja[0]
+    hoja[1] = _fila('Luis', 'Desgarro')
+    records = _sincronizar(gs)
+
+    assert [r['player_name'] for r in records] == ['Luis']
+    assert len(gs.removed_record_ids()) == 2
+    assert _jugadores(store) == [('Juan', 'Esguince'), ('Luis', 'Desgarro')]
+
+
+def test_filas_identicas_son_registros_distintos(gs, store, hoja):
+    hoja.append(_fila('Ana'))
+
+    assert len(_sincronizar(gs)) == 4
+    assert store.count('injuries') == 4
+
+    hoja.pop()
+    _sincronizar(gs)
+    assert _jugadores(store).count(('Ana', 'Esguince')) == 1
+
+
+def test_sync_config_guarda_solo_un_resumen(gs, store, hoja, tmp_path):
+    hoja.extend(_fila(f'Jugador {i}') for i in range(200))
+    _sincronizar(gs)
+
+    with open(google_sheets_sync.SYNC_CONFIG_PATH) as f:
+        estado = json.load(f)['sync_state']
+    assert len(estado) == 1
+    assert set(next(iter(estado.values()))) == {'total_rows', 'last_sync'}
+
+
+def test_ids_with_prefix(store):
+    store.upsert_many('injuries', [{'id': 'gs_a_1'}, {'id': 'gs_a_2'}, {'id': 'gs_b_1'}, {'id': 'gs_nut_x'}])
+
+    assert store.ids_with_prefix('injuries', 'gs_a_') == {'gs_a_1', 'gs_a_2'}
+    assert store.ids_with_prefix('injuries', 'gs_') == {'gs_a_1', 'gs_a_2', 'gs_b_1', 'gs_nut_x'}
+    assert store.ids_with_prefix('injuries', 'zz') == set()
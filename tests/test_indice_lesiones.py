@@ -0,0 +1,92 @@
+"""
+Tests del índice de lesiones del Dashboard General contra los filtros de pandas
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('streamlit')
+pytest.importorskip('gspread')
+
+from src.modules import areamedica
+from src.modules.areamedica import IndiceLesiones, obtener_indice_lesiones
+from src.modules.html_fragments import fragment_cache
+
+COL_DIVISION = 'Categoría'
+COL_SEVERIDAD = 'Severidad de la Lesión'
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        COL_DIVISION: ['M19 ', 'Primera', 'M19 ', None, 'Primera', 'Intermedia'],
+        COL_SEVERIDAD: ['Leve ', 'Grave', 'Moderada', 'Leve', None, ' Leve'],
+        'Nombre': list('abcdef'),
+    })
+
+
+@pytest.mark.parametrize('division', ['Todas', 'M19 ', 'Primera', 'Reserva'])
+@pytest.mark.parametrize('severidad', ['Todas', 'Leve ', 'Grave', 'Crítica'])
+def test_filtros_coinciden_con_pandas(df, division, severidad):
+    indice = IndiceLesiones(df, COL_DIVISION, COL_SEVERIDAD)
+
+    esperado = df
+    if division != 'Todas':
+        esperado = esperado[esperado[COL_DIVISION] == division]
+    if severidad != 'Todas':
+        esperado = esperado[esperado[COL_SEVERIDAD] == severidad]
+
+    pd.testing.assert_frame_equal(indice.frame(division, severidad), esperado)
+    assert indice.por_division(division, severidad).to_dict() == esperado[COL_DIVISION].value_counts().to_dict()
+
+
+def test_por_clase(df):
+    indice = IndiceLesiones(df, COL_DIVISION, COL_SEVERIDAD)
+
+    assert indice.por_clase() == {'Leve': 3, 'Moderada': 1, 'Grave': 1}
+    assert indice.por_clase(division='Primera') == {'Leve': 0, 'Moderada': 0, 'Grave': 1}
+
+
+def test_limpiar_solo_recorta_la_severidad(df):
+    indice = IndiceLesiones(df, COL_DIVISION, COL_SEVERIDAD, limpiar=True)
+
+    assert indice.divisiones == ['Intermedia', 'M19 ', 'Primera']
+    assert indice.severidades == ['Grave', 'Leve', 'Moderada']
+    assert indice.por_severidad().to_dict() == {'Leve': 3, 'Grave': 1, 'Moderada': 1}
+    # El DataFrame original no se modifica
+    assert df[COL_SEVERIDAD].iloc[0] == 'Leve '
+
+
+def test_limpiar_conserva_valores_no_texto():
+    df = pd.DataFrame({COL_DIVISION: ['M19', 'M19', 'Primera'], COL_SEVERIDAD: [' Leve', 3, np.nan]})
+    indice = IndiceLesiones(df, COL_DIVISION, COL_SEVERIDAD, limpiar=True)
+
+    assert list(indice.filas(severidad=3)) == [1]
+    assert list(indice.filas(severidad='Leve')) == [0]
+
+    numerica = pd.DataFrame({COL_DIVISION: ['M19', 'Primera'], COL_SEVERIDAD: [1, 2]})
+    assert IndiceLesiones(numerica, COL_DIVISION, COL_SEVERIDAD, limpiar=True).severidades == [1, 2]
+
+
+def test_columnas_ausentes():
+    df = pd.DataFrame({'Nombre': ['a', 'b']})
+    indice = IndiceLesiones(df, COL_DIVISION, COL_SEVERIDAD)
+
+    assert indice.divisiones == []
+    assert len(indice.frame('M19', 'Leve')) == 2
+    assert indice.por_division().empty
+
+
+def test_cache_propio_por_revision(df):
+    areamedica._INDEX_CACHE.clear()
+
+    primero = obtener_indice_lesiones(df, COL_DIVISION, COL_SEVERIDAD, revision='r1')
+    assert obtener_indice_lesiones(df, COL_DIVISION, COL_SEVERIDAD, revision='r1') is primero
+    assert obtener_indice_lesiones(df, COL_DIVISION, COL_SEVERIDAD, limpiar=True, revision='r1') is not primero
+    assert obtener_indice_lesiones(df, COL_DIVISION, COL_SEVERIDAD, revision='r2') is not primero
+
+    for i in range(areamedica._INDEX_CACHE.max_size + 2):
+        obtener_indice_lesiones(df, COL_DIVISION, COL_SEVERIDAD, revision=f'otra{i}')
+    assert len(areamedica._INDEX_CACHE) == areamedica._INDEX_CACHE.max_size
+    assert not any(k[0] == 'indice_lesiones' for k in fragment_cache._items)
@@ -0,0 +1,183 @@
+"""
+Tests del historial de asistencias (Lista) contra una hoja simulada
+"""
+
+from datetime import date
+
+import pandas as pd
+import pytest
+
+st = pytest.importorskip('streamlit')
+gspread = pytest.importorskip('gspread')
+
+from src.modules import Lista
+from src.modules.Lista import AsistenciaManager, HistorialAsistencias
+
+HEADERS = ["Fecha", "Categoria", "Tipo_Actividad", "DNI", "Nombre", "Apellido", "Estado_Asistencia", "Observaciones"]
+
+
+def _fila(fecha, dni, estado='Presente'):
+    return [fecha, 'M19', 'Entrenamiento', dni, f'Nombre{dni}', f'Apellido{dni}', estado, '']
+
+
+class HojaSimulada:
+    """Hoja de asistencias en memoria (get, get_all_values, append_rows)"""
+
+    def __init__(self, filas):
+        self.valores = [list(HEADERS)] + [list(f) for f in filas]
+        self.descargas = 0
+        self.lecturas = []
+
+    def get_all_values(self):
+        self.descargas += 1
+        return [list(f) for f in self.valores]
+
+    def get(self, rango):
+        self.lecturas.append(rango)
+        inicio = gspread.utils.a1_to_rowcol(rango.split(':')[0])[0]
+        return [list(f) for f in self.valores[inicio - 1:]]
+
+    def append_rows(self, filas, value_input_option=None):
+        inicio = len(self.valores) + 1
+        self.valores.extend(list(f) for f in filas)
+        fin = len(self.valores)
+        return {'updates': {'updatedRange': f"'Asistencias'!A{inicio}:H{fin}"}}
+
+
+@pytest.fixture
+def hoja():
+    return HojaSimulada([
+        _fila('03/05/2024', '1'),
+        _fila('01/05/2024', '2', 'Ausente'),
+        _fila('02/05/2024', '3'),
+    ])
+
+
+@pytest.fixture
+def manager(hoja, monkeypatch):
+    st.session_state.sheets_cache = {}
+    manager = AsistenciaManager.__new__(AsistenciaManager)
+    monkeypatch.setattr(manager, 'get_or_create_attendance_sheet', lambda: hoja, raising=False)
+    monkeypatch.setattr(manager, 'rate_limit_check', lambda: None, raising=False)
+    monkeypatch.setattr(st, 'success', lambda *a, **k: None)
+    yield manager
+    st.session_state.sheets_cache = {}
+
+
+def _vencer_cache(history):
+    history.refreshed_at = 0.0
+
+
+def test_historial_ordena_y_filtra_por_rango():
+    history = HistorialAsistencias(HEADERS)
+    history.append_rows([_fila('03/05/2024', '1'), _fila('01/05/2024', '2'), _fila('fecha rota', '4'), ['', '']])
+
+    assert list(history.frame['DNI']) == ['2', '1', '4']
+    assert history.rows_loaded == 5
+    assert list(history.slice(date(2024, 5, 1), date(2024, 5, 2))['DNI']) == ['2']
+    assert history.slice(date(2024, 6, 1), date(2024, 6, 30)).empty
+
+
+def test_lectura_incremental_de_filas_nuevas(manager, hoja):
+    history = manager.get_attendance_history()
+    hoja.valores.append(_fila('04/05/2024', '5'))
+    _vencer_cache(history)
+
+    history = manager.get_attendance_history()
+
+    assert hoja.descargas == 1
+    assert hoja.lecturas == ['A4:H']
+    assert list(history.frame['DNI']) == ['2', '3', '1', '5']
+
+
+def test_filas_borradas_fuerzan_recarga(manager, hoja):
+    history = manager.get_attendance_history()
+    del hoja.valores[1]
+    hoja.valores.append(_fila('04/05/2024', '5'))
+    _vencer_cache(history)
+
+    history = manager.get_attendance_history()
+
+    assert hoja.descargas == 2
+    assert list(history.frame['DNI']) == ['2', '3', '5']
+    assert history.rows_loaded == 4
+
+
+def test_recarga_completa_periodica_toma_ediciones(manager, hoja):
+    history = manager.get_attendance_history()
+    hoja.valores[2][6] = 'Presente'
+    history.loaded_at -= Lista.HISTORY_FULL_REFRESH_SECONDS
+    _vencer_cache(history)
+
+    history = manager.get_attendance_history()
+
+    assert hoja.descargas == 2
+    assert set(history.frame['Estado_Asistencia']) == {'Presente'}
+
+
+def test_save_attendance_agrega_sin_descargar_la_hoja(manager, hoja):
+    history = manager.get_attendance_history()
+    jugadores = [{'dni': 7, 'nombre': 'Ana', 'apellido': 'Paz', 'estado_asistencia': 'Presente'}]
+
+    assert manager.save_attendance(jugadores, date(2024, 5, 5), 'M19', 'Partido')
+
+    assert hoja.descargas == 1
+    assert hoja.valores[-1][:4] == ['05/05/2024', 'M19', 'Partido', '7']
+    assert history.rows_loaded == 5
+    assert list(history.frame['DNI'])[-1] == '7'
+
+
+def _plantel():
+    return pd.DataFrame({
+        'DNI': ['1', '2', '3'],
+        'Nombre': ['Ana', 'Juan', 'Luis'],
+        'Apellido': ['Paz', 'Sosa', 'Ríos'],
+        'Posicion': ['Pilar', None, 'Wing'],
+    })
+
+
+@pytest.fixture
+def lista_key():
+    key = Lista._roll_call_key(date(2024, 5, 5), 'M19', 'Entrenamiento')
+    yield key
+    for k in [k for k in st.session_state if str(k).startswith(key)]:
+        del st.session_state[k]
+
+
+def test_ediciones_de_la_grilla_sobreviven_al_estado_del_widget(lista_key):
+    lista = Lista._estado_lista(_plantel(), lista_key)
+    editor_key = f"{lista_key}_editor_{lista['version']}"
+    st.session_state[editor_key] = {'edited_rows': {1: {'Estado': '❌ Ausente', 'Observaciones': 'Viaje'}}}
+
+    Lista._guardar_ediciones(lista_key, editor_key)
+    # Cambiar de vista o de página descarta el estado del widget
+    del st.session_state[editor_key]
+
+    data = Lista._estado_lista(_plantel(), lista_key)['data']
+    assert data.loc['2', 'Estado'] == '❌ Ausente'
+    assert data.loc['2', 'Observaciones'] == 'Viaje'
+    assert data.loc['1', 'Estado'] == '✅ Presente'
+
+
+def test_accion_masiva_sobre_seleccion(lista_key):
+    lista = Lista._estado_lista(_plantel(), lista_key)
+    editor_key = f"{lista_key}_editor_{lista['version']}"
+    st.session_state[editor_key] = {'edited_rows': {0: {'Sel.': True}, 2: {'Sel.': True}}}
+
+    Lista._accion_masiva(lista_key, editor_key, '🩹 Lesionado')
+
+    lista = st.session_state[lista_key]
+    assert lista['version'] == 1
+    assert list(lista['data']['Estado']) == ['🩹 Lesionado', '✅ Presente', '🩹 Lesionado']
+    assert not lista['data']['Sel.'].any()
+
+
+def test_cambio_de_plantel_conserva_marcas(lista_key):
+    lista = Lista._estado_lista(_plantel(), lista_key)
+    lista['data'].loc['2', 'Estado'] = '❌ Ausente'
+
+    plantel = _plantel().iloc[1:]
+    data = Lista._estado_lista(plantel, lista_key)['data']
+
+    assert list(data.index) == ['2', '3']
+    assert data.loc['2', 'Estado'] == '❌ Ausente'
@@ -0,0 +1,94 @@
+"""
+Tests del almacenamiento local SQLite
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+from src import local_store
+from src.local_store import LocalStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LocalStore(str(tmp_path / 'car.db'))
+
+
+def _write_json(path, key, records):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({key: records}, f)
+
+
+def test_add_asigna_ids_consecutivos(store):
+    first = store.add('injuries', {'player_name': 'Ana'})
+    second = store.add('injuries', {'player_name': 'Juan'})
+
+    assert (first, second) == (1, 2)
+    assert [r['player_name'] for r in store.all('injuries')] == ['Ana', 'Juan']
+
+
+def test_query_por_jugador_y_division(store):
+    store.upsert_many('injuries', [
+        {'id': 1, 'player_name': 'Ana', 'division': 'M19'},
+        {'id': 2, 'player_name': 'Ana', 'division': 'Primera'},
+        {'id': 3, 'player_name': 'Juan', 'division': 'M19'},
+    ])
+
+    assert [r['id'] for r in store.query('injuries', player_name='Ana')] == [1, 2]
+    assert [r['id'] for r in store.query('injuries', player_name='Ana', division='M19')] == [1]
+
+
+def test_ids_de_archivos_heredados_no_colisionan(store, tmp_path, monkeypatch):
+    principal = str(tmp_path / 'credentials' / 'medical_records.json')
+    secundario = str(tmp_path / 'data' / 'medical_records.json')
+    _write_json(principal, 'injuries', [{'id': 1, 'player_name': 'Ana'}, {'id': 2, 'player_name': 'Juan'}])
+    _write_json(secundario, 'injuries', [{'id': 1, 'player_name': 'Luis'}])
+    monkeypatch.setattr(local_store, 'LEGACY_JSON_FILES', [
+        ('injuries', principal, 'injuries', None),
+        ('injuries', secundario, 'injuries', 'data'),
+    ])
+
+    assert store.import_legacy_json() == {'injuries': 3}
+
+    registros = {str(r['id']): r['player_name'] for r in store.all('injuries')}
+    assert registros == {'1': 'Ana', '2': 'Juan', 'data:1': 'Luis'}
+    # Las altas nuevas siguen la numeración del archivo principal
+    assert store.add('injuries', {'player_name': 'Sofía'}) == 3
+
+
+def test_importacion_unica_no_pisa_ediciones(store, tmp_path):
+    path = str(tmp_path / 'data' / 'field_tests.json')
+    _write_json(path, 'tests', [{'id': 1, 'player_name': 'Ana', 'result': 10}])
+
+    assert store.import_json('field_tests', path, 'tests') == 1
+    store.upsert_many('field_tests', [{'id': 1, 'player_name': 'Ana', 'result': 12}])
+
+    # El archivo cambia después de la importación: no se vuelve a importar
+    _write_json(path, 'tests', [{'id': 1, 'player_name': 'Ana', 'result': 10}, {'id': 2}])
+    os.utime(path, (1, 1))
+    assert store.import_json('field_tests', path, 'tests') == 0
+    assert [r['result'] for r in store.all('field_tests')] == [12]
+
+
+def test_insert_missing_no_reemplaza(store):
+    store.upsert_many('meal_plans', [{'id': 1, 'player_name': 'Ana'}])
+
+    inserted = store.insert_missing('meal_plans', [{'id': 1, 'player_name': 'Otro'}, {'id': 2, 'player_name': 'Juan'}])
+
+    assert inserted == 1
+    assert [r['player_name'] for r in store.all('meal_plans')] == ['Ana', 'Juan']
+
+
+def test_un_solo_modulo_de_almacen():
+    pytest.importorskip('gspread')
+    pytest.importorskip('streamlit')
+    import src.sheets.google_sheets_sync as sync
+    import src.sheets.formularios_google_sheets as formularios
+
+    assert sync.get_local_store is local_store.get_local_store
+    assert formularios.get_local_store is local_store.get_local_store
+    assert 'local_store' not in sys.modules
@@ -0,0 +1,73 @@
+"""
+Tests del log de accesos y del último login derivado de él
+"""
+
+import json
+
+import pytest
+
+from src.otro.login_audit import LoginAuditLog
+
+
+@pytest.fixture
+def log(tmp_path):
+    return LoginAuditLog(str(tmp_path / 'login_audit.jsonl'), max_bytes=200, backups=2)
+
+
+def test_record_y_recent(log):
+    log.record('ana', success=True)
+    log.record('juan', success=False)
+
+    events = log.recent()
+    assert [(e['username'], e['success']) for e in events] == [('ana', True), ('juan', False)]
+    assert log.recent(limit=1)[0]['username'] == 'juan'
+
+
+def test_rotacion_por_tamano(log, tmp_path):
+    for _ in range(10):
+        log.record('ana', success=True)
+
+    assert (tmp_path / 'login_audit.jsonl.1').exists()
+    assert (tmp_path / 'login_audit.jsonl.2').exists()
+    assert not (tmp_path / 'login_audit.jsonl.3').exists()
+
+
+def test_last_success_ignora_intentos_fallidos(log):
+    assert log.last_success('ana') is None
+
+    log.record('ana', success=True)
+    primero = log.last_success('ana')
+    log.record('ana', success=False)
+
+    assert primero is not None
+    assert log.last_success('ana') == primero
+
+
+def test_last_success_persiste_entre_reinicios(log, tmp_path):
+    with open(log.path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'username': 'ana', 'timestamp': '2024-05-01 10:00:00', 'success': True}) + '\n')
+        f.write('linea corrupta\n')
+        f.write(json.dumps({'username': 'ana', 'timestamp': '2024-05-02 10:00:00', 'success': False}) + '\n')
+    with open(f'{log.path}.1', 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'username': 'juan', 'timestamp': '2024-04-01 09:00:00', 'success': True}) + '\n')
+
+    reiniciado = LoginAuditLog(log.path, backups=2)
+
+    assert reiniciado.last_success('ana') == '2024-05-01 10:00:00'
+    assert reiniciado.last_success('juan') == '2024-04-01 09:00:00'
+
+
+def test_authenticate_no_modifica_el_usuario_cacheado(tmp_path, monkeypatch):
+    pytest.importorskip('streamlit')
+    from src.otro import auth_manager
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(auth_manager, 'login_audit_log', LoginAuditLog(str(tmp_path / 'audit.jsonl')))
+    manager = auth_manager.AuthManager()
+
+    ok, user = manager.authenticate('dr.garcia', 'medico123')
+
+    assert ok
+    assert user['last_login'] == auth_manager.login_audit_log.last_success('dr.garcia')
+    assert manager.directory.get('dr.garcia')['last_login'] is None
+    assert not manager.authenticate('dr.garcia', 'incorrecta')[0]
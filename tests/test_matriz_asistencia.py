@@ -0,0 +1,135 @@
+"""
+Tests de la matriz de asistencia (bitsets) contra el cálculo directo con pandas
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.modules import matriz_asistencia
+from src.modules.asistencia_stats import normalizar_historial
+from src.modules.matriz_asistencia import MatrizAsistencia, obtener_matriz_asistencia
+
+
+def _historial(jugadores=12, fechas=20, semilla=0):
+    rng = np.random.default_rng(semilla)
+    filas = []
+    for dia in pd.date_range('2024-03-01', periods=fechas, freq='2D'):
+        for dni in range(jugadores):
+            if rng.random() < 0.15:
+                continue  # jugador sin registro en esa sesión
+            filas.append({
+                'Fecha': dia.strftime('%Y-%m-%d'),
+                'Categoria': 'M19' if dni % 2 else 'Primera',
+                'Tipo_Actividad': 'Entrenamiento',
+                'DNI': str(1000 + dni),
+                'Nombre': f'Jugador{dni}',
+                'Apellido': 'Test',
+                'Estado_Asistencia': rng.choice(['Presente', 'Ausente', 'Lesionado'], p=[0.6, 0.3, 0.1]),
+            })
+    return pd.DataFrame(filas)
+
+
+@pytest.fixture(scope='module')
+def historial():
+    return _historial()
+
+
+@pytest.fixture(scope='module')
+def matriz(historial):
+    return MatrizAsistencia(historial)
+
+
+def test_concurrencia_coincide_con_pandas(matriz, historial):
+    datos = normalizar_historial(historial)
+    esperado = datos.groupby(['Fecha', 'Categoria', 'Tipo_Actividad'])['Estado'].value_counts().unstack(fill_value=0)
+
+    concurrencia = matriz.concurrencia().set_index(['Fecha', 'Categoria', 'Tipo_Actividad'])
+    for estado in ('Presente', 'Ausente', 'Lesionado'):
+        assert (concurrencia[estado] == esperado[estado].reindex(concurrencia.index, fill_value=0)).all()
+    assert (concurrencia['Registrado'] == esperado.sum(axis=1).reindex(concurrencia.index)).all()
+
+
+def _faltas_con_pandas(datos, ultimas, minimo):
+    """Ausencias en las últimas `ultimas` sesiones registradas de cada jugador"""
+    recientes = (
+        datos.sort_values(['Fecha', 'Categoria', 'Tipo_Actividad'], kind='stable')
+        .groupby('DNI')
+        .tail(ultimas)
+    )
+    ausencias = recientes[recientes['Estado'] == 'Ausente'].groupby('DNI').size()
+    return set(ausencias[ausencias >= minimo].index)
+
+
+def test_faltas_recientes_coincide_con_pandas(matriz, historial):
+    datos = normalizar_historial(historial)
+
+    resultado = matriz.faltas_recientes(ultimas=5, minimo=2)
+
+    assert set(resultado['DNI']) == _faltas_con_pandas(datos, 5, 2)
+    assert resultado['Ausencias'].is_monotonic_decreasing
+    assert (resultado['Registradas'] <= 5).all()
+
+
+def test_faltas_recientes_con_categorias_intercaladas():
+    filas = []
+    # M19 entrena los lunes; Primera, martes a viernes
+    for semana in range(3):
+        lunes = pd.Timestamp('2024-04-01') + pd.Timedelta(weeks=semana)
+        filas.append((lunes, 'M19', '1', 'Ausente'))
+        filas.append((lunes, 'M19', '2', 'Presente'))
+        for dia in range(1, 5):
+            filas.append((lunes + pd.Timedelta(days=dia), 'Primera', '3', 'Presente'))
+    historial = pd.DataFrame([
+        {'Fecha': f, 'Categoria': c, 'Tipo_Actividad': 'Entrenamiento', 'DNI': d,
+         'Nombre': f'J{d}', 'Apellido': 'Test', 'Estado_Asistencia': e}
+        for f, c, d, e in filas
+    ])
+    matriz = MatrizAsistencia(historial)
+
+    # Las sesiones de Primera no desplazan la ventana del jugador de M19
+    todas = matriz.faltas_recientes(ultimas=5, minimo=3)
+    assert list(todas['DNI']) == ['1']
+    assert todas['Registradas'].iloc[0] == 3
+    assert list(matriz.faltas_recientes(ultimas=5, minimo=3, categoria='M19')['DNI']) == ['1']
+    assert matriz.faltas_recientes(ultimas=5, minimo=1, categoria='Primera').empty
+    assert matriz.faltas_recientes(ultimas=2, minimo=3).empty
+
+
+def test_sesiones_compartidas_coincide_con_pandas(matriz, historial):
+    datos = normalizar_historial(historial)
+    presentes = datos[datos['Estado'] == 'Presente']
+    sesiones = presentes.groupby('DNI').apply(lambda g: set(zip(g['Fecha'], g['Categoria'], g['Tipo_Actividad'])))
+
+    assert matriz.sesiones_compartidas('1000', '1002') == len(sesiones['1000'] & sesiones['1002'])
+    coincidencias = matriz.coincidencias('1000')
+    assert '1000' not in coincidencias.index
+    assert coincidencias['1002'] == len(sesiones['1000'] & sesiones['1002'])
+
+
+def test_dni_desconocido(matriz):
+    assert matriz.sesiones_compartidas('1000', '9999') == 0
+    assert matriz.coincidencias('9999').empty
+
+
+def test_ultimas_sesiones_con_n_no_positivo(matriz):
+    assert len(matriz.ultimas_sesiones(0)) == 0
+    assert len(matriz.ultimas_sesiones(-3)) == 0
+    assert len(matriz.ultimas_sesiones(3, categoria='M19')) == 3
+    assert matriz.faltas_recientes(ultimas=0, minimo=1).empty
+
+
+def test_historial_vacio():
+    matriz = MatrizAsistencia(pd.DataFrame())
+
+    assert matriz.nbytes == 0
+    assert matriz.concurrencia().empty
+    assert matriz.faltas_recientes().empty
+
+
+def test_memoizada_por_revision(historial):
+    matriz_asistencia._MATRIX_CACHE.clear()
+
+    primera = obtener_matriz_asistencia(historial)
+    assert obtener_matriz_asistencia(historial.copy()) is primera
+    assert obtener_matriz_asistencia(historial.iloc[:-1]) is not primera
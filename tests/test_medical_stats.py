@@ -0,0 +1,94 @@
+"""
+Tests del motor de estadísticas médicas
+"""
+
+from datetime import datetime
+
+import pytest
+
+from src.sheets import medical_stats
+from src.sheets.medical_stats import compute_medical_statistics
+
+
+def _records():
+    hoy = datetime.now().strftime("%Y-%m-%d")
+    return [
+        {"Severidad": "Grave", "Estado": "Activo", "Division": "M19",
+         "Nombre_Profesional": "Dra. Pérez", "Fecha_Registro": hoy,
+         "Timestamp": "2024-05-02 10:30:00"},
+        {"Severidad": "Leve", "Estado": "Alta", "Division": "M19",
+         "Nombre_Profesional": "Dr. Gómez", "Fecha_Registro": "2024-05-01"},
+        {"Severidad": "grave ", "Estado": "", "Division": "Primera",
+         "Nombre_Profesional": "Dra. Pérez", "Fecha_Registro": "2024-04-30"},
+    ]
+
+
+@pytest.fixture(autouse=True)
+def _cache_vacio():
+    medical_stats._STATS_CACHE.clear()
+    yield
+    medical_stats._STATS_CACHE.clear()
+
+
+def test_contadores():
+    stats = compute_medical_statistics(_records())
+
+    assert stats["total_registros"] == 3
+    assert stats["registros_hoy"] == 1
+    assert stats["profesionales_activos"] == 2
+    assert stats["casos_graves"] == 2
+    assert stats["por_division"] == {"M19": 2, "Primera": 1}
+    assert stats["ultimo_registro"] == "N/A"
+
+
+def test_revision_del_origen_evita_construir_el_frame(monkeypatch):
+    first = compute_medical_statistics(_records(), revision="hoja@1")
+
+    def no_construir(records):
+        raise AssertionError("un acierto no debe construir el frame")
+
+    monkeypatch.setattr(medical_stats, "build_raw_frame", no_construir)
+    second = compute_medical_statistics(_records(), revision="hoja@1")
+
+    assert second == first
+    assert second["revision"] == "hoja@1"
+
+
+def test_revision_nueva_recalcula():
+    compute_medical_statistics(_records(), revision="hoja@1")
+    stats = compute_medical_statistics(_records()[:1], revision="hoja@2")
+
+    assert stats["total_registros"] == 1
+
+
+def test_sin_revision_usa_hash_de_contenido():
+    a = compute_medical_statistics(_records())
+    b = compute_medical_statistics(list(_records()))
+    c = compute_medical_statistics(_records()[:2])
+
+    assert a["revision"] == b["revision"]
+    assert c["revision"] != a["revision"]
+
+
+def test_resultado_es_una_copia():
+    stats = compute_medical_statistics(_records(), revision="hoja@1")
+    stats["total_registros"] = 0
+
+    assert compute_medical_statistics(_records(), revision="hoja@1")["total_registros"] == 3
+
+
+def test_sheet_revision():
+    class Planilla:
+        id = "abc"
+
+        def get_lastUpdateTime(self):
+            return "2024-05-02T10:30:00.000Z"
+
+    class SinDrive:
+        id = "abc"
+
+        def get_lastUpdateTime(self):
+            raise RuntimeError("sin permisos de Drive")
+
+    assert medical_stats.sheet_revision(Planilla(), "Hoja 1") == "abc/Hoja 1@2024-05-02T10:30:00.000Z"
+    assert medical_stats.sheet_revision(SinDrive(), "Hoja 1") is None
@@ -0,0 +1,107 @@
+"""
+Tests del CSV público: descarga contra un servidor HTTP local (200 y luego 304)
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from src.sheets.public_csv import clear_public_csv_cache, fetch_public_csv, public_csv_revision
+
+CSV = (
+    'Nombre,Diagnostico,Severidad\n'
+    'Juan,"Esguince, tobillo",Leve\n'
+    'Ana,"Contractura\nisquiotibial",Grave\n'
+    '\n'
+    'Luis,,Moderada\n'
+).encode('utf-8')
+ETAG = '"v1"'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        _Handler.requests.append(dict(self.headers))
+        if self.headers.get('If-None-Match') == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/csv')
+        self.send_header('ETag', ETAG)
+        self.send_header('Content-Length', str(len(CSV)))
+        self.end_headers()
+        self.wfile.write(CSV)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def csv_url():
+    pytest.importorskip('requests')
+    _Handler.requests = []
+    clear_public_csv_cache()
+    server = HTTPServer(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}/export?format=csv'
+    server.shutdown()
+    server.server_close()
+    clear_public_csv_cache()
+
+
+def test_parsea_comillas_y_saltos_de_linea(csv_url):
+    frame, changed = fetch_public_csv(csv_url)
+
+    assert changed
+    assert list(frame.columns) == ['Nombre', 'Diagnostico', 'Severidad']
+    assert len(frame) == 3
+    assert frame.loc[0, 'Diagnostico'] == 'Esguince, tobillo'
+    assert frame.loc[1, 'Diagnostico'] == 'Contractura\nisquiotibial'
+    assert frame.loc[2, 'Diagnostico'] == ''
+
+
+def test_304_reutiliza_el_cache(csv_url):
+    first, _ = fetch_public_csv(csv_url)
+    second, changed = fetch_public_csv(csv_url)
+
+    assert not changed
+    assert _Handler.requests[1].get('If-None-Match') == ETAG
+    assert second.equals(first)
+
+
+def test_modificar_el_resultado_no_altera_el_cache(csv_url):
+    first, _ = fetch_public_csv(csv_url)
+    first.loc[0, 'Nombre'] = 'Modificado'
+    first.drop(columns='Severidad', inplace=True)
+
+    second, changed = fetch_public_csv(csv_url)
+    second.loc[1, 'Nombre'] = 'Otro'
+
+    third, _ = fetch_public_csv(csv_url)
+    assert not changed
+    assert third.loc[0, 'Nombre'] == 'Juan'
+    assert third.loc[1, 'Nombre'] == 'Ana'
+    assert 'Severidad' in third.columns
+
+
+def test_force_ignora_el_cache(csv_url):
+    fetch_public_csv(csv_url)
+    _, changed = fetch_public_csv(csv_url, force=True)
+
+    assert changed
+    assert 'If-None-Match' not in _Handler.requests[1]
+
+
+def test_revision_del_export(csv_url):
+    assert public_csv_revision(csv_url) is None
+
+    fetch_public_csv(csv_url)
+    revision = public_csv_revision(csv_url)
+    fetch_public_csv(csv_url)
+
+    assert revision == f'{csv_url}@{ETAG}'
+    assert public_csv_revision(csv_url) == revision
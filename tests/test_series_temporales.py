@@ -0,0 +1,100 @@
+"""
+Tests de agregación adaptativa y reducción min/max de series temporales
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('plotly')
+
+from src.modules.series_temporales import (
+    MAX_PUNTOS,
+    agrupar_conteos,
+    clase_traza,
+    elegir_granularidad,
+    reducir_min_max,
+)
+
+
+@pytest.mark.parametrize('dias,esperada', [(30, 'D'), (120, 'D'), (400, 'W'), (2000, 'M')])
+def test_elegir_granularidad(dias, esperada):
+    inicio = pd.Timestamp('2023-01-01')
+    assert elegir_granularidad(inicio, inicio + pd.Timedelta(days=dias - 1)) == esperada
+
+
+def test_agrupar_conteos_conserva_el_total():
+    rng = np.random.default_rng(0)
+    fechas = pd.Series(pd.Timestamp('2022-01-01') + pd.to_timedelta(rng.integers(0, 700, 500), unit='D'))
+    fechas = pd.concat([fechas, pd.Series(['no es fecha', None])], ignore_index=True)
+
+    conteo, granularidad = agrupar_conteos(fechas)
+
+    assert granularidad == 'W'
+    assert conteo.sum() == 500
+    assert len(conteo) <= 120
+    # Intervalos semanales que empiezan el lunes, sin huecos
+    assert (conteo.index.dayofweek == 0).all()
+    assert (conteo.index.to_series().diff().dropna() == pd.Timedelta(days=7)).all()
+
+
+def test_agrupar_conteos_mensual_y_forzado():
+    fechas = pd.Series(pd.to_datetime(['2020-01-15', '2020-01-20', '2020-03-01', '2024-12-31']))
+
+    conteo, granularidad = agrupar_conteos(fechas)
+    assert granularidad == 'M'
+    assert conteo.iloc[0] == 2
+    assert conteo.loc['2020-02-01'] == 0
+    assert conteo.sum() == 4
+
+    diario, granularidad = agrupar_conteos(fechas.iloc[:2], granularidad='D')
+    assert granularidad == 'D'
+    assert len(diario) == 6 and diario.sum() == 2
+
+
+def test_agrupar_conteos_vacio():
+    conteo, granularidad = agrupar_conteos(pd.Series(['basura', None]))
+
+    assert conteo.empty
+    assert granularidad == 'D'
+
+
+def test_reducir_min_max_serie_corta_sin_cambios():
+    assert list(reducir_min_max([3, 1, 2])) == [0, 1, 2]
+
+
+def test_reducir_min_max_acota_y_conserva_picos():
+    rng = np.random.default_rng(1)
+    y = rng.normal(size=20000)
+    y[12345] = 50.0
+    y[777] = -50.0
+
+    indices = reducir_min_max(y)
+
+    assert len(indices) <= MAX_PUNTOS
+    assert (np.diff(indices) > 0).all()
+    assert {0, len(y) - 1, 777, 12345} <= set(indices)
+
+
+def test_reducir_min_max_ignora_nan():
+    y = np.sin(np.linspace(0, 20, 5000))
+    y[100:400] = np.nan
+    y[2500] = 9.0
+
+    indices = reducir_min_max(y, max_puntos=100)
+
+    assert len(indices) <= 100
+    assert 2500 in indices
+    assert {0, len(y) - 1} <= set(indices)
+    assert not np.isnan(y[indices[1:-1]]).any()
+
+
+def test_reducir_min_max_todo_nan():
+    indices = reducir_min_max(np.full(1000, np.nan), max_puntos=50)
+
+    assert list(indices) == [0, 999]
+
+
+def test_clase_traza():
+    assert clase_traza(10).__name__ == 'Scatter'
+    assert clase_traza(MAX_PUNTOS).__name__ == 'Scattergl'
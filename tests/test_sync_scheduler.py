@@ -0,0 +1,179 @@
+"""
+Tests del planificador de sincronización y de data/sync_config.json
+"""
+
+import json
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('gspread')
+pytest.importorskip('streamlit')
+
+from src.sheets import google_sheets_sync, sync_scheduler
+from src.sheets.sync_scheduler import RateBudget, SyncScheduler
+
+
+def _esperar(condicion, timeout=3.0):
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        if condicion():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    scheduler = SyncScheduler()
+    scheduler.runs = []
+
+    def run_all():
+        with scheduler._run_lock:
+            scheduler.runs.append(time.monotonic())
+            time.sleep(0.05)
+
+    monkeypatch.setattr(scheduler, 'run_all', run_all)
+    yield scheduler
+    scheduler.stop()
+
+
+def test_start_despues_de_stop_sigue_sincronizando(scheduler):
+    scheduler.start(0.05)
+    assert _esperar(lambda: len(scheduler.runs) >= 1)
+
+    # stop() y start() inmediato, con el hilo anterior todavía en run_all
+    scheduler.stop()
+    scheduler.start(0.05)
+    vistas = len(scheduler.runs)
+
+    assert _esperar(lambda: len(scheduler.runs) >= vistas + 3)
+    assert scheduler._thread.is_alive()
+
+
+def test_stop_detiene_el_hilo(scheduler):
+    scheduler.start(0.05)
+    assert _esperar(lambda: len(scheduler.runs) >= 1)
+
+    scheduler.stop()
+    hilo = scheduler._thread
+    hilo.join(timeout=2)
+
+    assert not hilo.is_alive()
+
+
+def test_cambio_de_intervalo_no_espera_el_anterior(scheduler):
+    scheduler.start(3600)
+    assert _esperar(lambda: len(scheduler.runs) == 1)
+
+    scheduler.start(0.05)
+
+    assert _esperar(lambda: len(scheduler.runs) >= 3, timeout=2.0)
+
+
+def test_trigger_ejecuta_sin_esperar_el_intervalo(scheduler):
+    scheduler.start(3600)
+    assert _esperar(lambda: len(scheduler.runs) == 1)
+
+    scheduler.trigger()
+
+    assert _esperar(lambda: len(scheduler.runs) == 2, timeout=2.0)
+
+
+def test_workers_sin_credenciales_no_usan_la_ui(monkeypatch):
+    monkeypatch.setattr(google_sheets_sync.st, 'error', lambda *a, **k: pytest.fail('st.error en un worker'))
+    monkeypatch.setattr(google_sheets_sync, 'load_service_account_info',
+                        lambda: pytest.fail('st.secrets leído en un worker'))
+    scheduler = SyncScheduler()
+
+    scheduler._sync_sheet('medical_sheets', {'url': 'https://docs.google.com/spreadsheets/d/abc', 'doctor': 'dr'})
+
+    estado = scheduler.status()[0]
+    assert estado['state'] == 'error'
+    assert 'Credenciales' in estado['error']
+
+
+def test_workers_usan_las_credenciales_explicitas(monkeypatch):
+    monkeypatch.setattr(google_sheets_sync.st, 'error', lambda *a, **k: pytest.fail('st.error en un worker'))
+    recibidas = []
+
+    class Cliente:
+        def __init__(self, credentials_info=None):
+            recibidas.append(credentials_info)
+            self.client = None
+            self.pending_sync_state = {}
+
+    monkeypatch.setattr(sync_scheduler, 'GoogleSheetsCAR', Cliente)
+    scheduler = SyncScheduler(credentials_info={'client_email': 'x'})
+
+    scheduler._sync_sheet('medical_sheets', {'url': 'u', 'doctor': 'dr'})
+
+    assert recibidas == [{'client_email': 'x'}]
+    assert scheduler.status()[0]['state'] == 'error'
+
+
+def test_credenciales_invalidas_se_registran_sin_ui(monkeypatch, caplog):
+    monkeypatch.setattr(google_sheets_sync.st, 'error', lambda *a, **k: pytest.fail('st.error en un worker'))
+
+    gs = google_sheets_sync.GoogleSheetsCAR(credentials_info={'type': 'service_account'})
+
+    assert gs.client is None
+    assert 'credenciales' in caplog.text.lower()
+
+
+def test_rate_budget_limita_llamadas():
+    budget = RateBudget(max_calls=10, period=0.5)
+    started = time.monotonic()
+
+    for _ in range(4):
+        budget.acquire(5)
+
+    # 20 llamadas con 10 de presupuesto inicial: al menos una recarga completa
+    assert time.monotonic() - started >= 0.45
+
+
+@pytest.fixture
+def config_path(tmp_path, monkeypatch):
+    path = tmp_path / 'data' / 'sync_config.json'
+    monkeypatch.setattr(google_sheets_sync, 'SYNC_CONFIG_PATH', str(path))
+    return path
+
+
+def test_config_ausente_o_corrupta_devuelve_valores_por_defecto(config_path):
+    assert google_sheets_sync.load_sync_config()['medical_sheets'] == []
+
+    config_path.parent.mkdir(parents=True)
+    config_path.write_text('{"medical_sheets": [')
+    assert google_sheets_sync.load_sync_config()['medical_sheets'] == []
+
+
+def test_save_sync_config_es_atomico(config_path):
+    google_sheets_sync.save_sync_config({'medical_sheets': [{'url': 'a'}]})
+
+    assert json.loads(config_path.read_text()) == {'medical_sheets': [{'url': 'a'}]}
+    assert [p.name for p in config_path.parent.iterdir()] == ['sync_config.json']
+
+
+def test_update_sync_config_no_pisa_sync_state(config_path):
+    google_sheets_sync.save_sync_config({'medical_sheets': [], 'sync_state': {}})
+
+    def worker(i):
+        def apply(config):
+            config['sync_state'][f'hoja{i}'] = {'high_water_mark': i}
+        google_sheets_sync.update_sync_config(apply)
+
+    def ui(i):
+        google_sheets_sync.update_sync_config(
+            lambda config: config.update(auto_sync={'enabled': True, 'interval_seconds': i})
+        )
+
+    hilos = [threading.Thread(target=f, args=(i,)) for i in range(20) for f in (worker, ui)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    config = google_sheets_sync.load_sync_config()
+    assert len(config['sync_state']) == 20
+    assert config['auto_sync']['enabled']
@@ -0,0 +1,85 @@
+"""
+Tests del directorio de usuarios en memoria
+"""
+
+import json
+import os
+
+import pytest
+
+from src.otro.user_directory import UserDirectory
+
+
+def _write(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+
+def test_formatos_de_archivo(tmp_path):
+    principal = tmp_path / 'users_credentials.json'
+    medico = tmp_path / 'medical_users.json'
+    _write(principal, {'admin': {'role': 'admin'}, 'coach': {'role': 'entrenador'}})
+    _write(medico, {'users': [{'username': 'dr.garcia', 'role': 'medico'}]})
+
+    assert set(UserDirectory(str(principal)).users) == {'admin', 'coach'}
+    assert UserDirectory(str(medico)).role_of('dr.garcia') == 'medico'
+
+
+def test_permisos(tmp_path):
+    path = tmp_path / 'users.json'
+    _write(path, {'admin': {'role': 'admin'}, 'dr': {'role': 'medico'}})
+    directory = UserDirectory(str(path))
+
+    assert directory.has_permission('admin', 'medico')
+    assert directory.has_permission('dr', 'medico')
+    assert not directory.has_permission('dr', 'admin')
+    assert not directory.has_permission('nadie')
+
+
+def test_modificar_resultados_no_altera_el_cache(tmp_path):
+    path = tmp_path / 'users.json'
+    _write(path, {'dr': {'role': 'medico', 'areas': ['medica']}})
+    directory = UserDirectory(str(path))
+
+    user = directory.get('dr')
+    user['role'] = 'admin'
+    user['areas'].append('todas')
+    directory.users['dr']['role'] = 'admin'
+    directory.data['dr']['last_login'] = 'hoy'
+
+    assert directory.get('dr') == {'role': 'medico', 'areas': ['medica']}
+    assert directory.role_of('dr') == 'medico'
+    assert not directory.has_permission('dr', 'admin')
+
+
+def test_relee_solo_si_cambia_el_archivo(tmp_path):
+    path = tmp_path / 'users.json'
+    _write(path, {'dr': {'role': 'medico'}})
+    directory = UserDirectory(str(path))
+    assert directory.role_of('dr') == 'medico'
+
+    _write(path, {'dr': {'role': 'admin'}, 'nuevo': {'role': 'medico'}})
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert directory.role_of('dr') == 'admin'
+    assert directory.get('nuevo') is not None
+
+
+def test_archivo_inexistente(tmp_path):
+    directory = UserDirectory(str(tmp_path / 'no_existe.json'))
+
+    assert directory.get('admin') is None
+    assert directory.users == {}
+
+
+def test_pertenencia_sin_copiar(tmp_path, monkeypatch):
+    path = tmp_path / 'users.json'
+    _write(path, {'dr': {'role': 'medico'}})
+    directory = UserDirectory(str(path))
+
+    from src.otro import user_directory
+    monkeypatch.setattr(user_directory.copy, 'deepcopy', lambda *a: pytest.fail('copia innecesaria'))
+
+    assert 'dr' in directory
+    assert 'nadie' not in directory